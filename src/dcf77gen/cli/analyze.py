@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import argparse
+from collections.abc import Iterator
+from datetime import datetime
+import time
+import numpy as np
+import sounddevice as sd
+
+from dcf77gen.cli.app import resolve_device_id
+from dcf77gen.cli.render import add_impairment_arguments, impairments_from_args
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.dsp.analyzer import StreamingSignalAnalyzer, iter_wav_chunks
+from dcf77gen.dsp.impairment import ChannelImpairment
+from dcf77gen.dsp.render import OfflineRenderer
+from dcf77gen.realtime.devices import DeviceCapabilityCache
+
+
+def _input_chunks(device: int | None, samplerate: int, seconds: float, chunk_s: float) -> Iterator[np.ndarray]:
+    frames = max(1, int(chunk_s * samplerate))
+    remaining = int(seconds * samplerate)
+    with sd.InputStream(device=device, samplerate=samplerate, channels=1, dtype="float32") as stream:
+        while remaining > 0:
+            data, _overflowed = stream.read(min(frames, remaining))
+            remaining -= len(data)
+            yield data[:, 0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measures carrier purity and modulation depth of a rendered, recorded or live DCF77 signal."
+    )
+    parser.add_argument("file", nargs="?", help="PCM WAV recording to analyze")
+    parser.add_argument("--render", type=float, default=None, help="analyze this many seconds of offline rendering")
+    parser.add_argument(
+        "-i", "--input-device", type=str, default=None, help="analyze live input from this device ID or name"
+    )
+    parser.add_argument("--seconds", type=float, default=10.0, help="live input duration (s)")
+    parser.add_argument("-f", "--frequency", type=float, default=77500, help="carrier frequency (Hz)")
+    parser.add_argument("-s", "--samplerate", type=int, default=GeneratorConfig.samplerate, help="sample rate")
+    parser.add_argument("-a", "--amplitude", type=float, default=1.0, help="amplitude (--render)")
+    parser.add_argument("--low-factor", type=float, default=0.15, help="expected low-pulse factor")
+    parser.add_argument("--image", action="store_true", help="analyze the --image mode tone")
+    parser.add_argument("--nperseg", type=int, default=16384, help="Welch segment length (power of two)")
+    add_impairment_arguments(parser)
+
+    args = parser.parse_args()
+
+    sources = sum((args.file is not None, args.render is not None, args.input_device is not None))
+    if sources != 1:
+        parser.error("give exactly one of FILE, --render or --input-device")
+    input_device = None
+    if args.input_device is not None:
+        cache = DeviceCapabilityCache()
+        cache.load()
+        input_device = resolve_device_id(args.input_device, parser, cache, kind="input", option="--input-device")
+
+    try:
+        if args.file is not None:
+            samplerate, chunks = iter_wav_chunks(args.file)
+            carrier = float(args.frequency)
+        else:
+            cfg = GeneratorConfig(
+                frequency=float(args.frequency),
+                samplerate=int(args.samplerate),
+                amplitude=float(args.amplitude),
+                low_factor=float(args.low_factor),
+                image_mode=bool(args.image),
+            )
+            samplerate, carrier = cfg.samplerate, cfg.tone_frequency
+            if args.render is not None:
+                chunks = OfflineRenderer(cfg, datetime.now().astimezone()).iter_chunks(float(args.render))
+                impairments = impairments_from_args(args)
+                if impairments.enabled:
+                    chunks = ChannelImpairment.for_config(impairments, cfg).iter_chunks(chunks)
+            else:
+                chunks = _input_chunks(input_device, samplerate, float(args.seconds), 1.0)
+        analyzer = StreamingSignalAnalyzer(
+            samplerate, carrier, low_factor=float(args.low_factor), nperseg=int(args.nperseg)
+        )
+        started = time.perf_counter()
+        for chunk in chunks:
+            analyzer.feed(chunk)
+        elapsed = time.perf_counter() - started
+        report = analyzer.report()
+    except (OSError, ValueError, sd.PortAudioError) as exc:
+        parser.error(str(exc))
+    except KeyboardInterrupt:
+        return
+
+    print(report.format())
+    if elapsed > 0.0:
+        print(f"speed: {report.seconds / elapsed:.0f}x realtime")
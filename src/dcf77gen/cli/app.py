@@ -6,17 +6,29 @@ import sys
 
 from dcf77gen.core.clock import now_dt
 from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.core.timesource import DisciplinedClock, TimeSourceReader
+from dcf77gen.dsp.analyzer import StreamingSignalAnalyzer
+from dcf77gen.dsp.spectrum import image_spectrum_check
 from dcf77gen.protocol.encoder import build_time_bits, format_time_bits_breakdown
+from dcf77gen.realtime.calibration import LatencyCalibrationStore
+from dcf77gen.realtime.coordination import (
+    DEFAULT_GROUP,
+    DEFAULT_PORT,
+    CoordinationFollower,
+    CoordinationLeader,
+    LeaderClock,
+    parse_group,
+    parse_interface,
+)
+from dcf77gen.realtime.devices import DeviceCapabilityCache
 from dcf77gen.realtime.streamer import RealtimeStreamer
+from dcf77gen.realtime.tap import AnalyzerTap
+from dcf77gen.realtime.trace import DEFAULT_TRACE_CAPACITY, TraceRecorder
+from dcf77gen.realtime.watchdog import StreamWatchdog
+from dcf77gen.realtime.worker import DEFAULT_RT_PRIORITY, IsolatedStreamer
 
-
-def _list_output_devices() -> list[tuple[int, dict]]:
-    devices = sd.query_devices()
-    return [
-        (i, dev)
-        for i, dev in enumerate(devices)
-        if int(dev.get("max_output_channels", 0)) > 0
-    ]
+# Dry-run in --image mode models the common 96 kHz onboard DAC.
+IMAGE_MODE_DRY_RUN_SAMPLERATE = 96000
 
 
 def _print_device_matches(matches: list[tuple[int, dict]]) -> None:
@@ -24,7 +36,19 @@ def _print_device_matches(matches: list[tuple[int, dict]]) -> None:
         print(f"  [{device_id}] {dev['name']}")
 
 
-def _resolve_device_id(device_arg: str | None, parser: argparse.ArgumentParser) -> int | None:
+def resolve_device_id(
+    device_arg: str | None,
+    parser: argparse.ArgumentParser,
+    cache: DeviceCapabilityCache,
+    *,
+    kind: str = "output",
+    option: str = "--device",
+) -> int | None:
+    """
+    Resolves a numeric device ID or a unique case-insensitive name fragment
+    among the `kind` ("output" or "input") devices; exits with the candidates
+    otherwise. Shared by every command that opens an audio device.
+    """
     if device_arg is None:
         return None
 
@@ -35,23 +59,23 @@ def _resolve_device_id(device_arg: str | None, parser: argparse.ArgumentParser)
 
     query = device_arg.strip().lower()
     if not query:
-        parser.error("--device cannot be empty")
+        parser.error(f"{option} cannot be empty")
 
-    output_devices = _list_output_devices()
-    matches = [(i, dev) for i, dev in output_devices if query in str(dev.get("name", "")).lower()]
+    devices = cache.input_devices() if kind == "input" else cache.output_devices()
+    matches = [(i, dev) for i, dev in devices if query in str(dev.get("name", "")).lower()]
 
     if len(matches) == 1:
         return matches[0][0]
 
     if len(matches) == 0:
-        print(f"No output device matches '{device_arg}'.")
-        print("Available output devices:")
-        _print_device_matches(output_devices)
+        print(f"No {kind} device matches '{device_arg}'.")
+        print(f"Available {kind} devices:")
+        _print_device_matches(devices)
         parser.exit(2)
 
-    print(f"Multiple output devices match '{device_arg}':")
+    print(f"Multiple {kind} devices match '{device_arg}':")
     _print_device_matches(matches)
-    print("Refine --device or pass an explicit numeric device ID.")
+    print(f"Refine {option} or pass an explicit numeric device ID.")
     parser.exit(2)
 
 
@@ -64,8 +88,17 @@ def _describe_output_device(device_id: int | None) -> str:
 
 
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Synchronizes DCF77 devices using sound speakers.")
+    parser = argparse.ArgumentParser(
+        description="Synchronizes DCF77 devices using sound speakers.",
+        epilog="Channel impairments (--snr, fading, impulses, jitter) are offline-only: "
+        "see dcf77-render and dcf77-analyze --render.",
+    )
     parser.add_argument("-l", "--list-devices", action="store_true", help="list audio devices")
+    parser.add_argument(
+        "--refresh-devices",
+        action="store_true",
+        help="re-probe output device capabilities instead of using the on-disk cache",
+    )
     parser.add_argument("-d", "--device", type=str, help="device ID or case-insensitive name substring")
     parser.add_argument("-f", "--frequency", type=float, default=77500, help="frequency (Hz)")
     parser.add_argument("-a", "--amplitude", type=float, default=1.0, help="amplitude")
@@ -73,12 +106,94 @@ def main() -> None:
     parser.add_argument("-u", "--utc", action="store_true", help="use UTC time")
     parser.add_argument("-o", "--offset", type=int, default=0, help="second offset")
     parser.add_argument("--low-factor", type=float, default=0.15, help="relative amplitude during low pulse (0..1)")
+    parser.add_argument(
+        "--image",
+        action="store_true",
+        help="undersampling mode: synthesize the tone whose DAC image lands on --frequency",
+    )
     parser.add_argument("--dry-run", action="store_true", help="print encoding details and exit")
+    parser.add_argument(
+        "--render-ahead",
+        type=float,
+        default=0.0,
+        help="render this many seconds ahead into a ring buffer (0 renders in the callback)",
+    )
+    parser.add_argument("--trace", type=str, default=None, help="record a per-callback binary trace to this file")
+    parser.add_argument(
+        "--trace-capacity",
+        type=int,
+        default=DEFAULT_TRACE_CAPACITY,
+        help="trace ring size in callbacks (default: one hour)",
+    )
+    parser.add_argument(
+        "--analyze",
+        action="store_true",
+        help="analyze the emitted signal at low priority and print a quality report on exit",
+    )
+    parser.add_argument(
+        "--watchdog",
+        action="store_true",
+        help="reopen the output stream automatically after stream errors, stalls or underflow storms",
+    )
+    parser.add_argument(
+        "--fallback-device",
+        action="append",
+        default=[],
+        help="device ID or name to try when the primary device cannot be reopened (repeatable; implies --watchdog)",
+    )
+    parser.add_argument(
+        "--coordinate",
+        choices=("leader", "follower"),
+        default=None,
+        help="align pulse edges across hosts over UDP multicast as the timing leader or a follower",
+    )
+    parser.add_argument(
+        "--coord-group",
+        type=str,
+        default=f"{DEFAULT_GROUP}:{DEFAULT_PORT}",
+        help="multicast GROUP[:PORT] used by --coordinate",
+    )
+    parser.add_argument(
+        "--coord-interface",
+        type=str,
+        default="0.0.0.0",
+        help="IPv4 address of the interface used by --coordinate (127.0.0.1 for single-host tests)",
+    )
+    parser.add_argument("--isolated", action="store_true", help="run audio in a dedicated realtime worker process")
+    parser.add_argument(
+        "--rt-priority",
+        type=int,
+        default=DEFAULT_RT_PRIORITY,
+        help="SCHED_FIFO/SCHED_RR priority for --isolated (0 disables)",
+    )
+    parser.add_argument(
+        "--time-source",
+        type=str,
+        default=None,
+        help="discipline edges to GPS time: serial:DEVICE[@BAUD], fifo:PATH or replay:PATH[@SPEED]",
+    )
+    parser.add_argument("--pps-dcd", action="store_true", help="read PPS edges from the serial DCD line")
+    parser.add_argument(
+        "--no-latency-correction",
+        action="store_true",
+        help="ignore the output latency correction stored by dcf77-calibrate",
+    )
+    parser.add_argument(
+        "--lock-timeout",
+        type=float,
+        default=10.0,
+        help="seconds to wait for a time-source fix before falling back to the system clock",
+    )
 
     args = parser.parse_args()
 
     if args.list_devices:
         print(sd.query_devices())
+        cache = DeviceCapabilityCache()
+        cache.load(force_refresh=args.refresh_devices)
+        print()
+        print("Output capability matrix (cached):")
+        print(cache.format_matrix())
         return
 
     requested_frequency = float(args.frequency)
@@ -88,22 +203,33 @@ def main() -> None:
         device_id = None
         if args.samplerate is not None:
             actual_samplerate = int(args.samplerate)
+        elif args.image:
+            actual_samplerate = IMAGE_MODE_DRY_RUN_SAMPLERATE
         else:
             min_nyquist_samplerate = int(requested_frequency * 2) + 1
             actual_samplerate = max(GeneratorConfig.samplerate, min_nyquist_samplerate)
     else:
-        device_id = _resolve_device_id(args.device, parser)
+        cache = DeviceCapabilityCache()
+        cache.load(force_refresh=args.refresh_devices)
+        device_id = resolve_device_id(args.device, parser, cache)
+        fallback_ids = [
+            resolve_device_id(dev, parser, cache, option="--fallback-device") for dev in args.fallback_device
+        ]
         if args.samplerate is not None:
             actual_samplerate = int(args.samplerate)
             try:
-                sd.check_output_settings(device_id, samplerate=actual_samplerate)
+                cache.check_samplerate(device_id, actual_samplerate)
             except Exception as exc:
                 parser.error(
                     f"requested --samplerate {actual_samplerate} is not supported by the selected output device: {exc}"
                 )
         else:
-            actual_samplerate = int(sd.query_devices(device_id, "output")["default_samplerate"])
-            if actual_samplerate <= 2 * requested_frequency:
+            caps = cache.capabilities(device_id)
+            if caps is not None and caps.default_samplerate > 0:
+                actual_samplerate = caps.default_samplerate
+            else:
+                actual_samplerate = int(sd.query_devices(device_id, "output")["default_samplerate"])
+            if not args.image and actual_samplerate <= 2 * requested_frequency:
                 parser.error(
                     "default output samplerate is too low for the requested carrier frequency "
                     f"({actual_samplerate} Hz <= 2 * {requested_frequency:g} Hz). "
@@ -118,6 +244,7 @@ def main() -> None:
             utc=bool(args.utc),
             offset=int(args.offset),
             low_factor=float(args.low_factor),
+            image_mode=bool(args.image),
         )
         if args.dry_run:
             now = now_dt(cfg.utc)
@@ -132,9 +259,126 @@ def main() -> None:
             print(f"time base: {'UTC' if cfg.utc else 'local'}")
             print(f"target_time: {result.target_time.isoformat(sep=' ', timespec='seconds')}")
             print(format_time_bits_breakdown(result.time_bits))
+            if cfg.image_mode:
+                print("image mode spectrum check (zero-order-hold DAC model):")
+                print(image_spectrum_check(cfg).format())
+            return
+        watchdog = None
+        if args.watchdog or args.fallback_device:
+            watchdog = StreamWatchdog(fallback_devices=fallback_ids)
+        if args.isolated and (args.time_source is not None or args.analyze or args.coordinate is not None):
+            parser.error("--time-source, --analyze and --coordinate cannot be combined with --isolated")
+        if args.coordinate == "follower" and args.time_source is not None:
+            parser.error("a --coordinate follower takes its time from the leader; drop --time-source")
+        if args.coordinate == "leader" and args.render_ahead > 0.0:
+            parser.error("--coordinate leader needs the direct callback path; drop --render-ahead")
+        coord_group = parse_group(args.coord_group) if args.coordinate is not None else None
+        coord_interface = parse_interface(args.coord_interface) if args.coordinate is not None else None
+        latency_correction_s = 0.0
+        if not args.no_latency_correction:
+            caps = cache.capabilities(device_id)
+            stored = None if caps is None else LatencyCalibrationStore().correction_s(caps.key, cfg.samplerate)
+            if stored is not None and (args.isolated or args.render_ahead > 0.0):
+                # Only the disciplined direct callback path can move edges within a block.
+                mode = "--isolated" if args.isolated else "--render-ahead"
+                print(
+                    f"[WARN] Calibrated output latency correction {stored * 1e3:+.3f} ms is not applied with {mode}.",
+                    file=sys.stderr,
+                )
+            elif stored is not None:
+                latency_correction_s = stored
+                print(f"[INFO] Applying calibrated output latency correction {stored * 1e3:+.3f} ms", flush=True)
+        if args.isolated:
+            IsolatedStreamer(
+                cfg,
+                rt_priority=int(args.rt_priority),
+                render_ahead_s=float(args.render_ahead),
+                trace_path=args.trace,
+                trace_capacity=int(args.trace_capacity),
+                watchdog=watchdog,
+            ).run(device_id=device_id)
             return
-        RealtimeStreamer(cfg).run(device_id=device_id)
-    except ValueError as exc:
+        clock = None
+        reader = None
+        if args.time_source is not None:
+            clock = DisciplinedClock()
+            reader = TimeSourceReader(args.time_source, clock, pps_dcd=bool(args.pps_dcd))
+            reader.start()
+            print(f"[INFO] Waiting up to {args.lock_timeout:g} s for time source {args.time_source} ...", flush=True)
+            if reader.wait_for_lock(float(args.lock_timeout)):
+                print(f"[INFO] Time source locked: {clock.describe()}", flush=True)
+            else:
+                reason = f" ({reader.error})" if reader.error else ""
+                print(f"[WARN] No time-source fix{reason}; using the system clock until one arrives.", file=sys.stderr)
+            if args.render_ahead > 0.0:
+                print("[WARN] --render-ahead disables sub-block edge discipline; seeding only.", file=sys.stderr)
+        follower = None
+        if args.coordinate == "follower":
+            clock = LeaderClock(offset=cfg.offset)
+            follower = CoordinationFollower(clock, coord_group, interface=coord_interface)
+            try:
+                follower.start()
+            except OSError as exc:
+                parser.error(f"cannot join coordination group {args.coord_group} on {coord_interface}: {exc}")
+            print(f"[INFO] Waiting up to {args.lock_timeout:g} s for a leader on {args.coord_group} ...", flush=True)
+            if follower.wait_for_lock(float(args.lock_timeout)):
+                print(f"[INFO] Following {clock.describe()}", flush=True)
+            elif clock.foreign_offset is not None:
+                print(
+                    f"[WARN] Ignoring leader beacons for --offset {clock.foreign_offset} "
+                    f"(this host uses {cfg.offset}); using the system clock until a matching leader appears.",
+                    file=sys.stderr,
+                )
+            else:
+                reason = f" ({follower.error})" if follower.error else ""
+                print(f"[WARN] No leader beacons{reason}; using the system clock until one arrives.", file=sys.stderr)
+            if args.render_ahead > 0.0:
+                print("[WARN] --render-ahead disables sub-block edge discipline; seeding only.", file=sys.stderr)
+        leader = None
+        if args.coordinate == "leader":
+            leader = CoordinationLeader(coord_group, interface=coord_interface)
+            print(f"[INFO] Broadcasting timing beacons to {args.coord_group}", flush=True)
+        tap = None
+        if args.analyze:
+            tap = AnalyzerTap(
+                StreamingSignalAnalyzer(cfg.samplerate, cfg.tone_frequency, low_factor=cfg.low_factor)
+            )
+        trace = None
+        if args.trace is not None:
+            trace = TraceRecorder(args.trace, cfg.samplerate, cfg.samplerate // 10, int(args.trace_capacity))
+        try:
+            RealtimeStreamer(
+                cfg,
+                clock=clock,
+                render_ahead_s=float(args.render_ahead),
+                trace=trace,
+                discipline_edges=reader is not None or follower is not None or latency_correction_s != 0.0,
+                latency_correction_s=latency_correction_s,
+                tap=tap,
+                watchdog=watchdog,
+                leader=leader,
+            ).run(device_id=device_id)
+        finally:
+            if trace is not None:
+                trace.close()
+            if tap is not None:
+                try:
+                    print(tap.analyzer.report().format())
+                except ValueError as exc:
+                    print(f"[WARN] Signal analysis unavailable: {exc}", file=sys.stderr)
+                if tap.dropped_blocks:
+                    print(f"[WARN] Analyzer fell behind; {tap.dropped_blocks} blocks skipped.", file=sys.stderr)
+            if reader is not None:
+                reader.stop()
+                error = f", last error: {reader.error}" if reader.error else ""
+                print(f"[INFO] Time source: {clock.describe()}{error}", flush=True)
+            if follower is not None:
+                follower.stop()
+                print(f"[INFO] Coordination: {clock.describe()}", flush=True)
+            if leader is not None:
+                error = f", last error: {leader.error}" if leader.error else ""
+                print(f"[INFO] Coordination: sent {leader.sent} beacons{error}", flush=True)
+    except (OSError, ValueError) as exc:
         parser.error(str(exc))
     except KeyboardInterrupt:
         print("\r\033[K", end="", flush=True)
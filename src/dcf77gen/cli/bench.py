@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import argparse
+
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.realtime.jitter import LoadConfig, format_jitter_report, run_jitter_benchmark
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Runs the realtime callback with paced deadlines under synthetic load."
+    )
+    parser.add_argument("-f", "--frequency", type=float, default=77500, help="frequency (Hz)")
+    parser.add_argument("-s", "--samplerate", type=int, default=GeneratorConfig.samplerate, help="sample rate")
+    parser.add_argument("--seconds", type=float, default=10.0, help="benchmark duration (s)")
+    parser.add_argument("--budget-ms", type=float, default=None, help="per-block deadline after release (default: one block)")
+    parser.add_argument("--gil-threads", type=int, default=0, help="GIL-holding Python busy threads")
+    parser.add_argument("--numpy-threads", type=int, default=0, help="NumPy worker threads")
+    parser.add_argument("--memory-mb", type=int, default=0, help="memory churn size (MB)")
+    parser.add_argument("--gc-interval", type=float, default=0.0, help="forced gc.collect() period (s)")
+
+    args = parser.parse_args()
+
+    try:
+        cfg = GeneratorConfig(frequency=float(args.frequency), samplerate=int(args.samplerate))
+        load = LoadConfig(
+            gil_threads=int(args.gil_threads),
+            numpy_threads=int(args.numpy_threads),
+            memory_mb=int(args.memory_mb),
+            gc_interval_s=float(args.gc_interval),
+        )
+        blocks = max(1, int(round(args.seconds * 10)))
+        budget_s = None if args.budget_ms is None else args.budget_ms / 1e3
+        report = run_jitter_benchmark(cfg, blocks, load=load, budget_s=budget_s)
+    except ValueError as exc:
+        parser.error(str(exc))
+    except KeyboardInterrupt:
+        return
+    print(format_jitter_report(report))
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import argparse
+import sounddevice as sd
+
+from dcf77gen.cli.app import resolve_device_id
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.realtime.calibration import LatencyCalibrationStore, duplex_play_record, measure_latency
+from dcf77gen.realtime.devices import DeviceCapabilityCache
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measures end-to-end output latency over a loopback and stores a per-device correction."
+    )
+    parser.add_argument(
+        "-d", "--device", type=str, default=None, help="output device ID or name (default output if omitted)"
+    )
+    parser.add_argument(
+        "-i", "--input-device", type=str, default=None, help="loopback input device ID or name (default input)"
+    )
+    parser.add_argument("-f", "--frequency", type=float, default=77500, help="pattern carrier frequency (Hz)")
+    parser.add_argument("-s", "--samplerate", type=int, default=GeneratorConfig.samplerate, help="sample rate")
+    parser.add_argument("-a", "--amplitude", type=float, default=0.5, help="pattern amplitude")
+    parser.add_argument("--image", action="store_true", help="calibrate with the --image mode tone")
+    parser.add_argument("--seconds", type=float, default=2.0, help="pattern length (s)")
+    parser.add_argument("--no-save", action="store_true", help="print the result without storing it")
+
+    args = parser.parse_args()
+
+    cache = DeviceCapabilityCache()
+    cache.load()
+    output_device = resolve_device_id(args.device, parser, cache)
+    input_device = resolve_device_id(args.input_device, parser, cache, kind="input", option="--input-device")
+
+    try:
+        cfg = GeneratorConfig(
+            frequency=float(args.frequency),
+            samplerate=int(args.samplerate),
+            amplitude=float(args.amplitude),
+            image_mode=bool(args.image),
+        )
+        result = measure_latency(cfg, duplex_play_record(input_device, output_device), seconds=float(args.seconds))
+    except (ValueError, RuntimeError, sd.PortAudioError) as exc:
+        parser.error(str(exc))
+    except KeyboardInterrupt:
+        return
+
+    print(result.format())
+    if args.no_save:
+        return
+
+    caps = cache.capabilities(output_device)
+    if caps is None:
+        parser.error("output device not found in the capability cache; correction not saved")
+    store = LatencyCalibrationStore()
+    store.save(caps.key, result)
+    print(f"saved correction for {caps.key} at {cfg.samplerate} Hz to {store.path}")
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import argparse
+from datetime import datetime
+import time
+import wave
+import numpy as np
+
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.dsp.impairment import ChannelImpairment, ImpairmentConfig
+from dcf77gen.dsp.render import OfflineRenderer
+
+
+def add_impairment_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("channel impairments (applied after rendering)")
+    group.add_argument("--snr", type=float, default=None, help="add white noise at this SNR (dB, full band)")
+    group.add_argument("--fading-depth", type=float, default=0.0, help="slow random fading depth (dB)")
+    group.add_argument("--fading-period", type=float, default=30.0, help="typical fading period (s)")
+    group.add_argument("--impulse-rate", type=float, default=0.0, help="mean impulse interference rate (1/s)")
+    group.add_argument("--impulse-level", type=float, default=1.0, help="impulse peak relative to the carrier")
+    group.add_argument("--carrier-offset", type=float, default=0.0, help="carrier frequency offset (Hz)")
+    group.add_argument("--edge-jitter", type=float, default=0.0, help="rms jitter of every pulse edge (ms)")
+    group.add_argument("--seed", type=int, default=None, help="random seed for reproducible impairments")
+
+
+def impairments_from_args(args: argparse.Namespace) -> ImpairmentConfig:
+    return ImpairmentConfig(
+        snr_db=args.snr,
+        fading_depth_db=float(args.fading_depth),
+        fading_period_s=float(args.fading_period),
+        impulse_rate_hz=float(args.impulse_rate),
+        impulse_level=float(args.impulse_level),
+        carrier_offset_hz=float(args.carrier_offset),
+        edge_jitter_s=float(args.edge_jitter) / 1e3,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Renders the DCF77 signal, optionally impaired, to a 16-bit WAV file.")
+    parser.add_argument("output", help="WAV file to write")
+    parser.add_argument("--seconds", type=float, default=60.0, help="duration (s)")
+    parser.add_argument(
+        "--start",
+        type=str,
+        default=None,
+        help="ISO time of the first sample (default: now; naive times are local)",
+    )
+    parser.add_argument("-f", "--frequency", type=float, default=77500, help="frequency (Hz)")
+    parser.add_argument("-s", "--samplerate", type=int, default=GeneratorConfig.samplerate, help="sample rate")
+    parser.add_argument("-a", "--amplitude", type=float, default=1.0, help="amplitude")
+    parser.add_argument("-u", "--utc", action="store_true", help="use UTC time")
+    parser.add_argument("-o", "--offset", type=int, default=0, help="second offset")
+    parser.add_argument("--low-factor", type=float, default=0.15, help="relative amplitude during low pulse (0..1)")
+    parser.add_argument("--image", action="store_true", help="render the --image mode tone")
+    add_impairment_arguments(parser)
+
+    args = parser.parse_args()
+
+    try:
+        cfg = GeneratorConfig(
+            frequency=float(args.frequency),
+            samplerate=int(args.samplerate),
+            amplitude=float(args.amplitude),
+            utc=bool(args.utc),
+            offset=int(args.offset),
+            low_factor=float(args.low_factor),
+            image_mode=bool(args.image),
+        )
+        start = datetime.now() if args.start is None else datetime.fromisoformat(args.start)
+        impairments = impairments_from_args(args)
+        chunks = OfflineRenderer(cfg, start.astimezone()).iter_chunks(float(args.seconds))
+        if impairments.enabled:
+            chunks = ChannelImpairment.for_config(impairments, cfg).iter_chunks(chunks)
+        started = time.perf_counter()
+        frames = 0
+        clipped = 0
+        with wave.open(args.output, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(cfg.samplerate)
+            for chunk in chunks:
+                clipped += int(np.count_nonzero(np.abs(chunk) > 1.0))
+                pcm = np.round(np.clip(chunk, -1.0, 1.0) * 32767.0).astype("<i2")
+                wav.writeframes(pcm.tobytes())
+                frames += len(chunk)
+        elapsed = time.perf_counter() - started
+    except (OSError, ValueError) as exc:
+        parser.error(str(exc))
+    except KeyboardInterrupt:
+        return
+
+    seconds = frames / cfg.samplerate
+    print(f"rendered: {seconds:.1f} s at {cfg.samplerate} Hz to {args.output}")
+    print(f"impairments: {impairments.describe()}")
+    if clipped:
+        print(f"[WARN] {clipped} samples clipped; lower --amplitude or --impulse-level.")
+    if elapsed > 0.0:
+        print(f"speed: {seconds / elapsed:.0f}x realtime")
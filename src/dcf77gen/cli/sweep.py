@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+from dataclasses import replace
+from datetime import datetime
+import os
+import time
+
+from dcf77gen.cli.render import add_impairment_arguments, impairments_from_args
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.dsp.receiver import ReceiverModel
+from dcf77gen.dsp.sweep import DAC_MODELS, config_grid, format_sweep_table, parse_grid, run_sweep
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Renders short signals across a parameter grid, decodes each with a receiver model "
+        "and ranks the configurations by decode margin."
+    )
+    grid = parser.add_argument_group("parameter grid (comma lists and/or inclusive START:STOP:STEP ranges)")
+    grid.add_argument("-f", "--frequency", type=str, default="77500", help="frequencies (Hz)")
+    grid.add_argument("-s", "--samplerate", type=str, default=str(GeneratorConfig.samplerate), help="sample rates")
+    grid.add_argument("-a", "--amplitude", type=str, default="0.25,0.5,1.0", help="amplitudes")
+    grid.add_argument("--low-factor", type=str, default="0.05:0.3:0.05", help="low-pulse factors")
+    grid.add_argument("--image", action="store_true", help="sweep the --image mode tone")
+    parser.add_argument("--seconds", type=float, default=20.0, help="rendered duration per configuration (s)")
+    parser.add_argument("--start", type=str, default=None, help="ISO time of the first sample (default: now)")
+
+    rx = parser.add_argument_group("receiver model")
+    rx.add_argument("--tuned", type=float, default=None, help="receiver tuning (Hz, default: first --frequency)")
+    rx.add_argument("--bandwidth", type=float, default=ReceiverModel.bandwidth_hz, help="filter bandwidth (Hz)")
+    rx.add_argument("--agc-release", type=float, default=ReceiverModel.agc_release_s, help="AGC release time (s)")
+    rx.add_argument("--low-threshold", type=float, default=ReceiverModel.low_threshold, help="slicer low threshold")
+    rx.add_argument("--high-threshold", type=float, default=ReceiverModel.high_threshold, help="slicer high threshold")
+    rx.add_argument("--dac", choices=DAC_MODELS, default="zoh", help="DAC model between render and antenna")
+
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--top", type=int, default=20, help="rows to print (0: all)")
+    add_impairment_arguments(parser)
+
+    args = parser.parse_args()
+
+    try:
+        frequencies = parse_grid(args.frequency)
+        configs, skipped = config_grid(
+            frequencies=frequencies,
+            samplerates=parse_grid(args.samplerate, int),
+            amplitudes=parse_grid(args.amplitude),
+            low_factors=parse_grid(args.low_factor),
+            image_mode=bool(args.image),
+        )
+        if not configs:
+            raise ValueError("no valid configuration in the grid")
+        receiver = ReceiverModel(
+            tuned_hz=frequencies[0] if args.tuned is None else float(args.tuned),
+            bandwidth_hz=float(args.bandwidth),
+            agc_release_s=float(args.agc_release),
+            low_threshold=float(args.low_threshold),
+            high_threshold=float(args.high_threshold),
+        )
+        # Every configuration sees the same channel realization.
+        impairments = impairments_from_args(args)
+        if impairments.seed is None:
+            impairments = replace(impairments, seed=0)
+        start = datetime.now() if args.start is None else datetime.fromisoformat(args.start)
+        jobs = min(args.jobs or os.cpu_count() or 1, len(configs))
+        started = time.perf_counter()
+        results = run_sweep(
+            configs,
+            receiver,
+            impairments,
+            seconds=float(args.seconds),
+            start=start.astimezone(),
+            dac=args.dac,
+            jobs=jobs,
+        )
+        elapsed = time.perf_counter() - started
+    except (OSError, ValueError) as exc:
+        parser.error(str(exc))
+    except KeyboardInterrupt:
+        return
+
+    print(f"receiver: {receiver.describe()}, {args.dac} DAC")
+    print(f"impairments: {impairments.describe()}")
+    print(f"swept: {len(configs)} configurations x {args.seconds:g} s on {jobs} workers in {elapsed:.1f} s")
+    for reason, count in Counter(entry.split(": ", 1)[1] for entry in skipped).items():
+        print(f"[SKIP] {count} combinations: {reason}")
+    print(format_sweep_table(results, top=args.top or None))
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import argparse
+
+from dcf77gen.realtime.trace import analyze_trace, read_trace
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Analyzes a dcf77-sync per-callback trace file.")
+    parser.add_argument("path", help="trace file written with dcf77-sync --trace")
+    parser.add_argument("--dump", type=int, default=0, help="also print the last N records")
+
+    args = parser.parse_args()
+
+    try:
+        info, records = read_trace(args.path)
+    except (OSError, ValueError) as exc:
+        parser.error(str(exc))
+
+    print(f"trace: {args.path} ({info['write_count']} records written, capacity {info['capacity']})")
+    print(f"samplerate: {info['samplerate']} Hz, blocksize: {info['blocksize']}")
+    print(analyze_trace(info, records).format())
+
+    if args.dump > 0:
+        print(f"{'mono (s)':>12} {'dac (s)':>14} {'frames':>6} {'sec':>3} {'dec':>3} {'flags':>5} {'amp':>6}")
+        t0 = records["mono_ns"][0] if len(records) else 0
+        for rec in records[-args.dump :]:
+            print(
+                f"{(rec['mono_ns'] - t0) / 1e9:12.4f} {rec['dac_time']:14.6f} {rec['frames']:6d} "
+                f"{rec['count_sec']:3d} {rec['count_deci']:3d} {rec['flags']:#05x} {rec['amplitude']:6.3f}"
+            )
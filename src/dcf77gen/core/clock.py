@@ -1,7 +1,106 @@
 from __future__ import annotations
 
-from datetime import datetime, UTC
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, UTC
+import threading
+import time
+from typing import Protocol
 
 
 def now_dt(use_utc: bool) -> datetime:
-    return datetime.now(UTC) if use_utc else datetime.now()
\ No newline at end of file
+    return datetime.now(UTC) if use_utc else datetime.now()
+
+
+def add_elapsed(dt: datetime, delta: timedelta) -> datetime:
+    """
+    Adds elapsed (physical) time to `dt`.
+
+    Aware datetimes are shifted in UTC and converted back, so the result stays
+    correct across DST transitions; naive datetimes keep wall-clock arithmetic.
+    """
+    if dt.tzinfo is None:
+        return dt + delta
+    return (dt.astimezone(UTC) + delta).astimezone(dt.tzinfo)
+
+
+class Clock(Protocol):
+    """
+    Time source used by the streamer, state seeding and the console UI.
+    """
+
+    def now(self, use_utc: bool) -> datetime: ...
+
+    def sleep(self, seconds: float) -> None: ...
+
+
+@dataclass
+class SystemClock:
+    """
+    Host wall clock (the default).
+    """
+
+    def now(self, use_utc: bool) -> datetime:
+        return now_dt(use_utc)
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+
+@dataclass
+class FixedOffsetClock:
+    """
+    Another clock shifted by a constant offset (e.g. to start a few minutes
+    before a DST switch while still running in realtime).
+    """
+    offset: timedelta
+    base: Clock = field(default_factory=SystemClock)
+
+    def now(self, use_utc: bool) -> datetime:
+        return add_elapsed(self.base.now(use_utc), self.offset)
+
+    def sleep(self, seconds: float) -> None:
+        self.base.sleep(seconds)
+
+
+class VirtualClock:
+    """
+    Virtual time starting at `start`.
+
+    With `rate == 0` time only moves through `advance()` and `sleep()`, which
+    makes replays fully deterministic. With `rate > 0` time also runs at
+    `rate` times realtime (accelerated soak tests).
+    """
+
+    def __init__(self, start: datetime, rate: float = 0.0):
+        if rate < 0.0:
+            raise ValueError("rate must be >= 0")
+        if start.tzinfo is None:
+            # Treat naive datetimes as system local wall time, like the encoder does.
+            start = start.astimezone()
+        self._tz = start.tzinfo
+        self._start_utc = start.astimezone(UTC)
+        self._elapsed = 0.0
+        self._rate = float(rate)
+        self._origin = time.monotonic()
+        self._lock = threading.Lock()
+
+    def elapsed(self) -> float:
+        with self._lock:
+            elapsed = self._elapsed
+            if self._rate > 0.0:
+                elapsed += (time.monotonic() - self._origin) * self._rate
+            return elapsed
+
+    def advance(self, seconds: float) -> None:
+        with self._lock:
+            self._elapsed += seconds
+
+    def now(self, use_utc: bool) -> datetime:
+        current = self._start_utc + timedelta(seconds=self.elapsed())
+        return current if use_utc else current.astimezone(self._tz)
+
+    def sleep(self, seconds: float) -> None:
+        if self._rate > 0.0:
+            time.sleep(seconds / self._rate)
+        else:
+            self.advance(seconds)
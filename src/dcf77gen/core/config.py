@@ -11,6 +11,8 @@ class GeneratorConfig:
     utc: bool = False
     offset: int = 0  # seconds offset
     low_factor: float = 0.15
+    # Emit an in-band tone whose DAC image lands on `frequency` (undersampling).
+    image_mode: bool = False
 
     # Keep the same 100 ms block policy initially: blocksize = samplerate // 10
     latency: str = "low"
@@ -25,5 +27,31 @@ class GeneratorConfig:
             raise ValueError("low_factor must be in [0, 1]")
         if self.offset < 0 or self.offset > 59:
             raise ValueError("offset must be in range 0..59")
-        if self.frequency >= self.samplerate / 2:
-            raise ValueError("frequency must be below Nyquist (samplerate / 2)")
+        if not self.image_mode:
+            if self.frequency >= self.samplerate / 2:
+                raise ValueError("frequency must be below Nyquist (samplerate / 2)")
+            return
+        if self.frequency <= self.samplerate / 2:
+            raise ValueError("image mode requires frequency above Nyquist (samplerate / 2); use direct mode")
+        tone = self.tone_frequency
+        if tone <= 0.0 or tone >= self.samplerate / 2:
+            raise ValueError("frequency aliases onto DC or Nyquist at this samplerate; choose another samplerate")
+
+    @property
+    def tone_frequency(self) -> float:
+        """
+        Frequency actually synthesized. In image mode this is the baseband tone
+        `f0` in (0, samplerate / 2) with `frequency = k * samplerate +/- f0`,
+        e.g. 18.5 kHz for a 77.5 kHz carrier at 96 kHz or 48 kHz.
+        """
+        if not self.image_mode:
+            return self.frequency
+        tone = self.frequency % self.samplerate
+        return self.samplerate - tone if tone > self.samplerate / 2 else tone
+
+    @property
+    def image_order(self) -> int:
+        # Multiple of samplerate the target image sits next to (0 in direct mode).
+        if not self.image_mode:
+            return 0
+        return int(round(self.frequency / self.samplerate))
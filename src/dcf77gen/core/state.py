@@ -3,6 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime
 
+from dcf77gen.core.clock import Clock
+
 
 @dataclass
 class GeneratorState:
@@ -25,11 +27,22 @@ class GeneratorState:
     def count_deci(self, value: int) -> None:
         self.count_dec = value
 
+    @property
+    def slot(self) -> int:
+        # Index into the 600-entry per-minute amplitude schedule.
+        return self.count_sec * 10 + self.count_dec
+
     def seed_from_wallclock(self, now: datetime, offset_s: int) -> None:
         # Keep alignment with second + offset and 100 ms sub-second tick.
         self.count_sec = (now.second + offset_s) % 60
         self.count_deci = int(now.microsecond // 1e5)
 
+    def seed_from_clock(self, clock: Clock, use_utc: bool, offset_s: int) -> datetime:
+        # Sample the clock once and seed from it; returns the sampled time.
+        now = clock.now(use_utc)
+        self.seed_from_wallclock(now, offset_s)
+        return now
+
     def advance_block(self) -> None:
         # Advance one 100 ms audio block.
         self.count_deci += 1
@@ -0,0 +1,370 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta, UTC
+import os
+import threading
+import time
+
+from dcf77gen.core.clock import Clock, SystemClock
+
+
+@dataclass(frozen=True)
+class TimeEvent:
+    """
+    One input from a time source: an NMEA time fix or a PPS edge, stamped
+    with `time.monotonic()` seconds.
+    """
+    kind: str  # "nmea" or "pps"
+    monotonic: float
+    utc: datetime | None = None
+
+
+def _nmea_checksum_ok(sentence: str) -> bool:
+    if "*" not in sentence:
+        return False
+    body, _, checksum = sentence.lstrip("$!").partition("*")
+    calc = 0
+    for ch in body:
+        calc ^= ord(ch)
+    try:
+        return calc == int(checksum[:2], 16)
+    except ValueError:
+        return False
+
+
+def _nmea_hms(field: str) -> tuple[int, int, int, int]:
+    hh, mm, ss = int(field[0:2]), int(field[2:4]), int(field[4:6])
+    frac = field[6:]
+    micro = int(round(float(frac) * 1e6)) if frac.startswith(".") and len(frac) > 1 else 0
+    return hh, mm, ss, micro
+
+
+def parse_nmea_time(sentence: str) -> datetime | None:
+    """
+    Returns the UTC time carried by an RMC or ZDA sentence (any talker ID),
+    or None for other, invalid or checksum-failing sentences.
+    """
+    sentence = sentence.strip()
+    if not sentence.startswith("$") or not _nmea_checksum_ok(sentence):
+        return None
+    fields = sentence[1:].split("*", 1)[0].split(",")
+    kind = fields[0][2:]
+    try:
+        if kind == "RMC" and len(fields) >= 10:
+            if fields[2] != "A" or not fields[1] or len(fields[9]) != 6:
+                return None
+            hh, mm, ss, micro = _nmea_hms(fields[1])
+            day, month, yy = int(fields[9][0:2]), int(fields[9][2:4]), int(fields[9][4:6])
+            return datetime(2000 + yy, month, day, hh, mm, ss, micro, tzinfo=UTC)
+        if kind == "ZDA" and len(fields) >= 5:
+            if not fields[1] or not fields[4]:
+                return None
+            hh, mm, ss, micro = _nmea_hms(fields[1])
+            return datetime(int(fields[4]), int(fields[3]), int(fields[2]), hh, mm, ss, micro, tzinfo=UTC)
+    except ValueError:
+        return None
+    return None
+
+
+def _event_from_line(line: str, monotonic: float) -> TimeEvent | None:
+    line = line.strip()
+    if line.startswith("PPS"):
+        # "PPS" (stamped on arrival) or "PPS <monotonic seconds>" from an external stamper.
+        parts = line.split()
+        return TimeEvent("pps", float(parts[1]) if len(parts) > 1 else monotonic)
+    utc = parse_nmea_time(line)
+    return TimeEvent("nmea", monotonic, utc) if utc is not None else None
+
+
+def _read_lines(fd: int, stop: threading.Event) -> Iterator[tuple[float, str]]:
+    buf = b""
+    while not stop.is_set():
+        chunk = os.read(fd, 256)
+        stamp = time.monotonic()
+        if not chunk:
+            return
+        buf += chunk
+        while b"\n" in buf:
+            raw, buf = buf.split(b"\n", 1)
+            yield stamp, raw.decode("ascii", errors="replace")
+
+
+def _configure_serial(fd: int, baudrate: int) -> None:
+    import termios
+
+    attrs = termios.tcgetattr(fd)
+    speed = getattr(termios, f"B{baudrate}", None)
+    if speed is None:
+        raise ValueError(f"unsupported serial baudrate {baudrate}")
+    attrs[0] = 0                                                        # iflag
+    attrs[1] = 0                                                        # oflag
+    attrs[2] = termios.CS8 | termios.CREAD | termios.CLOCAL             # cflag
+    attrs[3] = 0                                                        # lflag (raw)
+    attrs[4] = speed
+    attrs[5] = speed
+    attrs[6][termios.VMIN] = 1
+    attrs[6][termios.VTIME] = 0
+    termios.tcsetattr(fd, termios.TCSANOW, attrs)
+
+
+def _dcd_edges(fd: int, stop: threading.Event) -> Iterator[float]:
+    # PPS wired to DCD: block in TIOCMIWAIT and stamp rising edges.
+    import fcntl
+    import struct
+    import termios
+
+    while not stop.is_set():
+        fcntl.ioctl(fd, termios.TIOCMIWAIT, termios.TIOCM_CD)
+        stamp = time.monotonic()
+        status = struct.unpack("I", fcntl.ioctl(fd, termios.TIOCMGET, struct.pack("I", 0)))[0]
+        if status & termios.TIOCM_CD:
+            yield stamp
+
+
+def _parse_spec(spec: str) -> tuple[str, str, str | None]:
+    kind, sep, rest = spec.partition(":")
+    if not sep or kind not in ("serial", "fifo", "replay"):
+        raise ValueError("time source must be serial:DEVICE[@BAUD], fifo:PATH or replay:PATH[@SPEED]")
+    path, _, option = rest.partition("@")
+    if not path:
+        raise ValueError("time source path cannot be empty")
+    return kind, path, option or None
+
+
+class DisciplinedClock:
+    """
+    Clock disciplined by NMEA time and (optionally) PPS edges.
+
+    An NMEA fix arriving within one second after a PPS edge is taken as the
+    time of that edge (the usual receiver convention), anchoring UTC to a
+    monotonic timestamp with PPS precision. Without PPS the sentence arrival
+    time is used (tens of ms). Between anchors time runs on the monotonic
+    clock; without a fresh anchor (`holdover_s`) the fallback clock is used.
+    """
+
+    def __init__(self, fallback: Clock | None = None, holdover_s: float = 60.0, smoothing: float = 0.1):
+        self.fallback = fallback if fallback is not None else SystemClock()
+        self.holdover_s = float(holdover_s)
+        self.smoothing = float(smoothing)
+        self._lock = threading.Lock()
+        self._last_pps: float | None = None
+        self._anchor: tuple[float, datetime] | None = None
+        self._source = "none"
+        self._offset_s: float | None = None
+
+    def on_event(self, event: TimeEvent) -> None:
+        if event.kind == "pps":
+            with self._lock:
+                self._last_pps = event.monotonic
+            return
+        if event.utc is None:
+            return
+        with self._lock:
+            pps = self._last_pps
+            if pps is not None and 0.0 <= event.monotonic - pps < 1.0:
+                self._anchor = (pps, event.utc)
+                self._source = "pps"
+            else:
+                self._anchor = (event.monotonic, event.utc)
+                self._source = "nmea"
+            # System clock minus disciplined time at the anchor instant.
+            anchor_mono, anchor_utc = self._anchor
+            system_at_anchor = time.time() - (time.monotonic() - anchor_mono)
+            offset = system_at_anchor - anchor_utc.timestamp()
+            if self._offset_s is None:
+                self._offset_s = offset
+            else:
+                self._offset_s += self.smoothing * (offset - self._offset_s)
+
+    def _utc_now(self) -> datetime | None:
+        with self._lock:
+            anchor = self._anchor
+        if anchor is None:
+            return None
+        elapsed = time.monotonic() - anchor[0]
+        if elapsed > self.holdover_s:
+            return None
+        return anchor[1] + timedelta(seconds=elapsed)
+
+    @property
+    def locked(self) -> bool:
+        return self._utc_now() is not None
+
+    @property
+    def source(self) -> str:
+        return self._source if self.locked else "holdover expired" if self._anchor else "none"
+
+    @property
+    def offset_s(self) -> float | None:
+        """
+        Smoothed offset of the system clock against the disciplined time
+        (positive: system clock ahead).
+        """
+        return self._offset_s
+
+    def now(self, use_utc: bool) -> datetime:
+        utc = self._utc_now()
+        if utc is None:
+            return self.fallback.now(use_utc)
+        return utc if use_utc else utc.astimezone()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+    def describe(self) -> str:
+        offset = self.offset_s
+        offset_str = "n/a" if offset is None else f"{offset * 1e3:+.3f} ms"
+        return f"source={self.source}, system clock offset={offset_str}"
+
+
+class TimeSourceReader:
+    """
+    Background reader feeding `TimeEvent`s from a source spec into a clock.
+
+    Specs:
+      serial:/dev/ttyACM0[@9600]  NMEA over serial; PPS on DCD with `pps_dcd`
+      fifo:/run/gps.fifo          NMEA and "PPS [monotonic]" lines
+      replay:/path/capture.txt    "<seconds> <NMEA|PPS>" lines, replayed in
+                                  real time (`@SPEED` to accelerate)
+
+    `start()` never blocks: a FIFO is opened on the reader thread (opening
+    waits for a writer) and reopened whenever its writer goes away, with
+    `error` describing the loss until a writer is back.
+    """
+
+    def __init__(self, spec: str, clock: DisciplinedClock, *, pps_dcd: bool = False):
+        self.kind, self.path, self.option = _parse_spec(spec)
+        if pps_dcd and self.kind != "serial":
+            raise ValueError("PPS on DCD requires a serial time source")
+        self.clock = clock
+        self.pps_dcd = pps_dcd
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._fd: int | None = None
+        self._fd_lock = threading.Lock()
+        self.error: str | None = None
+
+    def _feed(self, event: TimeEvent | None) -> None:
+        if event is not None:
+            self.clock.on_event(event)
+
+    def _open_serial(self) -> int:
+        # O_NONBLOCK so the open cannot wait for carrier; reads block again.
+        fd = os.open(self.path, os.O_RDONLY | os.O_NOCTTY | os.O_NONBLOCK)
+        try:
+            os.set_blocking(fd, True)
+            if os.isatty(fd):
+                _configure_serial(fd, int(self.option or 9600))
+        except (OSError, ValueError):
+            os.close(fd)
+            raise
+        return fd
+
+    def _release_fd(self, fd: int) -> None:
+        with self._fd_lock:
+            if self._fd != fd:
+                return  # already closed by stop()
+            self._fd = None
+        os.close(fd)
+
+    def _run_lines(self) -> None:
+        try:
+            while not self._stop.is_set():
+                fd = self._fd
+                if fd is None:
+                    # Blocks until a writer opens the FIFO.
+                    fd = os.open(self.path, os.O_RDONLY)
+                    with self._fd_lock:
+                        if self._stop.is_set():
+                            os.close(fd)
+                            return
+                        self._fd = fd
+                    self.error = None
+                for stamp, line in _read_lines(fd, self._stop):
+                    self._feed(_event_from_line(line, stamp))
+                if self._stop.is_set():
+                    return
+                if self.kind != "fifo":
+                    self.error = f"{self.path}: end of input"
+                    return
+                # The writer (gpsd, a feeder script) went away; wait for it to come back.
+                self.error = f"{self.path}: writer closed, waiting for it to reopen"
+                self._release_fd(fd)
+        except (OSError, ValueError) as exc:
+            if not self._stop.is_set():
+                self.error = str(exc)
+
+    def _run_dcd(self) -> None:
+        try:
+            for stamp in _dcd_edges(self._fd, self._stop):
+                self._feed(TimeEvent("pps", stamp))
+        except OSError as exc:
+            self.error = f"PPS/DCD: {exc}"
+
+    def _run_replay(self) -> None:
+        speed = float(self.option) if self.option else 1.0
+        try:
+            with open(self.path, encoding="ascii", errors="replace") as fh:
+                t0: float | None = None
+                start = time.monotonic()
+                for line in fh:
+                    stamp_str, _, payload = line.strip().partition(" ")
+                    if not payload:
+                        continue
+                    t = float(stamp_str)
+                    t0 = t if t0 is None else t0
+                    due = start + (t - t0) / speed
+                    while not self._stop.is_set() and time.monotonic() < due:
+                        time.sleep(min(0.05, max(0.0, due - time.monotonic())))
+                    if self._stop.is_set():
+                        return
+                    self._feed(_event_from_line(payload, due))
+        except (OSError, ValueError) as exc:
+            self.error = str(exc)
+
+    def start(self) -> None:
+        self._stop.clear()
+        targets = []
+        if self.kind == "replay":
+            targets.append(self._run_replay)
+        else:
+            if self.kind == "serial":
+                self._fd = self._open_serial()
+            else:
+                os.stat(self.path)  # fail fast on a missing FIFO
+            targets.append(self._run_lines)
+            if self.pps_dcd:
+                targets.append(self._run_dcd)
+        self._threads = [threading.Thread(target=t, daemon=True, name="dcf77gen-timesource") for t in targets]
+        for t in self._threads:
+            t.start()
+
+    def stop(self) -> None:
+        # Reader threads may be blocked in read()/ioctl(); they are daemons and
+        # exit with the process, so only signal and close here.
+        self._stop.set()
+        with self._fd_lock:
+            fd, self._fd = self._fd, None
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        if self.kind == "fifo":
+            # Release a reader thread still waiting in open() for a writer.
+            try:
+                os.close(os.open(self.path, os.O_WRONLY | os.O_NONBLOCK))
+            except OSError:
+                pass
+
+    def wait_for_lock(self, timeout_s: float) -> bool:
+        deadline = time.monotonic() + timeout_s
+        while time.monotonic() < deadline:
+            if self.clock.locked:
+                return True
+            if self.error is not None:
+                return False
+            time.sleep(0.05)
+        return self.clock.locked
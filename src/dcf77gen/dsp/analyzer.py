@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+import math
+from pathlib import Path
+import wave
+import numpy as np
+
+# Envelope resolution: 1 ms complex baseband bins, 10 ms amplitude bins.
+_IQ_BIN_S = 0.001
+_ENV_BINS_PER_IQ = 10
+# Amplitude statistics are taken over one second of envelope (one DCF77 pulse).
+_ENV_WINDOW = 100
+
+
+def _fold(freq: float, samplerate: float) -> float:
+    # Frequency a component at `freq` appears at after sampling at `samplerate`.
+    f = math.fmod(freq, samplerate)
+    return samplerate - f if f > samplerate / 2 else f
+
+
+def _db(ratio: float) -> float:
+    return 10.0 * math.log10(max(ratio, 1e-30))
+
+
+@dataclass(frozen=True)
+class SignalQualityReport:
+    """
+    Carrier purity and modulation depth of an analyzed signal.
+
+    Levels are in dB relative to the carrier power (dBc) unless noted.
+    """
+    samplerate: int
+    seconds: float
+    carrier_hz: float
+    measured_carrier_hz: float
+    carrier_dbfs: float
+    harmonics: tuple[tuple[int, float, bool, float], ...]  # (order, frequency, aliased, dBc)
+    worst_spur: tuple[float, float]                        # (frequency, dBc) outside the modulation band
+    low_high_ratio: float                                  # NaN without detected pulses
+    expected_low_factor: float | None
+    pulses: int
+
+    @property
+    def frequency_error_hz(self) -> float:
+        return self.measured_carrier_hz - self.carrier_hz
+
+    def format(self) -> str:
+        lines = []
+        lines.append(f"analyzed: {self.seconds:.1f} s at {self.samplerate} Hz")
+        err_ppm = self.frequency_error_hz / self.carrier_hz * 1e6 if self.carrier_hz else math.nan
+        lines.append(
+            f"carrier: {self.measured_carrier_hz:.4f} Hz (error {self.frequency_error_hz:+.4f} Hz, "
+            f"{err_ppm:+.2f} ppm), level {self.carrier_dbfs:+.1f} dBFS"
+        )
+        for order, freq, aliased, level in self.harmonics:
+            kind = "alias" if aliased else "harmonic"
+            lines.append(f"  {kind} H{order}: {freq:.1f} Hz {level:+.1f} dBc")
+        lines.append(f"worst spur: {self.worst_spur[0]:.1f} Hz {self.worst_spur[1]:+.1f} dBc")
+        if math.isnan(self.low_high_ratio):
+            lines.append("low/high amplitude ratio: n/a (no pulses detected)")
+        else:
+            expected = "" if self.expected_low_factor is None else f" (low_factor {self.expected_low_factor:g})"
+            lines.append(f"low/high amplitude ratio: {self.low_high_ratio:.4f} over {self.pulses} s{expected}")
+        return "\n".join(lines)
+
+
+class StreamingSignalAnalyzer:
+    """
+    Chunk-streaming signal-quality analyzer with bounded memory.
+
+    `feed()` accepts chunks of any length. Only the Welch accumulator (one
+    spectrum), a segment tail, a partial baseband bin and at most one second
+    of envelope are kept between chunks, so hours of audio can be analyzed.
+    The PSD uses Hann-windowed segments with 50 % overlap. The carrier is
+    mixed to complex baseband in 1 ms bins. The frequency error comes from the
+    accumulated phase rotation between bins, which does not depend on
+    amplitude. The envelope gives the low/high ratio per one-second window.
+    """
+
+    def __init__(
+        self,
+        samplerate: int,
+        carrier_hz: float,
+        *,
+        low_factor: float | None = None,
+        nperseg: int = 16384,
+        harmonics: int = 5,
+        modulation_band_hz: float = 500.0,
+    ):
+        if nperseg < 256 or nperseg & (nperseg - 1):
+            raise ValueError("nperseg must be a power of two >= 256")
+        if not 0.0 < carrier_hz < samplerate / 2:
+            raise ValueError("carrier must lie between 0 and Nyquist of the analyzed signal")
+        self.samplerate = int(samplerate)
+        self.carrier_hz = float(carrier_hz)
+        self.low_factor = low_factor
+        self.nperseg = int(nperseg)
+        self.harmonics = int(harmonics)
+        self.modulation_band_hz = float(modulation_band_hz)
+        self._hop = self.nperseg // 2
+        self._window = np.hanning(self.nperseg).astype(np.float32)
+        self._psd_sum = np.zeros(self.nperseg // 2 + 1, dtype=np.float64)
+        self._segments = 0
+        self._seg_tail = np.zeros(0, dtype=np.float32)
+        self._iq_bin = max(1, int(round(_IQ_BIN_S * self.samplerate)))
+        # Mixing within a bin is a dot product with a fixed local-oscillator
+        # vector; only the per-bin start phase needs a complex exponential.
+        self._omega = 2.0 * np.pi * self.carrier_hz / self.samplerate
+        lo = np.exp(-1j * self._omega * np.arange(self._iq_bin)) / self._iq_bin
+        self._lo_re = lo.real.astype(np.float32)
+        self._lo_im = lo.imag.astype(np.float32)
+        self._iq_tail = np.zeros(0, dtype=np.float32)
+        self._iq_tail_start = 0
+        self._last_z: complex | None = None
+        self._rotation = 0j
+        self._env_iq: list[np.ndarray] = []
+        self._env_pending = np.zeros(0, dtype=np.float64)
+        self._low_sum = 0.0
+        self._high_sum = 0.0
+        self._pulses = 0
+        self._frames = 0
+
+    # -- streaming -----------------------------------------------------------
+
+    def feed(self, chunk: np.ndarray) -> None:
+        x = np.asarray(chunk, dtype=np.float32).reshape(-1)
+        if len(x) == 0:
+            return
+        self._feed_welch(x)
+        self._feed_baseband(x)
+        self._frames += len(x)
+
+    def _feed_welch(self, x: np.ndarray) -> None:
+        buf = np.concatenate((self._seg_tail, x))
+        count = 0 if len(buf) < self.nperseg else (len(buf) - self.nperseg) // self._hop + 1
+        if count:
+            segs = np.lib.stride_tricks.sliding_window_view(buf, self.nperseg)[:: self._hop][:count]
+            spectra = np.fft.rfft(segs * self._window, axis=1)
+            self._psd_sum += np.sum(spectra.real**2 + spectra.imag**2, axis=0)
+            self._segments += count
+        self._seg_tail = buf[count * self._hop :].copy()
+
+    def _feed_baseband(self, x: np.ndarray) -> None:
+        buf = np.concatenate((self._iq_tail, x))
+        start = self._iq_tail_start
+        bins = len(buf) // self._iq_bin
+        used = bins * self._iq_bin
+        if bins:
+            frames = buf[:used].reshape(bins, self._iq_bin)
+            rot = np.exp(-1j * self._omega * (start + self._iq_bin * np.arange(bins, dtype=np.float64)))
+            z = rot * (frames @ self._lo_re + 1j * (frames @ self._lo_im))
+            if self._last_z is not None:
+                self._rotation += z[0] * np.conj(self._last_z)
+            self._rotation += np.sum(z[1:] * np.conj(z[:-1]))
+            self._last_z = complex(z[-1])
+            self._feed_envelope(np.abs(z))
+        self._iq_tail = buf[used:].copy()
+        self._iq_tail_start = start + used
+
+    def _feed_envelope(self, mag: np.ndarray) -> None:
+        pending = np.concatenate((self._env_pending, mag))
+        k = len(pending) // _ENV_BINS_PER_IQ
+        env = pending[: k * _ENV_BINS_PER_IQ].reshape(k, _ENV_BINS_PER_IQ).mean(axis=1)
+        self._env_pending = pending[k * _ENV_BINS_PER_IQ :]
+        if len(env):
+            self._env_iq.append(env)
+        total = sum(len(e) for e in self._env_iq)
+        if total < _ENV_WINDOW:
+            return
+        env = np.concatenate(self._env_iq)
+        windows = len(env) // _ENV_WINDOW
+        w = env[: windows * _ENV_WINDOW].reshape(windows, _ENV_WINDOW)
+        high = np.median(w, axis=1)
+        low = np.percentile(w, 5, axis=1)
+        # Second 59 carries no pulse; skip windows without a clear dip.
+        pulsed = (high > 0.0) & (low < 0.9 * high)
+        self._low_sum += float(low[pulsed].sum())
+        self._high_sum += float(high[pulsed].sum())
+        self._pulses += int(pulsed.sum())
+        self._env_iq = [env[windows * _ENV_WINDOW :]]
+
+    # -- results -------------------------------------------------------------
+
+    def psd(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns `(frequencies, one-sided power spectral density)` in units²/Hz.
+        """
+        freqs = np.fft.rfftfreq(self.nperseg, d=1.0 / self.samplerate)
+        if self._segments == 0:
+            return freqs, np.zeros_like(self._psd_sum)
+        scale = 1.0 / (self.samplerate * float(np.sum(self._window.astype(np.float64) ** 2)) * self._segments)
+        psd = self._psd_sum * scale
+        psd[1:-1] *= 2.0
+        return freqs, psd
+
+    def report(self) -> SignalQualityReport:
+        if self._segments == 0:
+            raise ValueError(f"need at least {self.nperseg} samples for a PSD estimate")
+        freqs, psd = self.psd()
+        df = freqs[1]
+        lobe = 4  # Hann main lobe half-width in bins, with margin
+
+        def band_power(freq: float) -> tuple[float, int]:
+            centre = int(round(freq / df))
+            lo, hi = max(0, centre - lobe), min(len(psd), centre + lobe + 1)
+            peak = lo + int(np.argmax(psd[lo:hi]))
+            lo, hi = max(0, peak - lobe), min(len(psd), peak + lobe + 1)
+            return float(np.sum(psd[lo:hi]) * df), peak
+
+        dt = self._iq_bin / self.samplerate
+        measured = self.carrier_hz
+        if self._rotation != 0j:
+            measured += float(np.angle(self._rotation)) / (2.0 * np.pi * dt)
+
+        carrier_power, carrier_bin = band_power(measured)
+        harmonics = []
+        for order in range(2, self.harmonics + 1):
+            raw = order * measured
+            folded = _fold(raw, self.samplerate)
+            power, _ = band_power(folded)
+            harmonics.append((order, folded, raw > self.samplerate / 2, _db(power / carrier_power)))
+
+        # Keying sidebands around the carrier are the modulation, not spurs.
+        band = max(lobe, int(self.modulation_band_hz / df))
+        masked = psd.copy()
+        masked[: lobe + 1] = 0.0
+        masked[max(0, carrier_bin - band) : carrier_bin + band + 1] = 0.0
+        spur_bin = int(np.argmax(masked))
+        lo, hi = max(0, spur_bin - lobe), min(len(psd), spur_bin + lobe + 1)
+        spur_power = float(np.sum(masked[lo:hi]) * df)
+
+        return SignalQualityReport(
+            samplerate=self.samplerate,
+            seconds=self._frames / self.samplerate,
+            carrier_hz=self.carrier_hz,
+            measured_carrier_hz=measured,
+            carrier_dbfs=_db(2.0 * carrier_power),  # sine power A²/2 -> peak amplitude
+            harmonics=tuple(harmonics),
+            worst_spur=(float(freqs[spur_bin]), _db(spur_power / carrier_power)),
+            low_high_ratio=self._low_sum / self._high_sum if self._pulses else math.nan,
+            expected_low_factor=self.low_factor,
+            pulses=self._pulses,
+        )
+
+
+def iter_wav_chunks(path: str | Path, chunk_s: float = 1.0) -> tuple[int, Iterator[np.ndarray]]:
+    """
+    Opens an integer PCM WAV file and returns `(samplerate, chunks)`; chunks
+    are float32 in [-1, 1) from the first channel, read lazily.
+    """
+    wav = wave.open(str(path), "rb")
+    samplerate = wav.getframerate()
+    width = wav.getsampwidth()
+    channels = wav.getnchannels()
+    if width not in (1, 2, 3, 4):
+        wav.close()
+        raise ValueError(f"unsupported WAV sample width {width}")
+    chunk_frames = max(1, int(chunk_s * samplerate))
+
+    def chunks() -> Iterator[np.ndarray]:
+        with wav:
+            while True:
+                raw = wav.readframes(chunk_frames)
+                if not raw:
+                    return
+                if width == 3:
+                    b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+                    data = (b[:, 0].astype(np.int32) | (b[:, 1].astype(np.int32) << 8) | (b[:, 2].astype(np.int32) << 16))
+                    data = np.where(data >= 1 << 23, data - (1 << 24), data)
+                elif width == 1:
+                    data = np.frombuffer(raw, dtype=np.uint8).astype(np.int32) - 128
+                else:
+                    data = np.frombuffer(raw, dtype=f"<i{width}")
+                samples = data.reshape(-1, channels)[:, 0]
+                yield (samples / float(1 << (8 * width - 1))).astype(np.float32)
+
+    return samplerate, chunks()
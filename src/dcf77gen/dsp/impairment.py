@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, replace
+import math
+import numpy as np
+
+from dcf77gen.core.config import GeneratorConfig
+
+# Impulses are exponentially decaying clicks, like switching transients.
+_IMPULSE_DECAY_S = 0.0002
+# Impulse arrivals are drawn in fixed-size batches so chunking does not change them.
+_IMPULSE_BATCH = 64
+# Slow fading is a sum of sinusoids around 1 / fading_period_s.
+_FADING_TONES = 4
+
+
+@dataclass(frozen=True)
+class ImpairmentConfig:
+    """
+    Channel impairments applied after rendering; everything defaults to off.
+
+    Noise and impulse levels are relative to the unmodulated carrier
+    (`reference_amplitude` of the stage), fading is a random slow gain
+    between 0 dB and `-fading_depth_db`, and `edge_jitter_s` is the standard
+    deviation of an independent shift of every 100 ms slot boundary.
+    """
+    snr_db: float | None = None
+    fading_depth_db: float = 0.0
+    fading_period_s: float = 30.0
+    impulse_rate_hz: float = 0.0
+    impulse_level: float = 1.0
+    carrier_offset_hz: float = 0.0
+    edge_jitter_s: float = 0.0
+    seed: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.fading_depth_db < 0.0:
+            raise ValueError("fading_depth_db must be >= 0")
+        if self.fading_period_s <= 0.0:
+            raise ValueError("fading_period_s must be > 0")
+        if self.impulse_rate_hz < 0.0:
+            raise ValueError("impulse_rate_hz must be >= 0")
+        if self.impulse_level < 0.0:
+            raise ValueError("impulse_level must be >= 0")
+        if self.edge_jitter_s < 0.0:
+            raise ValueError("edge_jitter_s must be >= 0")
+
+    @property
+    def enabled(self) -> bool:
+        return (
+            self.snr_db is not None
+            or self.fading_depth_db > 0.0
+            or self.impulse_rate_hz > 0.0
+            or self.carrier_offset_hz != 0.0
+            or self.edge_jitter_s > 0.0
+        )
+
+    def describe(self) -> str:
+        parts = []
+        if self.snr_db is not None:
+            parts.append(f"SNR {self.snr_db:g} dB")
+        if self.fading_depth_db > 0.0:
+            parts.append(f"fading {self.fading_depth_db:g} dB/{self.fading_period_s:g} s")
+        if self.impulse_rate_hz > 0.0:
+            parts.append(f"impulses {self.impulse_rate_hz:g}/s at {self.impulse_level:g}x")
+        if self.carrier_offset_hz != 0.0:
+            parts.append(f"carrier offset {self.carrier_offset_hz:+g} Hz")
+        if self.edge_jitter_s > 0.0:
+            parts.append(f"edge jitter {self.edge_jitter_s * 1e3:g} ms rms")
+        if not parts:
+            return "none"
+        seed = "random" if self.seed is None else str(self.seed)
+        return ", ".join(parts) + f" (seed {seed})"
+
+
+def _baseband_lowpass(samplerate: int, carrier_hz: float) -> np.ndarray:
+    # Mixing a real carrier to DC leaves an image at -2 * carrier (folded);
+    # cut off halfway and stop before it with a Blackman-windowed sinc.
+    image = math.fmod(2.0 * carrier_hz, samplerate)
+    image = min(image, samplerate - image)
+    taps = int(math.ceil(11.0 * samplerate / image)) | 1
+    taps = min(taps, (samplerate // 5) | 1)
+    cutoff = 0.5 * image / samplerate
+    k = np.arange(taps) - (taps - 1) / 2
+    h = 2.0 * cutoff * np.sinc(2.0 * cutoff * k) * np.blackman(taps)
+    return h / h.sum()
+
+
+class ChannelImpairment:
+    """
+    Seedable, vectorized, chunk-streaming channel impairment stage.
+
+    Chained after rendering: `process()` takes chunks of any length and
+    `flush()` returns whatever is still held back, so the impaired signal
+    has exactly the input's length. Every impairment draws from its own
+    random stream in signal order, so for a given seed the result does not
+    depend on chunking.
+
+    Carrier offset and edge jitter re-synthesize the signal from its complex
+    baseband envelope: the input is mixed down, low-pass filtered (FFT
+    overlap-save FIR), delayed per slot boundary by linear interpolation and
+    mixed back up at the offset carrier, so edges move without carrier
+    phase steps. Boundaries are assumed on the 100 ms grid starting at the
+    first sample, as `OfflineRenderer` emits them. This path holds back
+    `delay_frames` samples (filter group delay plus the largest edge shift).
+    """
+
+    def __init__(
+        self,
+        config: ImpairmentConfig,
+        samplerate: int,
+        carrier_hz: float,
+        *,
+        reference_amplitude: float = 1.0,
+    ):
+        if not 0.0 < carrier_hz < samplerate / 2:
+            raise ValueError("carrier_hz must be between 0 and Nyquist")
+        self.config = config
+        self.samplerate = int(samplerate)
+        self.carrier_hz = float(carrier_hz)
+        self.blocksize = self.samplerate // 10
+        noise_rng, impulse_rng, jitter_rng, fading_rng = (
+            np.random.default_rng(seq) for seq in np.random.SeedSequence(config.seed).spawn(4)
+        )
+        self._noise_rng = noise_rng
+        self._impulse_rng = impulse_rng
+        self._jitter_rng = jitter_rng
+
+        self._noise_sigma: float | None = None
+        if config.snr_db is not None:
+            self._noise_sigma = reference_amplitude / math.sqrt(2.0) * 10.0 ** (-config.snr_db / 20.0)
+
+        self._fading_w = 2 * np.pi * fading_rng.uniform(0.5, 1.5, _FADING_TONES) / config.fading_period_s
+        self._fading_phase = fading_rng.uniform(0.0, 2 * np.pi, _FADING_TONES)
+
+        self._impulse_kernel = np.exp(
+            -np.arange(max(1, int(math.ceil(5 * _IMPULSE_DECAY_S * self.samplerate))))
+            / (_IMPULSE_DECAY_S * self.samplerate)
+        )
+        self._impulse_peak = config.impulse_level * reference_amplitude
+        self._impulse_pos = np.zeros(0)
+        self._impulse_amp = np.zeros(0)
+        self._impulse_last = 0.0
+        self._impulse_tail = np.zeros(len(self._impulse_kernel) - 1)
+
+        self._resynth = config.carrier_offset_hz != 0.0 or config.edge_jitter_s > 0.0
+        self.delay_frames = 0
+        self._in_pos = 0
+        self._out_pos = 0
+        if self._resynth:
+            self._fir = _baseband_lowpass(self.samplerate, self.carrier_hz)
+            self._fir_tail = np.zeros(len(self._fir) - 1, dtype=np.complex128)
+            self._fft_size = max(1024, 1 << (8 * (len(self._fir) - 1)).bit_length())
+            self._fir_spectrum = np.fft.fft(self._fir, self._fft_size)
+            self._phasor_tables: dict[float, np.ndarray] = {}
+            group_delay = (len(self._fir) - 1) // 2
+            self._max_shift = 0
+            if config.edge_jitter_s > 0.0:
+                self._max_shift = min(self.blocksize // 4, int(math.ceil(4 * config.edge_jitter_s * self.samplerate)))
+            self.delay_frames = group_delay + self._max_shift + 1
+            # Baseband samples for input indices [_bb_start, _bb_start + len(_bb)).
+            self._bb = np.zeros(0, dtype=np.complex128)
+            self._bb_start = -group_delay
+            self._jitter = np.zeros(0)
+            self._jitter_start = 0
+
+    @classmethod
+    def for_config(
+        cls,
+        impairments: ImpairmentConfig,
+        config: GeneratorConfig,
+        *,
+        reference_amplitude: float | None = None,
+    ) -> ChannelImpairment:
+        """
+        Stage for the signal rendered from `config`; levels are relative to
+        `config.amplitude` unless `reference_amplitude` is given. In image
+        mode the carrier offset is applied to the target image, which moves
+        opposite to the synthesized tone when it sits below a multiple of
+        the samplerate.
+        """
+        if config.image_mode and math.fmod(config.frequency, config.samplerate) > config.samplerate / 2:
+            impairments = replace(impairments, carrier_offset_hz=-impairments.carrier_offset_hz)
+        if reference_amplitude is None:
+            reference_amplitude = config.amplitude
+        return cls(impairments, config.samplerate, config.tone_frequency, reference_amplitude=reference_amplitude)
+
+    def _phasor(self, start: int, count: int, freq: float) -> np.ndarray:
+        # exp(2j*pi*freq*n/fs) for n in [start, start + count): exact block
+        # start phases times a cached in-block table, instead of one exp per sample.
+        table = self._phasor_tables.get(freq)
+        if table is None:
+            table = np.exp(2j * np.pi * (freq / self.samplerate) * np.arange(self.blocksize))
+            self._phasor_tables[freq] = table
+        starts = start + np.arange(-(-count // self.blocksize)) * self.blocksize
+        heads = np.exp(2j * np.pi * np.mod(starts * (freq / self.samplerate), 1.0))
+        return (heads[:, None] * table).reshape(-1)[:count]
+
+    def _filter(self, z: np.ndarray) -> np.ndarray:
+        # Overlap-save with all segments of the chunk in one batched FFT.
+        taps = len(self._fir)
+        ext = np.concatenate((self._fir_tail, z))
+        self._fir_tail = ext[len(ext) - (taps - 1):]
+        step = self._fft_size - (taps - 1)
+        segments = -(-len(z) // step)
+        ext = np.concatenate((ext, np.zeros(segments * step + taps - 1 - len(ext), dtype=ext.dtype)))
+        frames = np.lib.stride_tricks.sliding_window_view(ext, self._fft_size)[::step][:segments]
+        y = np.fft.ifft(np.fft.fft(frames, axis=1) * self._fir_spectrum, axis=1)[:, taps - 1:]
+        return y.reshape(-1)[:len(z)]
+
+    def _edge_shifts(self, m: np.ndarray) -> np.ndarray:
+        # Slot boundary k owns [k - 1/2, k + 1/2) blocks, where the envelope is flat.
+        k = (m + self.blocksize // 2) // self.blocksize
+        needed = int(k[-1]) + 1 - self._jitter_start
+        if needed > len(self._jitter):
+            sigma = self.config.edge_jitter_s * self.samplerate
+            draws = self._jitter_rng.normal(0.0, sigma, needed - len(self._jitter))
+            self._jitter = np.concatenate((self._jitter, np.clip(draws, -self._max_shift, self._max_shift)))
+        drop = int(k[0]) - self._jitter_start
+        if drop > 0:
+            self._jitter = self._jitter[drop:]
+            self._jitter_start += drop
+        return self._jitter[k - self._jitter_start]
+
+    def _resynthesize(self, x: np.ndarray, end: int) -> np.ndarray:
+        lo = self._phasor(self._in_pos, len(x), -self.carrier_hz)
+        self._bb = np.concatenate((self._bb, self._filter(2.0 * x * lo)))
+        self._in_pos += len(x)
+
+        bb_end = self._bb_start + len(self._bb)
+        stop = min(end, bb_end - self._max_shift - 1)
+        if stop <= self._out_pos:
+            return np.zeros(0, dtype=np.float32)
+        m = np.arange(self._out_pos, stop)
+        p = m.astype(np.float64)
+        if self._max_shift:
+            p -= self._edge_shifts(m)
+        p = np.maximum(p - self._bb_start, 0.0)
+        i = p.astype(np.int64)
+        frac = p - i
+        b = self._bb[i] * (1.0 - frac) + self._bb[i + 1] * frac
+
+        up = self._phasor(self._out_pos, len(m), self.carrier_hz + self.config.carrier_offset_hz)
+        y = b.real * up.real - b.imag * up.imag
+        self._out_pos = stop
+        keep = max(0, stop - self._max_shift - 1 - self._bb_start)
+        self._bb = self._bb[keep:]
+        self._bb_start += keep
+        return y
+
+    def _add_impulses(self, y: np.ndarray, m0: int) -> np.ndarray:
+        n = len(y)
+        kernel = self._impulse_kernel
+        ext = np.zeros(n + len(kernel) - 1)
+        ext[:len(self._impulse_tail)] += self._impulse_tail
+        mean_gap = self.samplerate / self.config.impulse_rate_hz
+        while self._impulse_last < m0 + n:
+            rng = self._impulse_rng
+            pos = self._impulse_last + np.cumsum(rng.exponential(mean_gap, _IMPULSE_BATCH))
+            amp = self._impulse_peak * rng.uniform(0.5, 1.0, _IMPULSE_BATCH) * rng.choice((-1.0, 1.0), _IMPULSE_BATCH)
+            self._impulse_pos = np.concatenate((self._impulse_pos, pos))
+            self._impulse_amp = np.concatenate((self._impulse_amp, amp))
+            self._impulse_last = float(pos[-1])
+        due = int(np.searchsorted(self._impulse_pos, m0 + n))
+        if due:
+            at = self._impulse_pos[:due].astype(np.int64) - m0
+            np.add.at(ext, at[:, None] + np.arange(len(kernel)), self._impulse_amp[:due, None] * kernel)
+            self._impulse_pos = self._impulse_pos[due:]
+            self._impulse_amp = self._impulse_amp[due:]
+        self._impulse_tail = ext[n:]
+        return y + ext[:n]
+
+    def _impair(self, y: np.ndarray, m0: int) -> np.ndarray:
+        y = np.asarray(y, dtype=np.float64)
+        if len(y) == 0:
+            return y.astype(np.float32)
+        cfg = self.config
+        if cfg.fading_depth_db > 0.0:
+            # Evaluated on an absolute 1 ms grid and interpolated.
+            step = max(1, self.samplerate // 1000)
+            grid = np.arange(m0 // step, (m0 + len(y)) // step + 2) * step
+            s = np.sin((grid / self.samplerate)[:, None] * self._fading_w + self._fading_phase).mean(axis=1)
+            gain = 10.0 ** (-cfg.fading_depth_db * (1.0 + s) / 40.0)
+            y = y * np.interp(np.arange(m0, m0 + len(y)), grid, gain)
+        if cfg.impulse_rate_hz > 0.0:
+            y = self._add_impulses(y, m0)
+        if self._noise_sigma is not None:
+            y = y + self._noise_sigma * self._noise_rng.standard_normal(len(y))
+        return y.astype(np.float32)
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """
+        Impairs the next chunk. With carrier offset or edge jitter the
+        returned array lags the input by up to `delay_frames` samples.
+        """
+        x = np.asarray(chunk, dtype=np.float64)
+        m0 = self._out_pos
+        if self._resynth:
+            y = self._resynthesize(x, self._in_pos + len(x))
+        else:
+            y = x
+            self._in_pos += len(x)
+            self._out_pos += len(x)
+        return self._impair(y, m0)
+
+    def flush(self) -> np.ndarray:
+        """
+        Ends the stream and returns its held-back end (empty without
+        resynthesis).
+        """
+        if not self._resynth or self._out_pos >= self._in_pos:
+            return np.zeros(0, dtype=np.float32)
+        m0 = self._out_pos
+        end = self._in_pos
+        y = self._resynthesize(np.zeros(self.delay_frames), end)
+        self._in_pos = end
+        return self._impair(y, m0)
+
+    def iter_chunks(self, chunks: Iterable[np.ndarray]) -> Iterator[np.ndarray]:
+        for chunk in chunks:
+            out = self.process(chunk)
+            if len(out):
+                yield out
+        tail = self.flush()
+        if len(tail):
+            yield tail
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import math
+import numpy as np
+
+from dcf77gen.dsp.schedule import SLOTS_PER_SECOND
+
+# The receiver works on 1 ms complex baseband bins, 100 per 100 ms slot.
+_BINS_PER_SLOT = 100
+# Slicer decision window inside each (delay-compensated) slot, in bins.
+_DECIDE = slice(20, 80)
+# Largest envelope delay the slicer's edge sync searches, in bins.
+_MAX_SYNC_BINS = 60
+
+
+@dataclass(frozen=True)
+class ReceiverModel:
+    """
+    Simple DCF77 receiver: a tuned filter, envelope detector, peak-hold AGC
+    and a threshold bit slicer.
+
+    The filter is modelled as an integrate-and-dump over `0.443 / bandwidth_hz`
+    (the 3 dB bandwidth of a boxcar), so off-tune carriers lose level. The AGC
+    reference follows envelope peaks instantly and decays with
+    `agc_release_s`. Thresholds are fractions of that reference: a slot
+    decodes low below `low_threshold`, high above `high_threshold`, and is
+    ambiguous in between.
+    """
+    tuned_hz: float = 77500.0
+    bandwidth_hz: float = 10.0
+    agc_release_s: float = 2.0
+    low_threshold: float = 0.5
+    high_threshold: float = 0.7
+    settle_s: float = 2.0
+
+    def __post_init__(self) -> None:
+        if self.tuned_hz <= 0.0:
+            raise ValueError("tuned_hz must be > 0")
+        if self.bandwidth_hz <= 0.0:
+            raise ValueError("bandwidth_hz must be > 0")
+        if self.agc_release_s <= 0.0:
+            raise ValueError("agc_release_s must be > 0")
+        if not 0.0 < self.low_threshold <= self.high_threshold < 1.0:
+            raise ValueError("thresholds must satisfy 0 < low_threshold <= high_threshold < 1")
+        if self.settle_s < 0.0:
+            raise ValueError("settle_s must be >= 0")
+
+    def describe(self) -> str:
+        return (
+            f"tuned {self.tuned_hz:g} Hz, bandwidth {self.bandwidth_hz:g} Hz, AGC release {self.agc_release_s:g} s, "
+            f"thresholds {self.low_threshold:g}/{self.high_threshold:g}"
+        )
+
+
+@dataclass(frozen=True)
+class ReceiverReport:
+    """
+    Slicer result. Margins are in units of the AGC reference level: how far
+    each slot's envelope stayed on the correct side of its threshold
+    (negative: decoded wrong or ambiguous).
+    """
+    slots: int
+    slot_errors: int
+    seconds: int
+    bit_errors: int  # seconds whose marker or bit slot failed
+    margin: float  # 5th percentile over slots
+    worst_margin: float
+    delay_s: float  # envelope delay found by the slicer's edge sync
+
+    @property
+    def decoded(self) -> bool:
+        return self.slot_errors == 0
+
+    def format(self) -> str:
+        return (
+            f"decode margin {self.margin:+.3f} (worst {self.worst_margin:+.3f}), "
+            f"{self.slot_errors}/{self.slots} slot errors, {self.bit_errors}/{self.seconds} bit errors, "
+            f"envelope delay {self.delay_s * 1e3:.0f} ms"
+        )
+
+
+class ReceiverSimulator:
+    """
+    Chunk-streaming receiver simulation on a rendered (and possibly impaired)
+    signal whose 100 ms blocks start at the first sample.
+
+    `feed()` mixes each block to 1 ms complex bins at the tuned frequency as
+    the rendered samples see it (folded to the samplerate, so image mode is
+    received through its baseband tone). `report()` filters, detects and
+    slices the envelope against the expected low slots.
+    """
+
+    def __init__(self, model: ReceiverModel, samplerate: int):
+        self.model = model
+        self.samplerate = int(samplerate)
+        self.blocksize = self.samplerate // 10
+        self.bin_len = self.blocksize // _BINS_PER_SLOT
+        if self.bin_len < 1:
+            raise ValueError("samplerate too low for 1 ms receiver bins")
+        tuned = math.fmod(model.tuned_hz, self.samplerate)
+        self.tuned_alias_hz = self.samplerate - tuned if tuned > self.samplerate / 2 else tuned
+        cycles = self.tuned_alias_hz / self.samplerate
+        self._lo = np.exp(-2j * np.pi * cycles * np.arange(self.bin_len))
+        self._bin_starts = np.arange(_BINS_PER_SLOT) * self.bin_len
+        self._cycles = cycles
+        self._pending = np.zeros(0, dtype=np.float64)
+        self._blocks = 0
+        self._bins: list[np.ndarray] = []
+
+    def feed(self, chunk: np.ndarray) -> None:
+        x = np.concatenate((self._pending, np.asarray(chunk, dtype=np.float64)))
+        blocks = len(x) // self.blocksize
+        self._pending = x[blocks * self.blocksize:]
+        if blocks == 0:
+            return
+        frames = x[: blocks * self.blocksize].reshape(blocks, self.blocksize)[:, : _BINS_PER_SLOT * self.bin_len]
+        sums = frames.reshape(blocks, _BINS_PER_SLOT, self.bin_len) @ self._lo
+        starts = (self._blocks + np.arange(blocks))[:, None] * self.blocksize + self._bin_starts
+        rotation = np.exp(-2j * np.pi * np.mod(starts * self._cycles, 1.0))
+        self._bins.append((sums * rotation).reshape(-1) * (2.0 / self.bin_len))
+        self._blocks += blocks
+
+    def envelope(self) -> np.ndarray:
+        """
+        AGC-normalized envelope at 1 ms resolution.
+        """
+        if not self._bins:
+            return np.zeros(0)
+        iq = np.concatenate(self._bins)
+        width = max(1, int(round(0.443 / self.model.bandwidth_hz * 1000)))
+        c = np.concatenate(([0.0], np.cumsum(iq)))
+        lag = np.maximum(np.arange(1, len(iq) + 1) - width, 0)
+        env = np.abs((c[1:] - c[lag]) / np.minimum(np.arange(1, len(iq) + 1), width))
+
+        # Peak hold with exponential release, vectorized in the log domain:
+        # r[n] = max(env[n], a * r[n-1])  <=>  log r[n] = n log a + cummax(log env[k] - k log a).
+        log_a = -1.0 / (self.model.agc_release_s * 1000)
+        n = np.arange(len(env))
+        log_env = np.log(np.maximum(env, 1e-12))
+        reference = np.exp(n * log_a + np.maximum.accumulate(log_env - n * log_a))
+        return env / reference
+
+    def report(self, low_slots: np.ndarray, first_slot: int = 0) -> ReceiverReport:
+        """
+        Slices the received envelope against `low_slots` (one flag per block
+        as rendered; `first_slot` is the slot index of the first block).
+        """
+        v = self.envelope()
+        low_slots = np.asarray(low_slots, dtype=bool)
+        total = min(len(v) // _BINS_PER_SLOT, len(low_slots)) - 1
+        if total <= 0:
+            raise ValueError("not enough signal to slice")
+        # Edge sync: the envelope delay that best separates low from high slots.
+        truth = np.repeat(low_slots[:total], _BINS_PER_SLOT)
+        span = total * _BINS_PER_SLOT
+        scores = [v[d:d + span][~truth].mean() - v[d:d + span][truth].mean() if truth.any() else 0.0
+                  for d in range(min(_MAX_SYNC_BINS, len(v) - span + 1))]
+        delay = int(np.argmax(scores))
+
+        windows = v[delay:delay + span].reshape(total, _BINS_PER_SLOT)[:, _DECIDE]
+        low = low_slots[:total]
+        m = self.model
+        margins = np.where(low, m.low_threshold - windows.max(axis=1), windows.min(axis=1) - m.high_threshold)
+        settle = min(total - 1, int(math.ceil(m.settle_s * SLOTS_PER_SECOND)))
+        margins = margins[settle:]
+        slot_ids = first_slot + np.arange(settle, total)
+
+        bit_slot = slot_ids % SLOTS_PER_SECOND < 2
+        seconds = slot_ids // SLOTS_PER_SECOND
+        failed = bit_slot & (margins <= 0.0)
+        return ReceiverReport(
+            slots=len(margins),
+            slot_errors=int(np.count_nonzero(margins <= 0.0)),
+            seconds=len(np.unique(seconds[bit_slot])),
+            bit_errors=len(np.unique(seconds[failed])),
+            margin=float(np.percentile(margins, 5)),
+            worst_margin=float(margins.min()),
+            delay_s=delay / 1000.0,
+        )
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+import numpy as np
+
+from dcf77gen.core.clock import VirtualClock, add_elapsed
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.core.state import GeneratorState
+from dcf77gen.dsp.oscillator import SineOscillator
+from dcf77gen.dsp.schedule import AmplitudeSchedule
+from dcf77gen.protocol.encoder import build_time_bits
+
+
+class OfflineRenderer:
+    """
+    Renders the DCF77 signal without an audio device.
+
+    Mirrors `RealtimeStreamer` block by block: same state counters, same
+    minute refresh point and the same `AmplitudeSchedule`, so the output
+    matches what the callback would emit for the same start time.
+    """
+
+    def __init__(self, config: GeneratorConfig, start: datetime):
+        self.config = config
+        self.blocksize = int(self.config.samplerate // 10)
+        self.state = GeneratorState()
+        self.osc = SineOscillator(
+            frequency=self.config.tone_frequency,
+            samplerate=self.config.samplerate,
+            phase=0.0,
+        )
+        self.clock = VirtualClock(start)
+        self._block_seconds = self.blocksize / self.config.samplerate
+        self.state.seed_from_clock(self.clock, self.config.utc, self.config.offset)
+        self.schedule = self._compile_schedule()
+
+    def _compile_schedule(self) -> AmplitudeSchedule:
+        refresh_now = self.clock.now(self.config.utc)
+        # Same rule as the realtime refresh: during second 59 encode the upcoming frame.
+        if self.state.count_sec == 59:
+            refresh_now = add_elapsed(refresh_now, timedelta(minutes=1))
+        res = build_time_bits(refresh_now, utc_mode=self.config.utc)
+        self.state.time_bits = res.time_bits
+        return AmplitudeSchedule.compile(res.time_bits, self.config.amplitude, self.config.low_factor)
+
+    def _advance(self) -> None:
+        self.state.advance_block()
+        self.clock.advance(self._block_seconds)
+        if self.state.is_minute_refresh_point():
+            self.schedule = self._compile_schedule()
+
+    def render_block(self) -> np.ndarray:
+        """
+        Renders one 100 ms block exactly as the realtime callback would.
+        """
+        block = self.osc.render(self.blocksize, self.schedule.amplitudes[self.state.slot])
+        self._advance()
+        return block
+
+    def iter_chunks(self, seconds: float, chunk_blocks: int = 10) -> Iterator[np.ndarray]:
+        """
+        Yields the signal in chunks of `chunk_blocks` blocks (1 s by default).
+
+        Amplitudes are gathered per block from the schedule and applied with a
+        single vectorized multiply per chunk.
+        """
+        if chunk_blocks <= 0:
+            raise ValueError("chunk_blocks must be > 0")
+        remaining = int(round(seconds * 10))
+        while remaining > 0:
+            n = min(chunk_blocks, remaining)
+            amps = np.empty(n, dtype=np.float32)
+            for i in range(n):
+                amps[i] = self.schedule.amplitudes[self.state.slot]
+                self._advance()
+            carrier = self.osc.render(n * self.blocksize, 1.0)
+            yield carrier * np.repeat(amps, self.blocksize)
+            remaining -= n
+
+    def low_slots(self, seconds: float) -> np.ndarray:
+        """
+        Advances like `iter_chunks(seconds)` without synthesis and returns
+        whether each block is a low pulse (the expected receiver output).
+        """
+        low = np.empty(int(round(seconds * 10)), dtype=bool)
+        for i in range(len(low)):
+            low[i] = self.schedule.low_mask[self.state.slot]
+            self._advance()
+        return low
+
+    def render(self, seconds: float) -> np.ndarray:
+        chunks = list(self.iter_chunks(seconds))
+        if not chunks:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(chunks)
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import numpy as np
+
+SLOTS_PER_SECOND = 10
+SLOTS_PER_MINUTE = 60 * SLOTS_PER_SECOND
+
+
+@dataclass(frozen=True)
+class AmplitudeSchedule:
+    """
+    Per-minute amplitude schedule compiled from one DCF77 telegram.
+
+    Holds one entry per 100 ms slot, indexed by `count_sec * 10 + count_deci`
+    (see `GeneratorState.slot`). The realtime callback, offline rendering and
+    the console UI all read the same object, so they agree exactly.
+    """
+    time_bits: int
+    amplitude: float
+    low_factor: float
+    low_mask: np.ndarray = field(repr=False, compare=False)
+    amplitudes: np.ndarray = field(repr=False, compare=False)
+
+    @classmethod
+    def compile(cls, time_bits: int, amplitude: float, low_factor: float) -> AmplitudeSchedule:
+        """
+        Builds the 600-slot schedule once per minute refresh:
+          - second 0..58: low during slot 0, and during slot 1 for bit value 1
+          - second 59: no low pulse (minute marker)
+        """
+        bits = np.array([(time_bits >> sec) & 1 for sec in range(60)], dtype=bool)
+        low = np.zeros((60, SLOTS_PER_SECOND), dtype=bool)
+        low[:59, 0] = True
+        low[:59, 1] = bits[:59]
+        low_mask = low.reshape(SLOTS_PER_MINUTE)
+
+        amplitudes = np.where(
+            low_mask,
+            np.float32(amplitude * low_factor),
+            np.float32(amplitude),
+        ).astype(np.float32, copy=False)
+
+        low_mask.flags.writeable = False
+        amplitudes.flags.writeable = False
+        return cls(
+            time_bits=time_bits,
+            amplitude=amplitude,
+            low_factor=low_factor,
+            low_mask=low_mask,
+            amplitudes=amplitudes,
+        )
+
+    def is_low(self, count_sec: int, count_deci: int) -> bool:
+        return bool(self.low_mask[count_sec * SLOTS_PER_SECOND + count_deci])
+
+    def amplitude_at(self, count_sec: int, count_deci: int) -> np.float32:
+        return self.amplitudes[count_sec * SLOTS_PER_SECOND + count_deci]
+
+    @property
+    def bit_string(self) -> str:
+        # Transmitted bits in emission order (bit0 -> bit58).
+        return "".join("1" if (self.time_bits >> i) & 1 else "0" for i in range(59))
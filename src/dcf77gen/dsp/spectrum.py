@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import math
+import numpy as np
+
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.dsp.oscillator import SineOscillator
+
+
+@dataclass(frozen=True)
+class ImageSpectrumReport:
+    """
+    Offline spectrum check of the emitted carrier under a zero-order-hold DAC.
+
+    Levels are in dB relative to the synthesized (baseband) tone.
+    """
+    tone_hz: float
+    target_hz: float
+    image_order: int
+    predicted_target_db: float
+    measured_target_db: float
+    measured_target_hz: float
+    competing: tuple[tuple[float, float], ...]  # (frequency, dB) of nearest other components
+
+    def format(self) -> str:
+        lines = []
+        lines.append(f"tone: {self.tone_hz:g} Hz -> target {self.target_hz:g} Hz (image order {self.image_order})")
+        lines.append(
+            f"target level: predicted {self.predicted_target_db:+.1f} dB, "
+            f"measured {self.measured_target_db:+.1f} dB at {self.measured_target_hz:.1f} Hz"
+        )
+        for freq, level in self.competing:
+            lines.append(f"  other component: {freq:g} Hz {level:+.1f} dB")
+        return "\n".join(lines)
+
+
+def _zoh_gain(freq: float, samplerate: float) -> float:
+    # |sinc| envelope of a zero-order-hold (non-oversampling) DAC.
+    x = freq / samplerate
+    return 1.0 if x == 0.0 else abs(math.sin(math.pi * x) / (math.pi * x))
+
+
+def _db(ratio: float) -> float:
+    return 20.0 * math.log10(max(ratio, 1e-12))
+
+
+def image_spectrum_check(config: GeneratorConfig, seconds: float = 0.05) -> ImageSpectrumReport:
+    """
+    Renders the carrier, models the DAC as a zero-order hold and measures the
+    level at the target frequency relative to the baseband tone.
+
+    The ZOH model is the best case for image mode: oversampling DACs with a
+    digital reconstruction filter attenuate images far more, so confirm on
+    the actual hardware.
+    """
+    tone = config.tone_frequency
+    fs = config.samplerate
+    frames = max(256, int(seconds * fs))
+    x = SineOscillator(frequency=tone, samplerate=fs).render(frames, 1.0).astype(np.float64)
+
+    # Hold each sample for `hold` output samples so the spectrum covers the target.
+    # A long hold keeps the discrete ZOH close to the analog sinc response.
+    hold = max(16, math.ceil(2.5 * config.frequency / fs))
+    analog = np.repeat(x, hold)
+    window = np.hanning(len(analog))
+    spectrum = np.abs(np.fft.rfft(analog * window))
+    freqs = np.fft.rfftfreq(len(analog), d=1.0 / (fs * hold))
+    bin_hz = freqs[1]
+
+    def peak_near(freq: float) -> tuple[float, float]:
+        lo = max(0, int((freq - 4 * bin_hz) / bin_hz))
+        hi = min(len(spectrum), int((freq + 4 * bin_hz) / bin_hz) + 1)
+        idx = lo + int(np.argmax(spectrum[lo:hi]))
+        return float(freqs[idx]), float(spectrum[idx])
+
+    _, tone_level = peak_near(tone)
+    target_hz, target_level = peak_near(config.frequency)
+
+    images = sorted(
+        {k * fs + s * tone for k in range(0, hold) for s in (-1, 1)} - {config.frequency},
+        key=lambda f: abs(f - config.frequency),
+    )
+    competing = []
+    for freq in images:
+        if 0.0 < freq < fs * hold / 2 and len(competing) < 3:
+            competing.append((freq, _db(peak_near(freq)[1] / tone_level)))
+
+    return ImageSpectrumReport(
+        tone_hz=tone,
+        target_hz=config.frequency,
+        image_order=config.image_order,
+        predicted_target_db=_db(_zoh_gain(config.frequency, fs) / _zoh_gain(tone, fs)),
+        measured_target_db=_db(target_level / tone_level),
+        measured_target_hz=target_hz,
+        competing=tuple(competing),
+    )
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+import itertools
+import os
+from typing import Any
+import numpy as np
+
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.dsp.impairment import ChannelImpairment, ImpairmentConfig
+from dcf77gen.dsp.receiver import ReceiverModel, ReceiverReport, ReceiverSimulator
+from dcf77gen.dsp.render import OfflineRenderer
+
+DAC_MODELS = ("zoh", "ideal")
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    config: GeneratorConfig
+    report: ReceiverReport | None
+    error: str | None = None
+
+    @property
+    def rank_key(self) -> tuple[float, float]:
+        if self.report is None:
+            return (float("inf"), float("inf"))
+        return (-self.report.margin, -self.report.worst_margin)
+
+
+def parse_grid(spec: str, cast: Callable[[str], float] = float) -> list:
+    """
+    Parses a comma-separated list of values and inclusive `START:STOP:STEP`
+    ranges, e.g. `0.05:0.3:0.05,0.5`.
+    """
+    values: list = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if ":" not in part:
+            values.append(cast(part))
+            continue
+        fields = part.split(":")
+        if len(fields) != 3:
+            raise ValueError(f"invalid range {part!r}; use START:STOP:STEP")
+        start, stop, step = (float(f) for f in fields)
+        if step <= 0.0:
+            raise ValueError(f"range step must be > 0 in {part!r}")
+        count = int(np.floor((stop - start) / step + 1e-9)) + 1
+        values.extend(cast(f"{start + i * step:.10g}") for i in range(max(0, count)))
+    if not values:
+        raise ValueError(f"empty grid {spec!r}")
+    return values
+
+
+def config_grid(
+    *,
+    frequencies: Sequence[float],
+    samplerates: Sequence[int],
+    amplitudes: Sequence[float],
+    low_factors: Sequence[float],
+    **fields: Any,
+) -> tuple[list[GeneratorConfig], list[str]]:
+    """
+    Expands the grid, with the remaining `GeneratorConfig` `fields` fixed;
+    returns the valid configs and a reason for every skipped combination.
+    """
+    configs: list[GeneratorConfig] = []
+    skipped: list[str] = []
+    for freq, rate, amp, low in itertools.product(frequencies, samplerates, amplitudes, low_factors):
+        try:
+            configs.append(
+                GeneratorConfig(frequency=freq, samplerate=int(rate), amplitude=amp, low_factor=low, **fields)
+            )
+        except ValueError as exc:
+            skipped.append(f"f={freq:g} s={int(rate)} a={amp:g} low={low:g}: {exc}")
+    return configs, skipped
+
+
+def dac_gain(config: GeneratorConfig, dac: str) -> float:
+    """
+    Level at the target carrier per unit of rendered tone amplitude. A
+    zero-order-hold DAC has a |sinc| response that also feeds the images;
+    an ideal (oversampling) DAC passes the tone and emits no image.
+    """
+    if dac == "ideal":
+        return 0.0 if config.image_mode else 1.0
+    if dac == "zoh":
+        return float(abs(np.sinc(config.frequency / config.samplerate)))
+    raise ValueError(f"unknown DAC model {dac!r}")
+
+
+def evaluate_config(
+    config: GeneratorConfig,
+    receiver: ReceiverModel,
+    impairments: ImpairmentConfig,
+    seconds: float,
+    start: datetime,
+    dac: str = "zoh",
+) -> SweepResult:
+    """
+    Renders `seconds` of `config`, passes it through the DAC model and the
+    channel impairments (levels relative to a full-scale carrier, so the
+    amplitude trades against noise) and slices it with the receiver model.
+    """
+    try:
+        gain = dac_gain(config, dac)
+        if gain == 0.0:
+            raise ValueError(f"{dac} DAC emits nothing at {config.frequency:g} Hz")
+        plan = OfflineRenderer(config, start)
+        first_slot = plan.state.slot
+        low = plan.low_slots(seconds)
+        chunks = (chunk * np.float32(gain) for chunk in OfflineRenderer(config, start).iter_chunks(seconds))
+        if impairments.enabled:
+            chunks = ChannelImpairment.for_config(impairments, config, reference_amplitude=1.0).iter_chunks(chunks)
+        sim = ReceiverSimulator(receiver, config.samplerate)
+        for chunk in chunks:
+            sim.feed(chunk)
+        return SweepResult(config, sim.report(low, first_slot))
+    except ValueError as exc:
+        return SweepResult(config, None, str(exc))
+
+
+def run_sweep(
+    configs: Sequence[GeneratorConfig],
+    receiver: ReceiverModel,
+    impairments: ImpairmentConfig,
+    *,
+    seconds: float,
+    start: datetime,
+    dac: str = "zoh",
+    jobs: int | None = None,
+) -> list[SweepResult]:
+    """
+    Evaluates every config, over a process pool with `jobs` workers (default:
+    all cores; 1 runs inline), and returns the results best first.
+    """
+    jobs = (os.cpu_count() or 1) if jobs is None else max(1, int(jobs))
+    args = [(cfg, receiver, impairments, seconds, start, dac) for cfg in configs]
+    if jobs == 1 or len(args) <= 1:
+        results = [evaluate_config(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(args))) as pool:
+            results = list(pool.map(evaluate_config, *zip(*args)))
+    return sorted(results, key=lambda r: r.rank_key)
+
+
+def format_sweep_table(results: Sequence[SweepResult], top: int | None = None) -> str:
+    lines = [
+        f"{'#':>3} {'freq Hz':>9} {'rate':>6} {'mode':>6} {'ampl':>5} {'low':>5} "
+        f"{'margin':>7} {'worst':>7} {'slot err':>9} {'bit err':>8}"
+    ]
+    shown = results if top is None else results[:top]
+    for rank, r in enumerate(shown, 1):
+        c = r.config
+        head = (
+            f"{rank:>3} {c.frequency:>9g} {c.samplerate / 1000:>5g}k {'image' if c.image_mode else 'direct':>6} "
+            f"{c.amplitude:>5.2f} {c.low_factor:>5.2f}"
+        )
+        if r.report is None:
+            lines.append(f"{head} failed: {r.error}")
+            continue
+        rep = r.report
+        lines.append(
+            f"{head} {rep.margin:>+7.3f} {rep.worst_margin:>+7.3f} "
+            f"{f'{rep.slot_errors}/{rep.slots}':>9} {f'{rep.bit_errors}/{rep.seconds}':>8}"
+        )
+    if top is not None and len(results) > top:
+        lines.append(f"... {len(results) - top} more")
+    return "\n".join(lines)
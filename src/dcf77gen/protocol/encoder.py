@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, UTC
 from zoneinfo import ZoneInfo
 
 # DCF77 time code bit map (0-based indices, LSB-first in this implementation):
@@ -53,6 +53,12 @@ def _is_dst_active(dt: datetime) -> bool:
     return bool(dt.dst() and dt.dst() != timedelta(0))
 
 
+def _berlin_after(dt: datetime, delta: timedelta) -> datetime:
+    # Elapsed-time arithmetic in UTC; wall-clock arithmetic on aware datetimes
+    # lands on non-existent or wrong-fold times around DST switches.
+    return (dt.astimezone(UTC) + delta).astimezone(BERLIN_TZ)
+
+
 def build_time_bits(
     now: datetime,
     *,
@@ -82,9 +88,9 @@ def build_time_bits(
         z2 = 0
     else:
         berlin_now = _normalize_for_berlin(now)
-        target_time = berlin_now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        target_time = _berlin_after(berlin_now.replace(second=0, microsecond=0), timedelta(minutes=1))
         dst_now = _is_dst_active(target_time)
-        dst_in_one_hour = _is_dst_active(target_time + timedelta(hours=1))
+        dst_in_one_hour = _is_dst_active(_berlin_after(target_time, timedelta(hours=1)))
         a1 = int(dst_now != dst_in_one_hour)
         z1 = int(not dst_now)  # CET
         z2 = int(dst_now)      # CEST
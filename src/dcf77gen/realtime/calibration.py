@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import datetime, UTC
+import json
+import os
+from pathlib import Path
+import threading
+from typing import Any
+import numpy as np
+import sounddevice as sd
+
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.dsp.oscillator import SineOscillator
+from dcf77gen.realtime.devices import default_cache_dir
+
+CALIBRATION_VERSION = 1
+# Correlation peak over the strongest peak outside the main lobe; below this
+# the recording most likely did not contain the pattern.
+MIN_PEAK_RATIO = 2.0
+
+# play_record(signal, samplerate) -> (recorded, output_lead_s, input_lag_s)
+PlayRecord = Callable[[np.ndarray, int], tuple[np.ndarray, float, float]]
+
+
+def calibration_pattern(
+    config: GeneratorConfig,
+    seconds: float = 2.0,
+    chip_s: float = 0.001,
+    seed: int = 77,
+) -> np.ndarray:
+    """
+    Carrier phase-reversed by a seeded pseudo-random +/-1 chip sequence.
+
+    Zero-mean short chips give a single sharp correlation peak (on/off keying
+    would leave a flat correlation floor at a quarter of the peak); the
+    carrier keeps the pattern inside the band the output path is used for.
+    """
+    fs = config.samplerate
+    chip = max(1, int(round(chip_s * fs)))
+    chips = np.random.default_rng(seed).integers(0, 2, size=max(1, int(seconds / chip_s))) * 2 - 1
+    keying = np.repeat(chips.astype(np.float32), chip)
+    carrier = SineOscillator(frequency=config.tone_frequency, samplerate=fs).render(len(keying), config.amplitude)
+    return carrier * keying
+
+
+def estimate_lag(
+    reference: np.ndarray,
+    recorded: np.ndarray,
+    samplerate: int,
+    main_lobe_s: float = 0.002,
+) -> tuple[float, float]:
+    """
+    Returns `(lag_s, peak_ratio)` of `reference` inside `recorded`.
+
+    The cross-correlation is computed with one real FFT pair; the peak is
+    refined to sub-sample resolution by parabolic interpolation. Absolute
+    values are used so an inverting output path still correlates.
+    """
+    ref = np.asarray(reference, dtype=np.float64)
+    rec = np.asarray(recorded, dtype=np.float64)
+    n = 1 << int(np.ceil(np.log2(len(ref) + len(rec))))
+    xc = np.abs(np.fft.irfft(np.fft.rfft(rec, n) * np.conj(np.fft.rfft(ref, n)), n)[: len(rec)])
+    peak = int(np.argmax(xc))
+    frac = 0.0
+    if 0 < peak < len(xc) - 1:
+        y0, y1, y2 = xc[peak - 1], xc[peak], xc[peak + 1]
+        denom = y0 - 2.0 * y1 + y2
+        if denom != 0.0:
+            frac = 0.5 * (y0 - y2) / denom
+    # Exclude the main lobe (two chips) when looking for the runner-up.
+    guard = max(2, int(main_lobe_s * samplerate))
+    sidelobes = np.concatenate((xc[: max(0, peak - guard)], xc[peak + guard + 1 :]))
+    runner_up = float(sidelobes.max()) if len(sidelobes) else 0.0
+    ratio = float(xc[peak] / runner_up) if runner_up > 0.0 else float("inf")
+    return (peak + frac) / samplerate, ratio
+
+
+def latency_correction(lag_s: float, output_lead_s: float, input_lag_s: float) -> float:
+    """
+    Emission delay not accounted for by PortAudio's reported DAC time.
+
+    A sample written with reported DAC time `t` is recorded `lag_s` later in
+    input-buffer terms; the input side already accounts for `input_lag_s`,
+    so whatever remains beyond `output_lead_s` is unreported output latency.
+    """
+    return lag_s - output_lead_s - input_lag_s
+
+
+@dataclass(frozen=True)
+class CalibrationResult:
+    samplerate: int
+    lag_s: float
+    output_lead_s: float
+    input_lag_s: float
+    correction_s: float
+    peak_ratio: float
+
+    def format(self) -> str:
+        lines = []
+        lines.append(f"round-trip lag: {self.lag_s * 1e3:.3f} ms")
+        lines.append(f"reported output latency: {self.output_lead_s * 1e3:.3f} ms")
+        lines.append(f"reported input latency: {self.input_lag_s * 1e3:.3f} ms")
+        lines.append(f"output latency correction: {self.correction_s * 1e3:+.3f} ms")
+        lines.append(f"correlation peak ratio: {self.peak_ratio:.1f}")
+        return "\n".join(lines)
+
+
+def duplex_play_record(input_device: int | None, output_device: int | None) -> PlayRecord:
+    """
+    Returns a `PlayRecord` that plays and records through one duplex stream,
+    so input and output frames share callback timing.
+    """
+
+    def play_record(signal: np.ndarray, samplerate: int) -> tuple[np.ndarray, float, float]:
+        recorded = np.zeros(len(signal), dtype=np.float32)
+        timing: list[tuple[float, float]] = []
+        pos = 0
+        done = threading.Event()
+
+        def callback(indata: Any, outdata: Any, frames: int, time_info: Any, _status: Any) -> None:
+            nonlocal pos
+            if not timing:
+                timing.append(
+                    (
+                        time_info.outputBufferDacTime - time_info.currentTime,
+                        time_info.currentTime - time_info.inputBufferAdcTime,
+                    )
+                )
+            n = max(0, min(frames, len(signal) - pos))
+            outdata.fill(0)
+            outdata[:n, 0] = signal[pos : pos + n]
+            recorded[pos : pos + n] = indata[:n, 0]
+            pos += frames
+            if pos >= len(signal):
+                raise sd.CallbackStop
+
+        with sd.Stream(
+            device=(input_device, output_device),
+            samplerate=samplerate,
+            channels=1,
+            dtype="float32",
+            callback=callback,
+            finished_callback=done.set,
+        ):
+            done.wait(timeout=len(signal) / samplerate + 5.0)
+        if not timing:
+            raise RuntimeError("calibration stream did not start")
+        return recorded, timing[0][0], timing[0][1]
+
+    return play_record
+
+
+def measure_latency(
+    config: GeneratorConfig,
+    play_record: PlayRecord,
+    *,
+    seconds: float = 2.0,
+    tail_s: float = 1.0,
+) -> CalibrationResult:
+    """
+    Plays the calibration pattern followed by `tail_s` of silence and
+    estimates the unreported output latency from the recording.
+    """
+    pattern = calibration_pattern(config, seconds)
+    signal = np.concatenate((pattern, np.zeros(int(tail_s * config.samplerate), dtype=np.float32)))
+    recorded, output_lead_s, input_lag_s = play_record(signal, config.samplerate)
+    lag_s, ratio = estimate_lag(pattern, recorded, config.samplerate)
+    if ratio < MIN_PEAK_RATIO:
+        raise ValueError(
+            f"calibration pattern not found in the recording (peak ratio {ratio:.2f}); "
+            "check the loopback path and input level"
+        )
+    return CalibrationResult(
+        samplerate=config.samplerate,
+        lag_s=lag_s,
+        output_lead_s=output_lead_s,
+        input_lag_s=input_lag_s,
+        correction_s=latency_correction(lag_s, output_lead_s, input_lag_s),
+        peak_ratio=ratio,
+    )
+
+
+class LatencyCalibrationStore:
+    """
+    Per-device output latency corrections, stored next to the device cache
+    and keyed like it (host API and device name).
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path if path is not None else default_cache_dir() / "latency.json"
+
+    def _read(self) -> dict[str, Any]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != CALIBRATION_VERSION:
+            return {}
+        return dict(data.get("devices", {}))
+
+    def correction_s(self, key: str, samplerate: int | None = None) -> float | None:
+        entry = self._read().get(key)
+        if entry is None:
+            return None
+        if samplerate is not None and int(entry.get("samplerate", 0)) != int(samplerate):
+            # Latency depends on the rate (buffer sizes, resampling); recalibrate.
+            return None
+        return float(entry["correction_s"])
+
+    def save(self, key: str, result: CalibrationResult) -> None:
+        devices = self._read()
+        devices[key] = {**asdict(result), "measured_at": datetime.now(UTC).isoformat(timespec="seconds")}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"version": CALIBRATION_VERSION, "devices": devices}, indent=1), encoding="utf-8")
+        os.replace(tmp, self.path)
@@ -0,0 +1,408 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, UTC
+import ipaddress
+import math
+import os
+import socket
+import struct
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from dcf77gen.core.clock import Clock, SystemClock
+from dcf77gen.dsp.schedule import SLOTS_PER_SECOND
+from dcf77gen.realtime.discipline import edge_error_slots, probe_boundary
+
+if TYPE_CHECKING:
+    from dcf77gen.realtime.streamer import RealtimeStreamer
+
+DEFAULT_GROUP = "239.77.0.77"
+DEFAULT_PORT = 7777
+
+_MAGIC = b"D77C"
+_VERSION = 1
+# magic, version, offset, slot, samplerate, session, seq, boundary (deciseconds
+# since the epoch), frames emitted at the boundary, boundary minus send time.
+_BEACON = struct.Struct("!4sBbHIIIqQd")
+# Plausibility limits for received beacons.
+_MAX_SAMPLERATE = 10_000_000
+_MAX_EMIT_IN_S = 10.0
+
+
+@dataclass(frozen=True)
+class Beacon:
+    """
+    One timing reference from the leader: slot boundary `slot`, nominally at
+    UTC `boundary_ds / 10`, leaves the leader's output `emit_in_s` after the
+    datagram was sent, `frames` samples into the leader's stream.
+    """
+    session: int
+    seq: int
+    samplerate: int
+    offset: int
+    slot: int
+    boundary_ds: int
+    frames: int
+    emit_in_s: float
+
+    @property
+    def boundary_utc(self) -> datetime:
+        return datetime.fromtimestamp(self.boundary_ds / SLOTS_PER_SECOND, UTC)
+
+    def pack(self) -> bytes:
+        return _BEACON.pack(
+            _MAGIC,
+            _VERSION,
+            self.offset,
+            self.slot,
+            self.samplerate,
+            self.session,
+            self.seq,
+            self.boundary_ds,
+            self.frames,
+            self.emit_in_s,
+        )
+
+    @classmethod
+    def unpack(cls, data: bytes) -> Beacon:
+        if len(data) != _BEACON.size:
+            raise ValueError(f"beacon must be {_BEACON.size} bytes, got {len(data)}")
+        magic, version, offset, slot, samplerate, session, seq, boundary_ds, frames, emit_in_s = _BEACON.unpack(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("not a dcf77gen timing beacon")
+        # Anything implausible would poison (or crash) the follower's filter.
+        if not 0 < samplerate <= _MAX_SAMPLERATE:
+            raise ValueError(f"implausible beacon samplerate {samplerate}")
+        if slot >= 60 * SLOTS_PER_SECOND or boundary_ds <= 0:
+            raise ValueError("implausible beacon slot or boundary")
+        if not math.isfinite(emit_in_s) or abs(emit_in_s) > _MAX_EMIT_IN_S:
+            raise ValueError(f"implausible beacon emission lead {emit_in_s}")
+        return cls(session, seq, samplerate, offset, slot, boundary_ds, frames, emit_in_s)
+
+
+def parse_group(spec: str) -> tuple[str, int]:
+    """
+    Parses `GROUP[:PORT]` into an IPv4 multicast address and port.
+    """
+    addr, sep, port_str = spec.strip().partition(":")
+    try:
+        group = ipaddress.IPv4Address(addr)
+    except ValueError:
+        raise ValueError(f"invalid coordination group {spec!r}") from None
+    if not group.is_multicast:
+        raise ValueError(f"coordination group {addr} is not an IPv4 multicast address")
+    port = int(port_str) if sep else DEFAULT_PORT
+    if not 0 < port < 65536:
+        raise ValueError(f"invalid coordination port {port}")
+    return str(group), port
+
+
+def parse_interface(spec: str) -> str:
+    """
+    Validates the IPv4 address of the interface used for multicast.
+    """
+    try:
+        return str(ipaddress.IPv4Address(spec.strip()))
+    except ValueError:
+        raise ValueError(f"invalid coordination interface {spec!r}; give its IPv4 address, not its name") from None
+
+
+class LeaderClock:
+    """
+    Clock following the pulse edges of a coordination leader.
+
+    Every beacon maps the instant the leader emitted a slot boundary to that
+    boundary's nominal UTC; the offset of the fallback clock against it is
+    estimated with a minimum-delay filter (the largest offset over `window`
+    beacons is the one least delayed by the network and scheduling). Beacons
+    whose sample count disagrees with their boundary spacing mean the leader
+    moved its edges (discipline step, reconnect or restart) and flush the
+    window. Without a beacon for `holdover_s` the fallback clock is used.
+
+    With `offset` set, beacons from a leader using a different second offset
+    (and so sending a different frame) are rejected.
+    """
+
+    def __init__(
+        self,
+        fallback: Clock | None = None,
+        *,
+        offset: int | None = None,
+        holdover_s: float = 10.0,
+        window: int = 16,
+        step_tolerance_s: float = 0.0005,
+    ):
+        self.fallback = fallback if fallback is not None else SystemClock()
+        self.offset = offset
+        self.foreign_offset: int | None = None  # last mismatched leader offset
+        self.holdover_s = float(holdover_s)
+        self.step_tolerance_s = float(step_tolerance_s)
+        self._lock = threading.Lock()
+        self._offsets: deque[float] = deque(maxlen=max(1, int(window)))
+        self._last: Beacon | None = None
+        self._last_mono: float | None = None
+        self.beacons = 0
+        self.leader_steps = 0
+
+    def on_beacon(self, beacon: Beacon, received_mono: float) -> bool:
+        """
+        Adds a beacon to the offset estimate; returns False when rejected.
+        """
+        if self.offset is not None and beacon.offset != self.offset:
+            self.foreign_offset = beacon.offset
+            return False
+        boundary_mono = received_mono + beacon.emit_in_s
+        local = self.fallback.now(True) + timedelta(seconds=boundary_mono - time.monotonic())
+        offset = (beacon.boundary_utc - local).total_seconds()
+        with self._lock:
+            last = self._last
+            if last is not None and last.session == beacon.session:
+                expected_s = (beacon.boundary_ds - last.boundary_ds) / SLOTS_PER_SECOND
+                played_s = (beacon.frames - last.frames) / beacon.samplerate
+                if abs(played_s - expected_s) > self.step_tolerance_s:
+                    self._offsets.clear()
+                    self.leader_steps += 1
+            elif last is not None:
+                self._offsets.clear()
+            self._offsets.append(offset)
+            self._last = beacon
+            self._last_mono = received_mono
+            self.beacons += 1
+        return True
+
+    @property
+    def locked(self) -> bool:
+        last_mono = self._last_mono
+        return last_mono is not None and time.monotonic() - last_mono <= self.holdover_s
+
+    @property
+    def offset_s(self) -> float | None:
+        """
+        Leader time minus fallback clock time (positive: leader ahead).
+        """
+        with self._lock:
+            return max(self._offsets) if self._offsets else None
+
+    def now(self, use_utc: bool) -> datetime:
+        offset = self.offset_s
+        if offset is None or not self.locked:
+            return self.fallback.now(use_utc)
+        utc = self.fallback.now(True) + timedelta(seconds=offset)
+        return utc if use_utc else utc.astimezone()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+    def describe(self) -> str:
+        last = self._last
+        if last is None:
+            if self.foreign_offset is not None:
+                return (
+                    f"no leader (ignoring a leader with offset {self.foreign_offset:+d} s, "
+                    f"ours is {self.offset:+d} s)"
+                )
+            return "no leader"
+        offset = self.offset_s
+        offset_str = "n/a" if offset is None else f"{offset * 1e3:+.3f} ms"
+        state = "locked" if self.locked else "holdover expired"
+        return (
+            f"leader {last.session:08x} {state}, {self.beacons} beacons, "
+            f"{self.leader_steps} leader steps, offset={offset_str}"
+        )
+
+
+def _sender_socket(interface: str, ttl: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    try:
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, ttl)
+        # Loopback keeps followers on the leader's own host working.
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(interface))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _receiver_socket(group: tuple[str, int], interface: str) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    try:
+        # Several followers on one host share the port.
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind(("", group[1]))
+        membership = struct.pack("4s4s", socket.inet_aton(group[0]), socket.inet_aton(interface))
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        sock.settimeout(0.2)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+class CoordinationLeader:
+    """
+    Broadcasts the streamer's emitted slot boundaries as timing beacons.
+
+    Reads the same per-block edge probes as `EdgeDiscipline` (so it needs the
+    direct callback path) and multicasts one `Beacon` per new probe, at most
+    every `interval_s`.
+    """
+
+    def __init__(
+        self,
+        group: tuple[str, int] = (DEFAULT_GROUP, DEFAULT_PORT),
+        *,
+        interface: str = "0.0.0.0",
+        ttl: int = 1,
+        interval_s: float = 0.1,
+    ):
+        self.group = group
+        self.interface = interface
+        self.ttl = int(ttl)
+        self.interval_s = float(interval_s)
+        self.session = int.from_bytes(os.urandom(4), "big")
+        self.streamer: RealtimeStreamer | None = None
+        self.sent = 0
+        self.error: str | None = None
+        self._last_probe: tuple | None = None
+        self._sock: socket.socket | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def beacon(self) -> Beacon | None:
+        """
+        Builds a beacon from the latest probe, or returns None when no new
+        probe is available.
+        """
+        s = self.streamer
+        probe = s._edge_probe
+        if probe is None or probe is self._last_probe:
+            return None
+        self._last_probe = probe
+        _, _, slot, edge_offset, frames = probe
+        boundary_mono, boundary_utc = probe_boundary(s, probe)
+        # Snap to the slot grid the counters claim, so followers get the leader's edge, not its clock.
+        error_slots = edge_error_slots(boundary_utc, slot, s.config.offset)
+        boundary_ds = round(boundary_utc.timestamp() * SLOTS_PER_SECOND - error_slots)
+        return Beacon(
+            session=self.session,
+            seq=self.sent,
+            samplerate=s.config.samplerate,
+            offset=s.config.offset,
+            slot=slot,
+            boundary_ds=boundary_ds,
+            frames=frames + edge_offset,
+            emit_in_s=boundary_mono - time.monotonic(),
+        )
+
+    def send(self) -> bool:
+        beacon = self.beacon()
+        if beacon is None:
+            return False
+        try:
+            self._sock.sendto(beacon.pack(), self.group)
+        except OSError as exc:
+            self.error = str(exc)
+            return False
+        self.sent += 1
+        return True
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self.send()
+
+    def start(self, streamer: RealtimeStreamer) -> None:
+        self.streamer = streamer
+        self._sock = _sender_socket(self.interface, self.ttl)
+        streamer._edge_probe_enabled = True
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="dcf77gen-coord-leader", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self.streamer is not None:
+            self.streamer._edge_probe_enabled = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+class CoordinationFollower:
+    """
+    Background receiver feeding leader beacons into a `LeaderClock`.
+
+    Streaming with that clock and edge discipline moves this host's pulse
+    edges onto the leader's.
+    """
+
+    def __init__(
+        self,
+        clock: LeaderClock,
+        group: tuple[str, int] = (DEFAULT_GROUP, DEFAULT_PORT),
+        *,
+        interface: str = "0.0.0.0",
+    ):
+        self.clock = clock
+        self.group = group
+        self.interface = interface
+        self.received = 0
+        self.rejected = 0
+        self.error: str | None = None
+        self._sock: socket.socket | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                data = self._sock.recv(256)
+            except socket.timeout:
+                continue
+            except OSError as exc:
+                if not self._stop.is_set():
+                    self.error = str(exc)
+                return
+            received = time.monotonic()
+            try:
+                beacon = Beacon.unpack(data)
+            except ValueError:
+                self.rejected += 1
+                continue
+            if not self.clock.on_beacon(beacon, received):
+                self.rejected += 1
+                continue
+            self.received += 1
+
+    def start(self) -> None:
+        self._sock = _receiver_socket(self.group, self.interface)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="dcf77gen-coord-follower", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def wait_for_lock(self, timeout_s: float) -> bool:
+        deadline = time.monotonic() + timeout_s
+        while time.monotonic() < deadline:
+            if self.clock.locked:
+                return True
+            if self.error is not None:
+                return False
+            time.sleep(0.05)
+        return self.clock.locked
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any
+import sounddevice as sd
+
+CANDIDATE_SAMPLERATES = (44100, 48000, 88200, 96000, 176400, 192000, 352800, 384000)
+CACHE_VERSION = 1
+
+
+def default_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "dcf77gen"
+
+
+@dataclass(frozen=True)
+class DeviceCapabilities:
+    """
+    Probed output capabilities of one device, keyed by host API and name.
+    """
+    name: str
+    hostapi: str
+    max_output_channels: int
+    default_samplerate: int
+    default_low_output_latency: float
+    default_high_output_latency: float
+    samplerates: tuple[int, ...]     # probed and supported
+    unsupported: tuple[int, ...]     # probed and rejected
+
+    @property
+    def key(self) -> str:
+        return device_key(self.hostapi, self.name)
+
+    def supports(self, samplerate: int) -> bool | None:
+        # None means "never probed"; callers should probe and `record()` it.
+        if samplerate in self.samplerates:
+            return True
+        if samplerate in self.unsupported:
+            return False
+        return None
+
+
+def device_key(hostapi: str, name: str) -> str:
+    return f"{hostapi}::{name}"
+
+
+class DeviceCapabilityCache:
+    """
+    On-disk cache of output-device capabilities.
+
+    Enumerating devices is cheap; probing samplerates opens each device and
+    can take seconds on ALSA/JACK hosts. Probes therefore run concurrently
+    (one worker per device, rates sequential within a device so a device is
+    never opened twice at once) and are stored on disk. The cache is
+    invalidated whenever the enumerated device list changes.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        *,
+        candidates: Sequence[int] = CANDIDATE_SAMPLERATES,
+        max_workers: int = 8,
+        query_devices: Callable[..., Any] | None = None,
+        query_hostapis: Callable[..., Any] | None = None,
+        check_output_settings: Callable[..., Any] | None = None,
+    ):
+        self.path = path if path is not None else default_cache_dir() / "devices.json"
+        self.candidates = tuple(int(r) for r in candidates)
+        self.max_workers = max(1, int(max_workers))
+        self._query_devices = query_devices or sd.query_devices
+        self._query_hostapis = query_hostapis or sd.query_hostapis
+        self._check_output_settings = check_output_settings or sd.check_output_settings
+        self._devices: list[dict[str, Any]] | None = None
+        self._hostapis: list[str] = []
+        self._entries: dict[str, DeviceCapabilities] = {}
+
+    # -- enumeration -------------------------------------------------------------
+
+    def _enumerate(self) -> list[dict[str, Any]]:
+        if self._devices is None:
+            self._devices = [dict(dev) for dev in self._query_devices()]
+            self._hostapis = [str(api["name"]) for api in self._query_hostapis()]
+        return self._devices
+
+    def _hostapi_name(self, dev: dict[str, Any]) -> str:
+        idx = int(dev.get("hostapi", -1))
+        return self._hostapis[idx] if 0 <= idx < len(self._hostapis) else str(idx)
+
+    def _fingerprint(self) -> str:
+        rows = [
+            (str(dev.get("name", "")), self._hostapi_name(dev), int(dev.get("max_output_channels", 0)))
+            for dev in self._enumerate()
+        ]
+        return hashlib.sha1(json.dumps(rows).encode("utf-8")).hexdigest()
+
+    def output_devices(self) -> list[tuple[int, dict[str, Any]]]:
+        return [
+            (i, dev)
+            for i, dev in enumerate(self._enumerate())
+            if int(dev.get("max_output_channels", 0)) > 0
+        ]
+
+    def input_devices(self) -> list[tuple[int, dict[str, Any]]]:
+        return [
+            (i, dev)
+            for i, dev in enumerate(self._enumerate())
+            if int(dev.get("max_input_channels", 0)) > 0
+        ]
+
+    # -- probing -------------------------------------------------------------------
+
+    def _probe_rates(self, device_id: int, rates: Sequence[int]) -> tuple[list[int], list[int]]:
+        ok: list[int] = []
+        bad: list[int] = []
+        for rate in rates:
+            try:
+                self._check_output_settings(device_id, samplerate=rate)
+            except Exception:
+                bad.append(rate)
+            else:
+                ok.append(rate)
+        return ok, bad
+
+    def _probe_device(self, device_id: int, dev: dict[str, Any]) -> DeviceCapabilities:
+        default_rate = int(dev.get("default_samplerate", 0))
+        rates = sorted(set(self.candidates) | ({default_rate} if default_rate > 0 else set()))
+        ok, bad = self._probe_rates(device_id, rates)
+        return DeviceCapabilities(
+            name=str(dev.get("name", "")),
+            hostapi=self._hostapi_name(dev),
+            max_output_channels=int(dev.get("max_output_channels", 0)),
+            default_samplerate=default_rate,
+            default_low_output_latency=float(dev.get("default_low_output_latency", 0.0)),
+            default_high_output_latency=float(dev.get("default_high_output_latency", 0.0)),
+            samplerates=tuple(ok),
+            unsupported=tuple(bad),
+        )
+
+    def refresh(self) -> None:
+        """
+        Re-probes every output device concurrently and rewrites the cache file.
+        """
+        self._devices = None
+        outputs = self.output_devices()
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, max(1, len(outputs)))) as pool:
+            probed = list(pool.map(lambda item: self._probe_device(*item), outputs))
+        self._entries = {caps.key: caps for caps in probed}
+        self.save()
+
+    def load(self, *, force_refresh: bool = False) -> None:
+        """
+        Loads the cache file, re-probing if it is missing, stale or corrupt.
+        """
+        if not force_refresh:
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                if data.get("version") == CACHE_VERSION and data.get("fingerprint") == self._fingerprint():
+                    self._entries = {}
+                    for raw in data.get("devices", []):
+                        raw["samplerates"] = tuple(raw["samplerates"])
+                        raw["unsupported"] = tuple(raw["unsupported"])
+                        caps = DeviceCapabilities(**raw)
+                        self._entries[caps.key] = caps
+                    return
+            except (OSError, ValueError, TypeError, KeyError):
+                pass
+        self.refresh()
+
+    def save(self) -> None:
+        data = {
+            "version": CACHE_VERSION,
+            "fingerprint": self._fingerprint(),
+            "devices": [asdict(caps) for caps in self._entries.values()],
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, indent=1), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            # A read-only home must not prevent streaming; we just probe again next time.
+            pass
+
+    # -- lookups ---------------------------------------------------------------
+
+    def _resolve_id(self, device_id: int | None) -> int:
+        if device_id is not None:
+            return int(device_id)
+        return int(self._query_devices(None, "output")["index"])
+
+    def capabilities(self, device_id: int | None) -> DeviceCapabilities | None:
+        device_id = self._resolve_id(device_id)
+        devices = self._enumerate()
+        if not 0 <= device_id < len(devices):
+            return None
+        dev = devices[device_id]
+        return self._entries.get(device_key(self._hostapi_name(dev), str(dev.get("name", ""))))
+
+    def check_samplerate(self, device_id: int | None, samplerate: int) -> None:
+        """
+        Raises if `samplerate` is not supported; probes (and records) rates
+        that are not in the cache yet.
+        """
+        caps = self.capabilities(device_id)
+        known = caps.supports(samplerate) if caps is not None else None
+        if known is True:
+            return
+        if known is False:
+            # A device that was busy or unplugged during the probe stays rejected until re-probed.
+            raise ValueError(
+                f"samplerate {samplerate} Hz rejected by device (cached probe; run with --refresh-devices to re-probe)"
+            )
+        resolved = self._resolve_id(device_id)
+        try:
+            self._check_output_settings(resolved, samplerate=samplerate)
+        except Exception:
+            self.record(resolved, samplerate, False)
+            raise
+        self.record(resolved, samplerate, True)
+
+    def record(self, device_id: int, samplerate: int, supported: bool) -> None:
+        caps = self.capabilities(device_id)
+        if caps is None:
+            return
+        ok = set(caps.samplerates)
+        bad = set(caps.unsupported)
+        (ok if supported else bad).add(int(samplerate))
+        (bad if supported else ok).discard(int(samplerate))
+        self._entries[caps.key] = DeviceCapabilities(
+            **{**asdict(caps), "samplerates": tuple(sorted(ok)), "unsupported": tuple(sorted(bad))}
+        )
+        self.save()
+
+    def format_matrix(self) -> str:
+        """
+        Capability matrix for `--list-devices`.
+        """
+        rates = sorted(set(self.candidates).union(*(set(c.samplerates) for c in self._entries.values())))
+        rate_cols = " ".join(f"{r / 1000:>6g}k" for r in rates)
+        lines = [f"{'ID':>3}  {'Host API':<12} {'Ch':>3} {'Lat lo/hi (ms)':>15}  {rate_cols}  Name"]
+        for device_id, dev in self.output_devices():
+            caps = self.capabilities(device_id)
+            if caps is None:
+                continue
+            marks = " ".join(
+                f"{('yes' if caps.supports(r) else 'no' if caps.supports(r) is False else '?'):>7}" for r in rates
+            )
+            latency = f"{caps.default_low_output_latency * 1e3:.1f}/{caps.default_high_output_latency * 1e3:.1f}"
+            lines.append(
+                f"{device_id:>3}  {caps.hostapi[:12]:<12} {caps.max_output_channels:>3} {latency:>15}  {marks}  {caps.name}"
+            )
+        return "\n".join(lines)
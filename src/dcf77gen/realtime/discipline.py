@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import statistics
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from dcf77gen.dsp.schedule import SLOTS_PER_MINUTE, SLOTS_PER_SECOND
+
+if TYPE_CHECKING:
+    from dcf77gen.realtime.streamer import RealtimeStreamer
+
+
+def slot_position(utc: datetime, offset_s: int) -> float:
+    """
+    Fractional 100 ms slot index within the minute that `utc` falls into,
+    including the configured transmit offset.
+    """
+    sec = (utc.second + offset_s) % 60
+    return sec * SLOTS_PER_SECOND + utc.microsecond / (1e6 / SLOTS_PER_SECOND)
+
+
+def edge_error_slots(boundary_utc: datetime, slot: int, offset_s: int) -> float:
+    """
+    How late (positive) or early the boundary of counter slot `slot` is
+    emitted, in slots, wrapped into [-300, 300).
+    """
+    err = slot_position(boundary_utc, offset_s) - slot
+    half = SLOTS_PER_MINUTE / 2
+    return (err + half) % SLOTS_PER_MINUTE - half
+
+
+def edge_correction(error_frames: int, edge_offset: int, blocksize: int) -> tuple[int, int]:
+    """
+    Returns `(slot_delta, new_edge_offset)` that moves every slot boundary
+    `error_frames` earlier (negative: later).
+
+    Boundaries sit `edge_offset` frames into each block; moving them past a
+    block edge shifts the counters by whole slots instead.
+    """
+    q, r = divmod(edge_offset - error_frames, blocksize)
+    return -q, r
+
+
+def probe_boundary(streamer: RealtimeStreamer, probe: tuple) -> tuple[float, datetime]:
+    """
+    Converts an edge probe to the monotonic and clock (UTC) time at which the
+    probed slot boundary leaves the output, including the calibrated output
+    latency correction.
+    """
+    mono_entry, lead, _, edge_offset, _ = probe
+    s = streamer
+    boundary_mono = mono_entry + lead + s.output_latency_correction_s + edge_offset / s.config.samplerate
+    return boundary_mono, s.clock.now(True) + timedelta(seconds=boundary_mono - time.monotonic())
+
+
+class EdgeDiscipline:
+    """
+    Keeps the emitted slot boundaries on the streamer's clock.
+
+    The direct callback stores a probe (monotonic entry time, DAC lead, slot
+    and edge offset) per block. This thread converts the probed emission time
+    of the slot boundary, including the streamer's calibrated output latency
+    correction, to clock time, takes the median error over
+    `window` probes and hands a correction to the callback, which applies
+    it at the start of its next block: whole slots via the counters,
+    fractions by moving the edge up to one block into the audio. With a PPS
+    disciplined clock this keeps second and minute edges within a few
+    samples of UTC regardless of the 100 ms block grid.
+    """
+
+    def __init__(
+        self,
+        streamer: RealtimeStreamer,
+        *,
+        interval_s: float = 0.1,
+        window: int = 10,
+        deadband_s: float = 0.0001,
+    ):
+        self.streamer = streamer
+        self.interval_s = float(interval_s)
+        self.window = max(1, int(window))
+        self.deadband_frames = max(1, int(round(deadband_s * streamer.config.samplerate)))
+        self._errors: list[float] = []
+        self._last_probe: tuple | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.corrections = 0
+        self.last_error_s: float | None = None
+
+    def measure(self) -> float | None:
+        """
+        Returns the boundary error in seconds for the latest probe, or None
+        when no new probe is available.
+        """
+        s = self.streamer
+        probe = s._edge_probe
+        if probe is None or probe is self._last_probe:
+            return None
+        self._last_probe = probe
+        _, boundary_utc = probe_boundary(s, probe)
+        return edge_error_slots(boundary_utc, probe[2], s.config.offset) / SLOTS_PER_SECOND
+
+    def step(self) -> None:
+        error_s = self.measure()
+        if error_s is None:
+            return
+        self._errors.append(error_s)
+        if len(self._errors) < self.window:
+            return
+        error_s = statistics.median(self._errors)
+        self._errors.clear()
+        self.last_error_s = error_s
+        s = self.streamer
+        error_frames = int(round(error_s * s.config.samplerate))
+        if abs(error_frames) < self.deadband_frames or s._pending_correction is not None:
+            return
+        s._pending_correction = edge_correction(error_frames, s.edge_offset_frames, s.blocksize)
+        self.corrections += 1
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self.step()
+
+    def start(self) -> None:
+        self.streamer._edge_probe_enabled = True
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="dcf77gen-edge-discipline", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.streamer._edge_probe_enabled = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+import gc
+import threading
+import time
+from typing import Any
+import numpy as np
+
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.realtime.sinks import NullSink
+from dcf77gen.realtime.streamer import RealtimeStreamer
+
+# Callback sub-stages. "wake" is the lateness of the paced release itself
+# (scheduler/GIL latency before the callback starts); "other" is callback time
+# not covered by a wrapped stage (schedule lookup, copy into outdata).
+STAGES = ("wake", "status", "render", "advance", "refresh", "other")
+
+
+@dataclass(frozen=True)
+class LoadConfig:
+    """
+    Synthetic background load applied while the benchmark runs.
+    """
+    gil_threads: int = 0        # pure-Python busy loops holding the GIL
+    numpy_threads: int = 0      # matrix multiplies / sorts (mostly GIL-free)
+    memory_mb: int = 0          # allocate-and-touch churn of this size
+    gc_interval_s: float = 0.0  # forced gc.collect() period (0 disables)
+
+    def __post_init__(self) -> None:
+        if self.gil_threads < 0 or self.numpy_threads < 0 or self.memory_mb < 0:
+            raise ValueError("load thread counts and memory_mb must be >= 0")
+        if self.gc_interval_s < 0.0:
+            raise ValueError("gc_interval_s must be >= 0")
+
+
+class BackgroundLoad:
+    """
+    Context manager running the threads described by a `LoadConfig`.
+    """
+
+    def __init__(self, load: LoadConfig):
+        self.load = load
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def _gil_worker(self) -> None:
+        while not self._stop.is_set():
+            total = 0
+            for i in range(20000):
+                total += i * i
+
+    def _numpy_worker(self) -> None:
+        rng = np.random.default_rng(0)
+        a = rng.standard_normal((256, 256))
+        while not self._stop.is_set():
+            b = a @ a
+            np.sort(b, axis=None)
+
+    def _memory_worker(self) -> None:
+        n = self.load.memory_mb * (1 << 20) // 8
+        while not self._stop.is_set():
+            chunk = np.empty(n, dtype=np.float64)
+            chunk[::512] = 1.0  # touch every page
+            del chunk
+
+    def _gc_worker(self) -> None:
+        while not self._stop.wait(self.load.gc_interval_s):
+            garbage = []
+            for _ in range(10000):
+                node: list[Any] = []
+                node.append(node)
+                garbage.append(node)
+            del garbage
+            gc.collect()
+
+    def __enter__(self) -> BackgroundLoad:
+        workers: list[Callable[[], None]] = []
+        workers += [self._gil_worker] * self.load.gil_threads
+        workers += [self._numpy_worker] * self.load.numpy_threads
+        if self.load.memory_mb > 0:
+            workers.append(self._memory_worker)
+        if self.load.gc_interval_s > 0.0:
+            workers.append(self._gc_worker)
+        self._stop.clear()
+        self._threads = [threading.Thread(target=w, daemon=True) for w in workers]
+        for t in self._threads:
+            t.start()
+        return self
+
+    def __exit__(self, _exc_type, _exc, _tb) -> bool:
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout=5.0)
+        self._threads = []
+        return False
+
+
+@dataclass
+class JitterReport:
+    blocks: int
+    period_s: float
+    budget_s: float
+    misses: int
+    worst_lateness_s: float
+    callback_p50_s: float
+    callback_p99_s: float
+    callback_max_s: float
+    stage_max_s: dict[str, float] = field(default_factory=dict)
+    miss_stages: dict[str, int] = field(default_factory=dict)
+
+
+class _StageTimer:
+    def __init__(self, blocks: int):
+        self.durations = np.zeros((blocks, len(STAGES)), dtype=np.float64)
+        self.row = 0
+
+    def wrap(self, stage: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        col = STAGES.index(stage)
+
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.durations[self.row, col] += time.perf_counter() - t0
+
+        return timed
+
+
+def _instrument(streamer: RealtimeStreamer, timer: _StageTimer) -> None:
+    # Instance-level wrappers: the real `_callback` body runs unchanged.
+    streamer._record_callback_status = timer.wrap("status", streamer._record_callback_status)
+    streamer.osc.render = timer.wrap("render", streamer.osc.render)
+    streamer.state.advance_block = timer.wrap("advance", streamer.state.advance_block)
+    streamer._refresh_time_bits = timer.wrap("refresh", streamer._refresh_time_bits)
+
+
+def run_jitter_benchmark(
+    config: GeneratorConfig,
+    blocks: int,
+    load: LoadConfig | None = None,
+    budget_s: float | None = None,
+) -> JitterReport:
+    """
+    Runs the real `RealtimeStreamer._callback` with paced deadlines.
+
+    Block `k` is released at `t0 + k * period` (period = one 100 ms block)
+    and must finish within `budget_s` of its release (default: one period,
+    i.e. a double-buffered PortAudio stream). Lower budgets model tighter
+    `latency` settings.
+    """
+    if blocks <= 0:
+        raise ValueError("blocks must be > 0")
+
+    streamer = RealtimeStreamer(config)
+    streamer.prime()
+    sink = NullSink(config.samplerate, streamer.blocksize, channels=config.channels)
+    period_s = streamer.blocksize / config.samplerate
+    budget = period_s if budget_s is None else float(budget_s)
+    if budget <= 0.0:
+        raise ValueError("budget_s must be > 0")
+
+    timer = _StageTimer(blocks)
+    _instrument(streamer, timer)
+    callback_s = np.zeros(blocks, dtype=np.float64)
+    lateness_s = np.zeros(blocks, dtype=np.float64)
+    wake_col = STAGES.index("wake")
+    other_col = STAGES.index("other")
+
+    with BackgroundLoad(load or LoadConfig()):
+        t0 = time.perf_counter() + period_s
+        for k in range(blocks):
+            release = t0 + k * period_s
+            delay = release - time.perf_counter()
+            if delay > 0.0:
+                time.sleep(delay)
+            start = time.perf_counter()
+            timer.row = k
+            sink.pull(streamer._callback)
+            finish = time.perf_counter()
+
+            row = timer.durations[k]
+            row[wake_col] = max(0.0, start - release)
+            callback_s[k] = finish - start
+            row[other_col] = max(0.0, callback_s[k] - row[1:other_col].sum())
+            lateness_s[k] = finish - (release + budget)
+
+    missed = lateness_s > 0.0
+    stage_max = timer.durations.max(axis=0)
+    blamed = timer.durations[missed].argmax(axis=1) if missed.any() else np.zeros(0, dtype=int)
+    return JitterReport(
+        blocks=blocks,
+        period_s=period_s,
+        budget_s=budget,
+        misses=int(missed.sum()),
+        worst_lateness_s=float(lateness_s.max()),
+        callback_p50_s=float(np.percentile(callback_s, 50)),
+        callback_p99_s=float(np.percentile(callback_s, 99)),
+        callback_max_s=float(callback_s.max()),
+        stage_max_s={name: float(stage_max[i]) for i, name in enumerate(STAGES)},
+        miss_stages={name: int((blamed == i).sum()) for i, name in enumerate(STAGES) if (blamed == i).any()},
+    )
+
+
+def format_jitter_report(report: JitterReport) -> str:
+    ms = 1e3
+    lines = []
+    lines.append(f"blocks: {report.blocks} (period {report.period_s * ms:.1f} ms, budget {report.budget_s * ms:.1f} ms)")
+    lines.append(f"deadline misses: {report.misses}")
+    lines.append(f"worst lateness: {report.worst_lateness_s * ms:+.3f} ms")
+    lines.append(
+        f"callback duration: p50={report.callback_p50_s * ms:.3f} ms "
+        f"p99={report.callback_p99_s * ms:.3f} ms max={report.callback_max_s * ms:.3f} ms"
+    )
+    lines.append("stage max:")
+    for name in STAGES:
+        lines.append(f"  {name:<8} {report.stage_max_s.get(name, 0.0) * ms:9.3f} ms")
+    if report.miss_stages:
+        lines.append("overrunning stage per miss:")
+        for name, count in report.miss_stages.items():
+            lines.append(f"  {name:<8} {count}")
+    return "\n".join(lines)
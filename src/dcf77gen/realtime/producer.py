@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from collections import deque
+import math
+import threading
+from typing import TYPE_CHECKING
+import numpy as np
+
+from dcf77gen.realtime.ringbuffer import SampleRingBuffer
+
+if TYPE_CHECKING:
+    from dcf77gen.realtime.streamer import RealtimeStreamer
+
+
+# Counters of a buffered block as it will be played, for the callback's trace.
+_BLOCK_DTYPE = np.dtype([("count_sec", "<i4"), ("count_deci", "<i4"), ("amplitude", "<f4"), ("time_bits", "<u8")])
+
+
+class RenderAheadProducer:
+    """
+    Renders the streamer's blocks ahead of playback into a `SampleRingBuffer`.
+
+    The producer thread keeps `lookahead_s` of audio buffered, so the stream
+    callback only copies samples out. For every buffered block the generator
+    state at its start is remembered, which lets `flush()` drop unplayed audio
+    and re-render it after a reseed or reconfiguration. The counters of every
+    buffered block are also kept in a preallocated table that `played_block()`
+    reads for the block being played.
+
+    The streamer itself never needs a flush: the minute refresh runs inside
+    `_render_block()`, so the producer renders it in stream order, and a
+    stream reconnect discards everything with `reset()` instead.
+    """
+
+    # Frames kept untouched in front of the read position on flush: the
+    # consumer may be copying one block while another callback is pending.
+    GUARD_BLOCKS = 2
+
+    def __init__(
+        self,
+        streamer: RealtimeStreamer,
+        lookahead_s: float = 0.5,
+        ring: SampleRingBuffer | None = None,
+    ):
+        if lookahead_s <= 0.0:
+            raise ValueError("lookahead_s must be > 0")
+        self.streamer = streamer
+        self.blocksize = streamer.blocksize
+        blocks = max(self.GUARD_BLOCKS + 1, math.ceil(lookahead_s * streamer.config.samplerate / self.blocksize))
+        self.lookahead_frames = blocks * self.blocksize
+        self.ring = ring if ring is not None else SampleRingBuffer(self.lookahead_frames + self.blocksize)
+        if self.ring.capacity < self.lookahead_frames:
+            raise ValueError("ring buffer is smaller than the requested lookahead")
+        self._history: deque[tuple[int, tuple]] = deque()
+        # Reads and writes always start on block boundaries (an underrun reads up
+        # to the write position), so the block index keys this table.
+        self._blocks = np.zeros(self.ring.capacity // self.blocksize + 2, dtype=_BLOCK_DTYPE)
+        self._flush_requested = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._period_s = self.blocksize / streamer.config.samplerate
+
+    def _snapshot(self) -> tuple:
+        s = self.streamer
+        return (s.state.count_sec, s.state.count_dec, s.state.time_bits, s.schedule, s.osc._sample_index)
+
+    def _restore(self, snapshot: tuple) -> None:
+        s = self.streamer
+        s.state.count_sec, s.state.count_dec, s.state.time_bits, s.schedule, s.osc._sample_index = snapshot
+
+    def fill(self) -> int:
+        """
+        Renders blocks until the lookahead is satisfied; returns blocks rendered.
+        """
+        rendered = 0
+        while self.ring.available_read() + self.blocksize <= self.lookahead_frames:
+            if self.ring.available_write() < self.blocksize:
+                self.ring.note_full()
+                break
+            write_pos = self.ring.write_pos
+            self._history.append((write_pos, self._snapshot()))
+            s = self.streamer
+            # Filled before `write()` publishes the block, so the consumer never sees a torn entry.
+            self._blocks[(write_pos // self.blocksize) % len(self._blocks)] = (
+                s.state.count_sec,
+                s.state.count_dec,
+                s.schedule.amplitudes[s.state.slot],
+                s.state.time_bits,
+            )
+            self.ring.write(s._render_block(self.blocksize))
+            rendered += 1
+        read_pos = self.ring.read_pos
+        while self._history and self._history[0][0] + self.blocksize <= read_pos:
+            self._history.popleft()
+        return rendered
+
+    def played_block(self) -> np.void:
+        """
+        Counters (`count_sec`, `count_deci`, `amplitude`, `time_bits`) of the
+        block at the ring's read position, i.e. the one the next read plays.
+        Only meaningful while that block is buffered.
+        """
+        return self._blocks[(self.ring.read_pos // self.blocksize) % len(self._blocks)]
+
+    def flush(self) -> None:
+        """
+        Requests that unplayed audio beyond the guard region be re-rendered.
+
+        Safe to call from any thread; the producer thread applies it before its
+        next fill. Without a running thread the flush is applied immediately.
+        """
+        if self._thread is None:
+            self._apply_flush()
+        else:
+            self._flush_requested.set()
+
+    def _apply_flush(self) -> None:
+        guard = self.ring.read_pos + self.GUARD_BLOCKS * self.blocksize
+        for i, (start, snapshot) in enumerate(self._history):
+            if start >= guard:
+                self.ring.retract_write(start)
+                self._restore(snapshot)
+                while len(self._history) > i:
+                    self._history.pop()
+                return
+
+    def reset(self) -> None:
+        """
+        Drops all unplayed audio and history. Only valid while no stream is
+        consuming (e.g. between a stream failure and its reopen), because the
+        guard region is discarded too; call `start()` again afterwards.
+        """
+        self.stop()
+        self._flush_requested.clear()
+        self.ring.retract_write(self.ring.read_pos)
+        self._history.clear()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self._period_s / 4):
+            if self._flush_requested.is_set():
+                self._flush_requested.clear()
+                self._apply_flush()
+            if self.ring.available_read() < self.blocksize:
+                self.ring.note_late()
+            self.fill()
+
+    def start(self) -> None:
+        # Prefill synchronously so the first callback never sees an empty ring.
+        self.fill()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="dcf77gen-render-ahead", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
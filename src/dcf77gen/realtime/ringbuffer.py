@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from multiprocessing import shared_memory
+import numpy as np
+
+# Header slots (int64). Each slot is written by exactly one side.
+_WRITE_POS = 0         # producer: total frames committed
+_READ_POS = 1          # consumer: total frames consumed
+_UNDERRUN_EVENTS = 2   # consumer: reads that had to zero-fill
+_UNDERRUN_FRAMES = 3   # consumer: frames zero-filled
+_LATE_EVENTS = 4       # producer: wake-ups with less than one block buffered
+_FULL_WAITS = 5        # producer: wake-ups with no room to render
+_FLUSHES = 6           # producer: retractions of unplayed audio
+_HEADER_SLOTS = 8
+_HEADER_BYTES = _HEADER_SLOTS * 8
+
+
+class SampleRingBuffer:
+    """
+    Single-producer/single-consumer float32 sample ring.
+
+    Positions are monotonic frame counters, so fill level is simply
+    `write_pos - read_pos` and neither side needs a lock. Storage is
+    preallocated, either privately or in a named `SharedMemory` block that
+    another process can attach to with `SampleRingBuffer.attach()`.
+    """
+
+    def __init__(self, capacity_frames: int, *, shared: bool = False, name: str | None = None):
+        if capacity_frames <= 0:
+            raise ValueError("capacity_frames must be > 0")
+        self.capacity = int(capacity_frames)
+        nbytes = _HEADER_BYTES + self.capacity * 4
+        self._shm: shared_memory.SharedMemory | None = None
+        if shared or name is not None:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=nbytes)
+            buf = self._shm.buf
+        else:
+            buf = bytearray(nbytes)
+        self._owner = True
+        self._bind(buf)
+        self._header[:] = 0
+
+    @classmethod
+    def attach(cls, name: str, capacity_frames: int) -> SampleRingBuffer:
+        """
+        Attaches to a ring created in another process.
+        """
+        ring = cls.__new__(cls)
+        ring.capacity = int(capacity_frames)
+        ring._shm = shared_memory.SharedMemory(name=name, create=False)
+        ring._owner = False
+        ring._bind(ring._shm.buf)
+        return ring
+
+    def _bind(self, buf: memoryview | bytearray) -> None:
+        self._header = np.ndarray((_HEADER_SLOTS,), dtype=np.int64, buffer=buf)
+        self._data = np.ndarray((self.capacity,), dtype=np.float32, buffer=buf, offset=_HEADER_BYTES)
+
+    @property
+    def name(self) -> str | None:
+        return self._shm.name if self._shm is not None else None
+
+    def close(self) -> None:
+        if self._shm is None:
+            return
+        # Drop numpy views before releasing the mapping.
+        del self._header
+        del self._data
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
+
+    # -- shared accounting -------------------------------------------------
+
+    @property
+    def write_pos(self) -> int:
+        return int(self._header[_WRITE_POS])
+
+    @property
+    def read_pos(self) -> int:
+        return int(self._header[_READ_POS])
+
+    def available_read(self) -> int:
+        return int(self._header[_WRITE_POS] - self._header[_READ_POS])
+
+    def available_write(self) -> int:
+        return self.capacity - self.available_read()
+
+    def stats(self) -> dict[str, int]:
+        h = self._header
+        return {
+            "fill": int(h[_WRITE_POS] - h[_READ_POS]),
+            "underrun_events": int(h[_UNDERRUN_EVENTS]),
+            "underrun_frames": int(h[_UNDERRUN_FRAMES]),
+            "late_events": int(h[_LATE_EVENTS]),
+            "full_waits": int(h[_FULL_WAITS]),
+            "flushes": int(h[_FLUSHES]),
+        }
+
+    # -- producer side ---------------------------------------------------------
+
+    def write_views(self, frames: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns up to two writable views covering the next `frames` free frames
+        (the second is empty unless the region wraps). Render into them and
+        call `commit_write(frames)`.
+        """
+        if frames > self.available_write():
+            raise ValueError("not enough free space in ring buffer")
+        start = self.write_pos % self.capacity
+        first = min(frames, self.capacity - start)
+        return self._data[start : start + first], self._data[: frames - first]
+
+    def commit_write(self, frames: int) -> None:
+        self._header[_WRITE_POS] += frames
+
+    def write(self, block: np.ndarray) -> None:
+        head, tail = self.write_views(len(block))
+        head[:] = block[: len(head)]
+        tail[:] = block[len(head) :]
+        self.commit_write(len(block))
+
+    def retract_write(self, write_pos: int) -> None:
+        """
+        Discards committed-but-unplayed frames beyond `write_pos`.
+
+        The caller must keep `write_pos` at least one callback block ahead of
+        `read_pos`, since the consumer may be copying that block right now.
+        """
+        if write_pos < self.read_pos or write_pos > self.write_pos:
+            raise ValueError("retract position outside the unplayed region")
+        self._header[_WRITE_POS] = write_pos
+        self._header[_FLUSHES] += 1
+
+    def prefault(self) -> None:
+        """
+        Writes every page of an empty ring so the first producer writes do
+        not page-fault (zeroed allocations are mapped lazily).
+        """
+        if self.available_read():
+            raise ValueError("prefault() requires an empty ring buffer")
+        self._data.fill(0.0)
+
+    def note_late(self) -> None:
+        self._header[_LATE_EVENTS] += 1
+
+    def note_full(self) -> None:
+        self._header[_FULL_WAITS] += 1
+
+    # -- consumer side ---------------------------------------------------------
+
+    def read_into(self, out: np.ndarray) -> int:
+        """
+        Copies up to `len(out)` frames into `out` (two slices at most on wrap)
+        and zero-fills any shortfall as an underrun. Returns frames read.
+        """
+        frames = len(out)
+        read_pos = self.read_pos
+        n = min(frames, int(self._header[_WRITE_POS]) - read_pos)
+        start = read_pos % self.capacity
+        first = min(n, self.capacity - start)
+        out[:first] = self._data[start : start + first]
+        out[first:n] = self._data[: n - first]
+        if n < frames:
+            out[n:] = 0.0
+            self._header[_UNDERRUN_EVENTS] += 1
+            self._header[_UNDERRUN_FRAMES] += frames - n
+        self._header[_READ_POS] = read_pos + n
+        return n
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+import numpy as np
+import sounddevice as sd
+
+from dcf77gen.core.clock import VirtualClock
+
+StreamCallback = Callable[[Any, int, Any, Any], None]
+
+
+class NullSink:
+    """
+    Non-audio sink that pulls blocks from a stream callback synchronously.
+
+    Uses the same `(outdata, frames, time_info, status)` contract as
+    `sd.OutputStream`. When given a `VirtualClock`, the clock advances by one
+    block duration per pull, so DST nights, year rollovers and multi-day soak
+    runs replay in seconds.
+    """
+
+    def __init__(
+        self,
+        samplerate: int,
+        blocksize: int,
+        channels: int = 1,
+        clock: VirtualClock | None = None,
+        on_block: Callable[[np.ndarray], None] | None = None,
+    ):
+        self.samplerate = int(samplerate)
+        self.blocksize = int(blocksize)
+        self.clock = clock
+        self.on_block = on_block
+        self.outdata = np.zeros((self.blocksize, channels), dtype=np.float32)
+        self.blocks_pulled = 0
+        self._block_seconds = self.blocksize / self.samplerate
+
+    def pull(self, callback: StreamCallback) -> bool:
+        """
+        Pulls one block; returns False once the callback raises `sd.CallbackStop`.
+        """
+        try:
+            callback(self.outdata, self.blocksize, None, None)
+        except sd.CallbackStop:
+            return False
+        self.blocks_pulled += 1
+        if self.clock is not None:
+            self.clock.advance(self._block_seconds)
+        if self.on_block is not None:
+            self.on_block(self.outdata)
+        return True
+
+    def run(self, callback: StreamCallback, blocks: int) -> int:
+        """
+        Pulls up to `blocks` blocks and returns the number actually pulled.
+        """
+        pulled = 0
+        while pulled < blocks and self.pull(callback):
+            pulled += 1
+        return pulled
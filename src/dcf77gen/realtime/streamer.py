@@ -1,20 +1,57 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+import gc
 import threading
 import time
 import sys
-from datetime import timedelta
+from datetime import datetime, timedelta, UTC
 from typing import Any
+import numpy as np
 import sounddevice as sd
 
-from dcf77gen import __author__, __copyright__, __license__, __title__, __version__
 from dcf77gen.core.config import GeneratorConfig
 from dcf77gen.core.state import GeneratorState
-from dcf77gen.core.clock import now_dt
-from dcf77gen.protocol.encoder import build_time_bits
-from dcf77gen.dsp.modulation import is_low_pulse
+from dcf77gen.core.clock import Clock, SystemClock, add_elapsed
+from dcf77gen.protocol.encoder import BERLIN_TZ, build_time_bits, format_time_bits_breakdown
 from dcf77gen.dsp.oscillator import SineOscillator
-from dcf77gen.ui.console import print_ui
+from dcf77gen.dsp.schedule import AmplitudeSchedule
+from dcf77gen.realtime.coordination import CoordinationLeader
+from dcf77gen.realtime.discipline import EdgeDiscipline
+from dcf77gen.realtime.producer import RenderAheadProducer
+from dcf77gen.realtime.tap import AnalyzerTap
+from dcf77gen.realtime.trace import FLAG_RENDER_AHEAD, TraceRecorder
+from dcf77gen.realtime.watchdog import ReconnectEvent, StreamWatchdog
+from dcf77gen.ui.console import print_startup_banner, print_ui, render_status_line
+
+
+def describe_output_device(device_id: int | None) -> str:
+    try:
+        if device_id is None:
+            dev = sd.query_devices(None, "output")
+            return f"default output ({dev['name']})"
+        dev = sd.query_devices(device_id, "output")
+        return f"{device_id} ({dev['name']})"
+    except Exception:
+        return "unknown output device"
+
+
+@dataclass(frozen=True)
+class StartupTimings:
+    """
+    Startup phases of `RealtimeStreamer.run()`, in seconds.
+    """
+    warmup_s: float            # warm-up phase before the stream opens
+    startup_s: float           # run() entry to the start of the first callback
+    open_to_callback_s: float  # stream open to the start of the first callback
+    first_callback_s: float    # duration of the first callback
+
+    def format(self) -> str:
+        return (
+            f"startup {self.startup_s * 1e3:.1f} ms (warm-up {self.warmup_s * 1e3:.1f} ms, "
+            f"stream open to first callback {self.open_to_callback_s * 1e3:.1f} ms), "
+            f"first callback {self.first_callback_s * 1e3:.2f} ms"
+        )
 
 
 class RealtimeStreamer:
@@ -25,8 +62,36 @@ class RealtimeStreamer:
     second/deci-second counters once per callback block.
     """
 
-    def __init__(self, config: GeneratorConfig):
+    def __init__(
+        self,
+        config: GeneratorConfig,
+        clock: Clock | None = None,
+        render_ahead_s: float = 0.0,
+        trace: TraceRecorder | None = None,
+        discipline_edges: bool = False,
+        latency_correction_s: float = 0.0,
+        tap: AnalyzerTap | None = None,
+        watchdog: StreamWatchdog | None = None,
+        leader: CoordinationLeader | None = None,
+    ):
+        if render_ahead_s < 0.0:
+            raise ValueError("render_ahead_s must be >= 0")
+        if leader is not None and render_ahead_s > 0.0:
+            raise ValueError("a coordination leader needs the direct callback path (no render-ahead)")
         self.config = config
+        self.clock = clock if clock is not None else SystemClock()
+        self.render_ahead_s = float(render_ahead_s)
+        self.trace = trace
+        self.discipline_edges = bool(discipline_edges)
+        self.tap = tap
+        self.watchdog = watchdog
+        self.leader = leader
+        self.reconnects: list[ReconnectEvent] = []
+        self._callback_count = 0
+        # Calibrated output latency beyond PortAudio's reported DAC time (see `dcf77-calibrate`).
+        self.output_latency_correction_s = float(latency_correction_s)
+        self.producer: RenderAheadProducer | None = None
+        self.discipline: EdgeDiscipline | None = None
         self.state = GeneratorState()
         self.stop_event = threading.Event()
         self._status_lock = threading.Lock()
@@ -42,23 +107,45 @@ class RealtimeStreamer:
         self.blocksize = int(self.config.samplerate // 10)
 
         self.osc = SineOscillator(
-            frequency=self.config.frequency,
+            frequency=self.config.tone_frequency,
             samplerate=self.config.samplerate,
             phase=0.0,
         )
+        self.schedule = AmplitudeSchedule.compile(0, self.config.amplitude, self.config.low_factor)
+
+        # Slot boundaries sit `edge_offset_frames` into each block; the first
+        # frames of a block still carry the previous slot's amplitude.
+        self.edge_offset_frames = 0
+        self._prev_amp = float(self.schedule.amplitudes[0])
+        # Written by `EdgeDiscipline`, consumed by the callback: (slot_delta, edge_offset).
+        self._pending_correction: tuple[int, int] | None = None
+        self._edge_probe_enabled = False
+        # (monotonic, DAC lead, slot, edge offset, frames emitted before the block)
+        self._edge_probe: tuple[float, float, int, int, int] | None = None
+        self.frames_emitted = 0
 
-    def _refresh_time_bits(self) -> None:
+        self.startup_timings: StartupTimings | None = None
+        self._run_started = 0.0
+        self._warmup_s = 0.0
+        self._stream_opened = 0.0
+        self._first_callback_pending = True
+
+    def _refresh_time_bits(self, keep_if_unchanged: bool = False) -> None:
         # Sample wall clock exactly once per refresh.
-        refresh_now = now_dt(self.config.utc)
+        refresh_now = self.clock.now(self.config.utc)
         # When called during second 59, the upcoming data frame starts in the next minute.
         if self.state.count_sec == 59:
-            refresh_now = refresh_now + timedelta(minutes=1)
+            refresh_now = add_elapsed(refresh_now, timedelta(minutes=1))
         res = build_time_bits(refresh_now, utc_mode=self.config.utc)
+        if keep_if_unchanged and res.time_bits == self.state.time_bits:
+            return
         self.state.time_bits = res.time_bits
+        # Compile once per minute; the callback only indexes into the schedule.
+        self.schedule = AmplitudeSchedule.compile(res.time_bits, self.config.amplitude, self.config.low_factor)
 
     def _ui_loop(self, interval_s: float = 0.1) -> None:
         while not self.stop_event.is_set():
-            print_ui(self.state, self.config.utc)
+            print_ui(self.state, self.config.utc, self.schedule, self.clock)
             status_summary = self._status_summary()
             if status_summary and status_summary != self._last_emitted_status_summary:
                 print(f"\n[WARN] PortAudio callback status: {status_summary}", file=sys.stderr, flush=True)
@@ -75,29 +162,10 @@ class RealtimeStreamer:
         self.stop_event.set()
 
     def _describe_output_device(self, device_id: int | None) -> str:
-        try:
-            if device_id is None:
-                dev = sd.query_devices(None, "output")
-                return f"default output ({dev['name']})"
-            dev = sd.query_devices(device_id, "output")
-            return f"{device_id} ({dev['name']})"
-        except Exception:
-            return "unknown output device"
+        return describe_output_device(device_id)
 
     def _print_startup_banner(self, device_id: int | None) -> None:
-        print("=" * 96)
-        print(f"  {__title__} v{__version__}")
-        print(f"  Author: {__author__}")
-        print(f"  License: {__license__}")
-        print(f"  {__copyright__}")
-        print()
-        print(f"  Output device: {self._describe_output_device(device_id)}")
-        print(f"  Samplerate: {self.config.samplerate} Hz")
-        print(f"  Carrier frequency: {self.config.frequency} Hz")
-        print(f"  Amplitude: {self.config.amplitude:.3f}")
-        print(f"  Low-pulse factor: {self.config.low_factor:.3f}")
-        print("  Press <Enter> to terminate")
-        print("=" * 96)
+        print_startup_banner(self.config, self._describe_output_device(device_id))
 
     def _record_callback_status(self, status: Any) -> None:
         if not status:
@@ -117,23 +185,97 @@ class RealtimeStreamer:
     def _status_summary(self) -> str:
         with self._status_lock:
             parts = [f"{k}={v}" for k, v in self._status_counts.items() if v > 0]
+            if self.producer is not None:
+                stats = self.producer.ring.stats()
+                parts += [f"ring_{k}={stats[k]}" for k in ("underrun_events", "late_events") if stats[k] > 0]
             if not parts:
                 return ""
             if self._last_status_message:
                 parts.append(f"last='{self._last_status_message}'")
             return ", ".join(parts)
 
+    def _note_first_callback(self, started: float) -> None:
+        self._first_callback_pending = False
+        done = time.perf_counter()
+        self.startup_timings = StartupTimings(
+            warmup_s=self._warmup_s,
+            startup_s=started - self._run_started,
+            open_to_callback_s=started - self._stream_opened,
+            first_callback_s=done - started,
+        )
+
     def _callback(self, outdata: Any, frames: int, _time_info: Any, _status: Any) -> None:
+        first = self._first_callback_pending
+        if first:
+            started = time.perf_counter()
+        self._callback_count += 1
         self._record_callback_status(_status)
 
         if self.stop_event.is_set():
             raise sd.CallbackStop
 
-        is_low = is_low_pulse(self.state.count_sec, self.state.count_deci, self.state.time_bits)
-        amp = float(self.config.amplitude) * (self.config.low_factor if is_low else 1.0)
+        if self._pending_correction is not None:
+            self._apply_edge_correction()
+        if self._edge_probe_enabled:
+            lead = getattr(_time_info, "outputBufferDacTime", 0.0) - getattr(_time_info, "currentTime", 0.0)
+            self._edge_probe = (time.monotonic(), lead, self.state.slot, self.edge_offset_frames, self.frames_emitted)
+        if self.trace is not None:
+            self.trace.record(_time_info, frames, self.state, self.schedule, _status)
+        outdata[:, 0] = self._render_block(frames)
+        self.frames_emitted += frames
+        if self.tap is not None:
+            self.tap.push(outdata[:, 0])
+        if first:
+            self._note_first_callback(started)
+
+    def _ring_callback(self, outdata: Any, frames: int, _time_info: Any, _status: Any) -> None:
+        # Render-ahead mode: synthesis happens in the producer, the callback only copies.
+        first = self._first_callback_pending
+        if first:
+            started = time.perf_counter()
+        self._callback_count += 1
+        self._record_callback_status(_status)
 
-        block = self.osc.render(frames, amp)
-        outdata[:, 0] = block
+        if self.stop_event.is_set():
+            raise sd.CallbackStop
+
+        if self.trace is not None:
+            # `self.state` is the producer's position, up to the lookahead ahead of playback.
+            block = self.producer.played_block()
+            self.trace.record_block(
+                _time_info,
+                frames,
+                int(block["count_sec"]),
+                int(block["count_deci"]),
+                float(block["amplitude"]),
+                int(block["time_bits"]),
+                _status,
+                FLAG_RENDER_AHEAD,
+            )
+        self.producer.ring.read_into(outdata[:, 0])
+        if self.tap is not None:
+            self.tap.push(outdata[:, 0])
+        if first:
+            self._note_first_callback(started)
+
+    def _apply_edge_correction(self) -> None:
+        slot_delta, self.edge_offset_frames = self._pending_correction
+        self._pending_correction = None
+        if slot_delta:
+            sec, deci = divmod((self.state.slot + slot_delta) % 600, 10)
+            self.state.count_sec, self.state.count_deci = sec, deci
+            self._refresh_time_bits()
+
+    def _render_block(self, frames: int) -> np.ndarray:
+        amplitude = self.schedule.amplitudes[self.state.slot]
+        split = self.edge_offset_frames
+        if split == 0 or self._prev_amp == amplitude:
+            block = self.osc.render(frames, amplitude)
+        else:
+            block = self.osc.render(frames, 1.0)
+            block[:split] *= self._prev_amp
+            block[split:] *= amplitude
+        self._prev_amp = amplitude
 
         # advance counters
         self.state.advance_block()
@@ -141,48 +283,217 @@ class RealtimeStreamer:
         # Update time bits at deterministic minute refresh point (sec=59, dec=0).
         if self.state.is_minute_refresh_point():
             self._refresh_time_bits()
+        return block
 
-    def run(self, device_id: int | None = None) -> None:
-        self.stop_event.clear()
-        self._refresh_time_bits()
+    def warm_up(self, blocks: int = 4) -> float:
+        """
+        Exercises the callback's code paths before the stream opens.
 
-        now = now_dt(self.config.utc)
-        self.state.seed_from_wallclock(now, self.config.offset)
+        Touches the oscillator table, schedule and tap ring so no page faults
+        remain for the first callbacks. Runs throwaway renders (including the
+        split-edge path) into a PortAudio-shaped buffer so NumPy's ufunc
+        dispatch is resolved. Runs encoder, schedule and UI formatting and
+        loads timezone data. The injected clock and the generator state are
+        left untouched. Returns the elapsed time.
+        """
+        started = time.perf_counter()
 
-        self._print_startup_banner(device_id)
-        print_ui(self.state, self.config.utc)
+        np.add.reduce(self.osc._table)
+        np.add.reduce(self.schedule.amplitudes)
+        if self.tap is not None:
+            self.tap.ring.prefault()
 
-        # Same alignment logic as original (kept intentionally for phase-1 refactor)
+        saved_index = self.osc._sample_index
+        out = np.zeros((self.blocksize, self.config.channels), dtype=np.float32)
+        split = self.blocksize // 2
+        for i in range(blocks):
+            # Split-edge path, then the plain path into the output buffer.
+            amplitude = self.schedule.amplitudes[(self.state.slot + i) % len(self.schedule.amplitudes)]
+            block = self.osc.render(self.blocksize, 1.0)
+            block[:split] *= self._prev_amp
+            block[split:] *= amplitude
+            out[:, 0] = self.osc.render(self.blocksize, amplitude)
+        self.osc._sample_index = saved_index
+
+        # Encoder, DST rules and local-zone conversion on both time bases.
+        wall = datetime.now(UTC)
+        for moment in (wall, wall.astimezone(BERLIN_TZ), wall.astimezone()):
+            res = build_time_bits(add_elapsed(moment, timedelta(minutes=1)), utc_mode=moment.tzinfo is UTC)
+            schedule = AmplitudeSchedule.compile(res.time_bits, self.config.amplitude, self.config.low_factor)
+        format_time_bits_breakdown(res.time_bits)
+        render_status_line(self.state, schedule)
+
+        # Collect warm-up garbage now rather than during the first callbacks.
+        gc.collect()
+        return time.perf_counter() - started
+
+    def prime(self) -> datetime:
+        """
+        Refreshes time bits and seeds the counters from the clock.
+
+        `run()` calls this before opening the stream; offline drivers such as
+        `NullSink` call it directly. Returns the time used for seeding.
+        `stop_event` is left alone: a stop requested while the caller is
+        still starting up (e.g. over the isolated worker's control pipe)
+        must not be lost.
+        """
+        self._refresh_time_bits()
+        return self.state.seed_from_clock(self.clock, self.config.utc, self.config.offset)
+
+    def _align_and_seed(self, keep_telegram: bool = False) -> None:
+        now = self.clock.now(self.config.utc)
         alignment_sleep = 0.1 - (now.microsecond % 100000) / 1e6
-        time.sleep(alignment_sleep)
+        self.clock.sleep(alignment_sleep)
         # Re-seed after alignment so the first callback block reflects the aligned wall-clock tick.
-        aligned_now = now_dt(self.config.utc)
-        self.state.seed_from_wallclock(aligned_now, self.config.offset)
+        self.state.seed_from_clock(self.clock, self.config.utc, self.config.offset)
         # Refresh again in case sleep crossed a minute boundary.
-        self._refresh_time_bits()
+        self._refresh_time_bits(keep_if_unchanged=keep_telegram)
+
+    def _resync_after_reconnect(self) -> None:
+        # Fast path: keep the oscillator table and, within the same minute,
+        # the compiled telegram; only the counters follow the clock again.
+        if self.producer is not None:
+            self.producer.reset()
+        self._align_and_seed(keep_telegram=True)
+        # The edge split was measured against the old stream; the new one starts on the block grid.
+        self.edge_offset_frames = 0
+        self._prev_amp = float(self.schedule.amplitudes[self.state.slot])
+        self._pending_correction = None
+        self._edge_probe = None
+        if self.producer is not None:
+            self.producer.start()
+
+    def run(self, device_id: int | None = None, *, interactive: bool = True) -> None:
+        """
+        Opens the output stream and blocks until `stop_event` is set.
+
+        With `interactive=False` no banner, console UI or Enter listener is
+        started (used by the isolated worker process, which reports through
+        shared memory instead).
+        """
+        self._run_started = time.perf_counter()
+        self._first_callback_pending = True
+        self.startup_timings = None
+        self.prime()
+
+        if interactive:
+            self._print_startup_banner(device_id)
+            print_ui(self.state, self.config.utc, self.schedule, self.clock)
+
+        self._warmup_s = self.warm_up()
 
-        with sd.OutputStream(
+        # Align to the next 100 ms tick measured after warm-up, so its cost is not slept on top.
+        self._align_and_seed()
+
+        callback = self._callback
+        if self.render_ahead_s > 0.0:
+            self.producer = RenderAheadProducer(self, self.render_ahead_s)
+            # Built after warm_up(), so fault the ring in here, before the prefill.
+            self.producer.ring.prefault()
+            self.producer.start()
+            callback = self._ring_callback
+        else:
+            # Edge probes need the played block's counters, so only the direct callback path is disciplined.
+            if self.discipline_edges:
+                self.discipline = EdgeDiscipline(self)
+                self.discipline.start()
+
+        try:
+            if self.leader is not None:
+                self.leader.start(self)
+            if self.tap is not None:
+                self.tap.start()
+            self._stream(device_id, callback, interactive)
+        finally:
+            if self.tap is not None:
+                self.tap.stop()
+            if self.producer is not None:
+                self.producer.stop()
+            if self.leader is not None:
+                self.leader.stop()
+            if self.discipline is not None:
+                self.discipline.stop()
+
+    def _open_stream(self, device_id: int | None, callback: Any) -> Any:
+        return sd.OutputStream(
             device=device_id,
             blocksize=self.blocksize,
             channels=self.config.channels,
-            callback=self._callback,
+            callback=callback,
             samplerate=self.config.samplerate,
             latency=self.config.latency,
             dtype="float32",
-        ):
-            ui_thread = threading.Thread(target=self._ui_loop, daemon=True)
-            ui_thread.start()
-            if sys.stdin.isatty():
-                threading.Thread(target=self._wait_for_enter, daemon=True).start()
+        )
 
+    def _supervise(self, stream: Any, interactive: bool) -> str | None:
+        """
+        Waits until `stop_event` is set (returns None) or, with a watchdog,
+        until the stream has to be replaced (returns the reason).
+        """
+        timings_reported = not interactive
+        if self.watchdog is not None:
+            self.watchdog.reset(time.monotonic())
+        try:
+            while not self.stop_event.is_set():
+                time.sleep(0.05)
+                if not timings_reported and self.startup_timings is not None:
+                    print(f"\n[INFO] {self.startup_timings.format()}", flush=True)
+                    timings_reported = True
+                if self.watchdog is None:
+                    continue
+                with self._status_lock:
+                    underflows = self._status_counts["output_underflow"]
+                reason = self.watchdog.check(
+                    time.monotonic(), bool(getattr(stream, "active", True)), self._callback_count, underflows
+                )
+                if reason is not None and not self.stop_event.is_set():
+                    return reason
+        except KeyboardInterrupt:
+            self.stop_event.set()
+        return None
+
+    def _stream(self, device_id: int | None, callback: Any, interactive: bool) -> None:
+        self._stream_opened = time.perf_counter()
+        ui_thread = None
+        active_device = device_id
+        failure: tuple[str, float] | None = None  # (reason, detected at) while recovering
+        while True:
+            reason = None
             try:
-                while not self.stop_event.is_set():
-                    time.sleep(0.05)
-            except KeyboardInterrupt:
-                self.stop_event.set()
+                with self._open_stream(active_device, callback) as stream:
+                    if failure is not None:
+                        event = ReconnectEvent(
+                            failure[0], active_device, self.watchdog.recovered(), time.perf_counter() - failure[1]
+                        )
+                        self.reconnects.append(event)
+                        print(f"\n[WARN] {event.format()}", file=sys.stderr, flush=True)
+                        failure = None
+                    if interactive and ui_thread is None:
+                        ui_thread = threading.Thread(target=self._ui_loop, daemon=True)
+                        ui_thread.start()
+                        if sys.stdin.isatty():
+                            threading.Thread(target=self._wait_for_enter, daemon=True).start()
+                    reason = self._supervise(stream, interactive)
+            except (sd.PortAudioError, ValueError) as exc:
+                # Without a watchdog a failing device ends the run as before.
+                if self.watchdog is None:
+                    raise
+                reason = reason or f"{type(exc).__name__}: {exc}"
 
-            ui_thread.join(timeout=1.0)
-            status_summary = self._status_summary()
-            if status_summary:
-                print(f"\n[WARN] PortAudio callback status summary: {status_summary}", file=sys.stderr, flush=True)
-            print("\r\033[K", end="", flush=True)
+            if reason is None or self.watchdog is None:
+                break
+            if failure is None:
+                failure = (reason, time.perf_counter())
+                print(f"\n[WARN] Output stream failed ({reason}); reconnecting.", file=sys.stderr, flush=True)
+            active_device, delay = self.watchdog.next_device(device_id)
+            if self.stop_event.wait(delay):
+                break
+            self._resync_after_reconnect()
+
+        if ui_thread is None:
+            return
+        ui_thread.join(timeout=1.0)
+        status_summary = self._status_summary()
+        if status_summary:
+            print(f"\n[WARN] PortAudio callback status summary: {status_summary}", file=sys.stderr, flush=True)
+        print("\r\033[K", end="", flush=True)
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import os
+import threading
+import numpy as np
+
+from dcf77gen.dsp.analyzer import StreamingSignalAnalyzer
+from dcf77gen.realtime.ringbuffer import SampleRingBuffer
+
+
+class AnalyzerTap:
+    """
+    Feeds emitted blocks to a `StreamingSignalAnalyzer` off the audio thread.
+
+    The callback side only copies the block into a ring buffer and drops it
+    when the ring is full (counted as `full_waits`), so a slow analyzer can
+    never stall playback. A background thread at the lowest scheduling
+    priority drains the ring and runs the analysis.
+    """
+
+    def __init__(self, analyzer: StreamingSignalAnalyzer, capacity_s: float = 5.0, interval_s: float = 0.5):
+        self.analyzer = analyzer
+        self.ring = SampleRingBuffer(max(1, int(capacity_s * analyzer.samplerate)))
+        self.interval_s = float(interval_s)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def push(self, block: np.ndarray) -> None:
+        # Audio thread: copy or drop, never wait.
+        if self.ring.available_write() < len(block):
+            self.ring.note_full()
+            return
+        self.ring.write(block)
+
+    def drain(self) -> int:
+        n = self.ring.available_read()
+        if n:
+            out = np.empty(n, dtype=np.float32)
+            self.ring.read_into(out)
+            self.analyzer.feed(out)
+        return n
+
+    def _loop(self) -> None:
+        try:
+            # Linux applies nice values per thread.
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (AttributeError, OSError):
+            pass
+        while not self._stop.wait(self.interval_s):
+            self.drain()
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="dcf77gen-analyzer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self.drain()
+
+    @property
+    def dropped_blocks(self) -> int:
+        return self.ring.stats()["full_waits"]
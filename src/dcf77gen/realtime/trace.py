@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import math
+from pathlib import Path
+import time
+from typing import Any
+import numpy as np
+
+from dcf77gen.core.state import GeneratorState
+from dcf77gen.dsp.schedule import AmplitudeSchedule
+
+TRACE_MAGIC = b"DCF77TR1"
+TRACE_VERSION = 1
+DEFAULT_TRACE_CAPACITY = 36000  # one hour of 100 ms callbacks
+
+HEADER_DTYPE = np.dtype(
+    [
+        ("magic", "S8"),
+        ("version", "<u4"),
+        ("record_size", "<u4"),
+        ("capacity", "<u8"),
+        ("write_count", "<u8"),
+        ("samplerate", "<u4"),
+        ("blocksize", "<u4"),
+        ("reserved", "<u8", (3,)),
+    ]
+)  # 64 bytes
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("mono_ns", "<i8"),     # time.monotonic_ns() at callback entry
+        ("dac_time", "<f8"),    # PortAudio outputBufferDacTime (NaN if unknown)
+        ("frames", "<u4"),
+        ("count_sec", "<u1"),
+        ("count_deci", "<u1"),
+        ("flags", "<u2"),
+        ("amplitude", "<f4"),   # amplitude applied to this block
+        ("reserved", "<u4"),
+        ("time_bits", "<u8"),
+    ]
+)  # 40 bytes
+
+FLAG_OUTPUT_UNDERFLOW = 1 << 0
+FLAG_OUTPUT_OVERFLOW = 1 << 1
+FLAG_PRIMING_OUTPUT = 1 << 2
+FLAG_OTHER_STATUS = 1 << 3
+FLAG_RENDER_AHEAD = 1 << 4  # block was copied from the render-ahead ring
+
+_STATUS_FLAGS = (
+    ("output_underflow", FLAG_OUTPUT_UNDERFLOW),
+    ("output_overflow", FLAG_OUTPUT_OVERFLOW),
+    ("priming_output", FLAG_PRIMING_OUTPUT),
+)
+
+
+def status_flags(status: Any) -> int:
+    if not status:
+        return 0
+    flags = 0
+    for attr, bit in _STATUS_FLAGS:
+        if getattr(status, attr, False):
+            flags |= bit
+    return flags or FLAG_OTHER_STATUS
+
+
+class TraceRecorder:
+    """
+    Per-callback binary trace in a preallocated memory-mapped ring file.
+
+    Each callback writes one fixed-size record through field views created up
+    front, so recording is a handful of scalar stores: no allocation beyond
+    Python scalars, no file I/O and no locks on the audio thread. The kernel
+    writes dirty pages back in the background.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        samplerate: int,
+        blocksize: int,
+        capacity: int = DEFAULT_TRACE_CAPACITY,
+    ):
+        if capacity <= 0:
+            raise ValueError("trace capacity must be > 0")
+        self.path = Path(path)
+        self.capacity = int(capacity)
+        self._mm = np.memmap(
+            self.path,
+            dtype=np.uint8,
+            mode="w+",
+            shape=(HEADER_DTYPE.itemsize + self.capacity * RECORD_DTYPE.itemsize,),
+        )
+        self._header = self._mm[: HEADER_DTYPE.itemsize].view(HEADER_DTYPE)
+        records = self._mm[HEADER_DTYPE.itemsize :].view(RECORD_DTYPE)
+        self._header["magic"] = TRACE_MAGIC
+        self._header["version"] = TRACE_VERSION
+        self._header["record_size"] = RECORD_DTYPE.itemsize
+        self._header["capacity"] = self.capacity
+        self._header["samplerate"] = samplerate
+        self._header["blocksize"] = blocksize
+        # Pre-fault every page so the first pass through the ring does not page-fault.
+        records["dac_time"] = np.nan
+        self._write_count = self._header["write_count"]
+        self._fields = tuple(records[name] for name in RECORD_DTYPE.names if name != "reserved")
+        self._count = 0
+
+    def record(
+        self,
+        time_info: Any,
+        frames: int,
+        state: GeneratorState,
+        schedule: AmplitudeSchedule,
+        status: Any,
+        extra_flags: int = 0,
+    ) -> None:
+        self.record_block(
+            time_info,
+            frames,
+            state.count_sec,
+            state.count_deci,
+            schedule.amplitudes[state.slot],
+            state.time_bits,
+            status,
+            extra_flags,
+        )
+
+    def record_block(
+        self,
+        time_info: Any,
+        frames: int,
+        count_sec: int,
+        count_deci: int,
+        amplitude: float,
+        time_bits: int,
+        status: Any,
+        extra_flags: int = 0,
+    ) -> None:
+        """
+        Like `record()`, for callers that saved the block's counters elsewhere
+        (the render-ahead path reads them from the producer).
+        """
+        i = self._count % self.capacity
+        mono, dac, nframes, sec, deci, flags, amp, bits = self._fields
+        mono[i] = time.monotonic_ns()
+        dac[i] = getattr(time_info, "outputBufferDacTime", math.nan)
+        nframes[i] = frames
+        sec[i] = count_sec
+        deci[i] = count_deci
+        flags[i] = status_flags(status) | extra_flags
+        amp[i] = amplitude
+        bits[i] = time_bits
+        self._count += 1
+        # Publish after the record is complete so readers never see a torn entry.
+        self._write_count[0] = self._count
+
+    def close(self) -> None:
+        self._mm.flush()
+
+
+def read_trace(path: str | Path) -> tuple[dict[str, int], np.ndarray]:
+    """
+    Returns the trace header and its records in chronological order.
+    """
+    raw = np.fromfile(path, dtype=np.uint8)
+    if len(raw) < HEADER_DTYPE.itemsize:
+        raise ValueError("not a dcf77gen trace file (too short)")
+    header = raw[: HEADER_DTYPE.itemsize].view(HEADER_DTYPE)[0]
+    if bytes(header["magic"]) != TRACE_MAGIC or int(header["version"]) != TRACE_VERSION:
+        raise ValueError("not a dcf77gen trace file (bad magic or version)")
+    capacity = int(header["capacity"])
+    count = int(header["write_count"])
+    records = raw[HEADER_DTYPE.itemsize :].view(RECORD_DTYPE)[:capacity]
+    if count <= capacity:
+        ordered = records[:count].copy()
+    else:
+        start = count % capacity
+        ordered = np.concatenate((records[start:], records[:start]))
+    info = {
+        "capacity": capacity,
+        "write_count": count,
+        "samplerate": int(header["samplerate"]),
+        "blocksize": int(header["blocksize"]),
+    }
+    return info, ordered
+
+
+@dataclass(frozen=True)
+class TraceAnalysis:
+    blocks: int
+    span_s: float
+    skipped_blocks: int            # counter jumps (missing or repeated 100 ms slots)
+    interval_max_error_ms: float   # callback spacing vs frames / samplerate
+    dac_drift_ppm: float           # DAC clock vs nominal samplerate (NaN without DAC times)
+    pulse_count: int
+    pulse_max_error_ms: float      # second-pulse spacing vs 1 s / 2 s (minute gap)
+    status_blocks: dict[str, int]
+
+    def format(self) -> str:
+        lines = []
+        lines.append(f"blocks: {self.blocks} over {self.span_s:.1f} s")
+        lines.append(f"skipped/repeated blocks: {self.skipped_blocks}")
+        lines.append(f"callback interval max error: {self.interval_max_error_ms:.3f} ms")
+        drift = "n/a" if math.isnan(self.dac_drift_ppm) else f"{self.dac_drift_ppm:+.1f} ppm"
+        lines.append(f"DAC clock drift: {drift}")
+        lines.append(f"second pulses: {self.pulse_count}, max spacing error {self.pulse_max_error_ms:.3f} ms")
+        for name, count in self.status_blocks.items():
+            lines.append(f"  {name}: {count} blocks")
+        return "\n".join(lines)
+
+
+def analyze_trace(info: dict[str, int], records: np.ndarray) -> TraceAnalysis:
+    """
+    Reconstructs pulse timing from a trace and flags drift or skipped blocks.
+
+    Timestamps use the DAC time when PortAudio provided it, otherwise the
+    monotonic callback time.
+    """
+    n = len(records)
+    samplerate = float(info["samplerate"])
+    if n == 0:
+        return TraceAnalysis(0, 0.0, 0, 0.0, math.nan, 0, 0.0, {})
+
+    mono_s = (records["mono_ns"] - records["mono_ns"][0]) / 1e9
+    dac = records["dac_time"]
+    use_dac = bool(np.all(np.isfinite(dac)))
+    t = dac - dac[0] if use_dac else mono_s
+
+    slots = records["count_sec"].astype(np.int64) * 10 + records["count_deci"]
+    skipped = int(np.count_nonzero((slots[1:] - slots[:-1]) % 600 != 1))
+
+    nominal = records["frames"][:-1] / samplerate
+    interval_err = np.abs(np.diff(t) - nominal) if n > 1 else np.zeros(1)
+
+    drift_ppm = math.nan
+    if use_dac and n > 2:
+        played = np.concatenate(([0.0], np.cumsum(records["frames"][:-1] / samplerate)))
+        slope = np.polyfit(played, t, 1)[0]
+        drift_ppm = (slope - 1.0) * 1e6
+
+    # A second pulse starts at every deci 0 block below full amplitude.
+    full = records["amplitude"].max()
+    starts = (records["count_deci"] == 0) & (records["amplitude"] < full)
+    pulse_t = t[starts]
+    pulse_err = 0.0
+    if len(pulse_t) > 1:
+        spacing = np.diff(pulse_t)
+        # The missing second-59 pulse makes a 2 s gap once per minute.
+        expected = np.where(spacing > 1.5, 2.0, 1.0)
+        pulse_err = float(np.abs(spacing - expected).max() * 1e3)
+
+    flags = records["flags"]
+    status_blocks = {
+        name: int(np.count_nonzero(flags & bit))
+        for name, bit in (
+            ("output_underflow", FLAG_OUTPUT_UNDERFLOW),
+            ("output_overflow", FLAG_OUTPUT_OVERFLOW),
+            ("priming_output", FLAG_PRIMING_OUTPUT),
+            ("other_status", FLAG_OTHER_STATUS),
+        )
+        if np.any(flags & bit)
+    }
+
+    return TraceAnalysis(
+        blocks=n,
+        span_s=float(t[-1] - t[0]),
+        skipped_blocks=skipped,
+        interval_max_error_ms=float(interval_err.max() * 1e3),
+        dac_drift_ppm=drift_ppm,
+        pulse_count=int(starts.sum()),
+        pulse_max_error_ms=pulse_err,
+        status_blocks=status_blocks,
+    )
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ReconnectEvent:
+    reason: str
+    device: int | None
+    attempts: int
+    latency_s: float  # failure detected -> replacement stream running
+
+    def format(self) -> str:
+        device = "default output" if self.device is None else f"device {self.device}"
+        return (
+            f"stream recovered on {device} after {self.latency_s * 1e3:.0f} ms "
+            f"({self.attempts} attempt{'s' if self.attempts != 1 else ''}; {self.reason})"
+        )
+
+
+class StreamWatchdog:
+    """
+    Decides when a running output stream has to be replaced.
+
+    The streamer polls `check()` from its supervision loop with the stream's
+    `active` flag, a callback counter and the cumulative underflow count. A
+    stream is considered dead when PortAudio stopped it, when callbacks stall
+    for `stall_s`, or when at least `storm_underflows` underflows occur within
+    `storm_window_s`. `next_device()` walks the primary device and then the
+    fallbacks, backing off exponentially once every candidate failed.
+    """
+
+    def __init__(
+        self,
+        *,
+        fallback_devices: Sequence[int] = (),
+        storm_underflows: int = 5,
+        storm_window_s: float = 2.0,
+        stall_s: float = 2.0,
+        backoff_s: float = 0.05,
+        max_backoff_s: float = 2.0,
+    ):
+        if storm_underflows < 1:
+            raise ValueError("storm_underflows must be >= 1")
+        self.fallback_devices = tuple(fallback_devices)
+        self.storm_underflows = int(storm_underflows)
+        self.storm_window_s = float(storm_window_s)
+        self.stall_s = float(stall_s)
+        self.backoff_s = float(backoff_s)
+        self.max_backoff_s = float(max_backoff_s)
+        self._underflows: deque[tuple[float, int]] = deque()
+        self._last_callbacks = -1
+        self._last_progress = 0.0
+        self.attempts = 0
+
+    def reset(self, now: float) -> None:
+        """
+        Starts supervising a freshly opened stream.
+        """
+        self._underflows.clear()
+        self._last_callbacks = -1
+        self._last_progress = now
+
+    def check(self, now: float, active: bool, callbacks: int, underflows: int) -> str | None:
+        """
+        Returns a failure reason, or None while the stream is healthy.
+        """
+        if not active:
+            return "stream stopped"
+        if callbacks != self._last_callbacks:
+            self._last_callbacks = callbacks
+            self._last_progress = now
+        elif now - self._last_progress > self.stall_s:
+            return f"no callback for {now - self._last_progress:.1f} s"
+
+        self._underflows.append((now, underflows))
+        while self._underflows and now - self._underflows[0][0] > self.storm_window_s:
+            self._underflows.popleft()
+        burst = underflows - self._underflows[0][1]
+        if burst >= self.storm_underflows:
+            return f"underflow storm ({burst} in {self.storm_window_s:g} s)"
+        return None
+
+    def next_device(self, primary: int | None) -> tuple[int | None, float]:
+        """
+        Returns the device for the next attempt and the delay before it.
+        """
+        candidates = [primary, *(d for d in self.fallback_devices if d != primary)]
+        attempt = self.attempts
+        self.attempts += 1
+        rounds = attempt // len(candidates)
+        delay = 0.0 if rounds == 0 else min(self.max_backoff_s, self.backoff_s * 2 ** (rounds - 1))
+        return candidates[attempt % len(candidates)], delay
+
+    def recovered(self) -> int:
+        """
+        Ends a recovery; returns how many attempts it took.
+        """
+        attempts, self.attempts = self.attempts, 0
+        return attempts
@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import gc
+import multiprocessing as mp
+from multiprocessing.connection import Connection
+import os
+import signal
+import sys
+import threading
+from typing import Any
+
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.core.state import GeneratorState
+from dcf77gen.dsp.schedule import AmplitudeSchedule
+from dcf77gen.realtime.streamer import RealtimeStreamer, describe_output_device
+from dcf77gen.realtime.trace import DEFAULT_TRACE_CAPACITY, TraceRecorder
+from dcf77gen.realtime.watchdog import StreamWatchdog
+from dcf77gen.ui.console import print_startup_banner, print_ui
+
+DEFAULT_RT_PRIORITY = 70
+
+# Linux <sys/mman.h>
+_MCL_CURRENT = 1
+_MCL_FUTURE = 2
+
+
+class SharedStatus:
+    """
+    Streamer counters published by the worker process through shared memory.
+
+    A sequence counter (odd while a write is in progress) lets the parent take
+    consistent snapshots without locks shared with the audio process.
+    `snapshot()` gives up after `max_tries` attempts, so a worker killed in
+    the middle of `publish()` cannot leave the parent spinning.
+    """
+    FIELDS = (
+        "count_sec",
+        "count_deci",
+        "time_bits",
+        "output_underflow",
+        "output_overflow",
+        "priming_output",
+        "other",
+    )
+
+    def __init__(self, array: Any):
+        self._array = array
+
+    @classmethod
+    def create(cls, ctx: Any = mp) -> SharedStatus:
+        return cls(ctx.RawArray("q", 1 + len(cls.FIELDS)))
+
+    @property
+    def array(self) -> Any:
+        return self._array
+
+    def publish(self, values: dict[str, int]) -> None:
+        arr = self._array
+        arr[0] += 1
+        for i, name in enumerate(self.FIELDS, start=1):
+            arr[i] = int(values.get(name, 0))
+        arr[0] += 1
+
+    def snapshot(self, max_tries: int = 1000) -> dict[str, int] | None:
+        arr = self._array
+        for _ in range(max_tries):
+            seq = arr[0]
+            if seq & 1:
+                continue
+            values = {name: int(arr[i]) for i, name in enumerate(self.FIELDS, start=1)}
+            if arr[0] == seq:
+                return values
+        return None
+
+
+def apply_realtime_policy(priority: int) -> list[str]:
+    """
+    Best-effort realtime setup for the calling process.
+
+    Requests SCHED_FIFO (falling back to SCHED_RR) at `priority` for the
+    calling thread and locks memory with mlockall. Threads it creates
+    afterwards (including the PortAudio callback thread) inherit the
+    scheduling policy; threads that already exist keep theirs. Returns human-readable
+    notes on what was applied; nothing here is fatal.
+    """
+    notes: list[str] = []
+    if priority <= 0:
+        notes.append("realtime scheduling disabled")
+    elif not hasattr(os, "sched_setscheduler"):
+        notes.append("realtime scheduling unavailable on this platform")
+    else:
+        for name in ("SCHED_FIFO", "SCHED_RR"):
+            policy = getattr(os, name, None)
+            if policy is None:
+                continue
+            prio = min(priority, os.sched_get_priority_max(policy))
+            try:
+                os.sched_setscheduler(0, policy, os.sched_param(prio))
+            except OSError as exc:
+                notes.append(f"{name} not permitted ({exc.strerror or exc})")
+                continue
+            notes.append(f"{name} priority {prio}")
+            break
+
+    libc_name = ctypes.util.find_library("c")
+    if libc_name is None or not sys.platform.startswith("linux"):
+        notes.append("mlockall unavailable on this platform")
+        return notes
+    flags = _MCL_CURRENT
+    try:
+        import resource
+
+        soft, _hard = resource.getrlimit(resource.RLIMIT_MEMLOCK)
+        if soft == resource.RLIM_INFINITY:
+            # Locking future mappings is only safe when the limit cannot be hit later.
+            flags |= _MCL_FUTURE
+    except (ImportError, OSError, ValueError):
+        pass
+    libc = ctypes.CDLL(libc_name, use_errno=True)
+    if libc.mlockall(flags) != 0:
+        notes.append(f"mlockall failed ({os.strerror(ctypes.get_errno())})")
+    else:
+        notes.append("memory locked" + (" (current and future)" if flags & _MCL_FUTURE else " (current)"))
+    return notes
+
+
+def _publish_loop(
+    streamer: RealtimeStreamer,
+    shared: SharedStatus,
+    interval_s: float,
+    conn: Connection,
+    send_lock: threading.Lock,
+) -> None:
+    timings_sent = False
+    while not streamer.stop_event.wait(interval_s):
+        if not timings_sent and streamer.startup_timings is not None:
+            with send_lock:
+                conn.send(("startup", streamer.startup_timings.format()))
+            timings_sent = True
+        with streamer._status_lock:
+            values = dict(streamer._status_counts)
+        values["count_sec"] = streamer.state.count_sec
+        values["count_deci"] = streamer.state.count_deci
+        values["time_bits"] = streamer.state.time_bits
+        shared.publish(values)
+
+
+def _control_loop(conn: Connection, stop_event: threading.Event) -> None:
+    while not stop_event.is_set():
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            # Parent went away: never keep transmitting unattended.
+            stop_event.set()
+            return
+        if msg == "stop":
+            stop_event.set()
+
+
+def _worker_main(
+    config: GeneratorConfig,
+    device_id: int | None,
+    rt_priority: int,
+    render_ahead_s: float,
+    trace_path: str | None,
+    trace_capacity: int,
+    watchdog: StreamWatchdog | None,
+    shared_array: Any,
+    conn: Connection,
+) -> None:
+    # The parent owns Ctrl+C handling and asks us to stop over the pipe.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    trace = None
+    if trace_path is not None:
+        trace = TraceRecorder(trace_path, config.samplerate, config.samplerate // 10, trace_capacity)
+    streamer = RealtimeStreamer(config, render_ahead_s=render_ahead_s, trace=trace, watchdog=watchdog)
+    shared = SharedStatus(shared_array)
+
+    # Helper threads start before the realtime policy is applied, so they keep
+    # normal scheduling instead of competing with the audio callback.
+    send_lock = threading.Lock()
+    threading.Thread(target=_control_loop, args=(conn, streamer.stop_event), daemon=True).start()
+    threading.Thread(target=_publish_loop, args=(streamer, shared, 0.02, conn, send_lock), daemon=True).start()
+    notes = apply_realtime_policy(rt_priority)
+    with send_lock:
+        conn.send(("policy", notes))
+
+    # Everything allocated so far is long-lived; keep the collector out of the
+    # audio path for the lifetime of the stream.
+    gc.collect()
+    gc.freeze()
+    gc.disable()
+    try:
+        streamer.run(device_id, interactive=False)
+    except Exception as exc:
+        with send_lock:
+            conn.send(("error", f"{type(exc).__name__}: {exc}"))
+    finally:
+        gc.enable()
+        gc.unfreeze()
+        if trace is not None:
+            trace.close()
+        streamer.stop_event.set()
+        with send_lock:
+            conn.send(("status", streamer._status_summary()))
+
+
+class IsolatedStreamer:
+    """
+    Runs the render/stream engine in a dedicated child process.
+
+    The child gets its own GIL, realtime scheduling where permitted, locked
+    memory and a disabled garbage collector. The parent only renders the
+    console UI from shared-memory snapshots and sends control messages over
+    a pipe, so neither can delay the audio callback.
+    """
+
+    def __init__(
+        self,
+        config: GeneratorConfig,
+        rt_priority: int = DEFAULT_RT_PRIORITY,
+        render_ahead_s: float = 0.0,
+        trace_path: str | None = None,
+        trace_capacity: int = DEFAULT_TRACE_CAPACITY,
+        watchdog: StreamWatchdog | None = None,
+    ):
+        if render_ahead_s < 0.0:
+            raise ValueError("render_ahead_s must be >= 0")
+        self.config = config
+        self.watchdog = watchdog
+        self.rt_priority = rt_priority
+        self.render_ahead_s = float(render_ahead_s)
+        self.trace_path = trace_path
+        self.trace_capacity = int(trace_capacity)
+        self.stop_event = threading.Event()
+        self.state = GeneratorState()
+        self.schedule = AmplitudeSchedule.compile(0, config.amplitude, config.low_factor)
+
+    def _wait_for_enter(self) -> None:
+        try:
+            input()
+        except EOFError:
+            pass
+        self.stop_event.set()
+
+    def _apply_snapshot(self, snapshot: dict[str, int]) -> str:
+        self.state.count_sec = snapshot["count_sec"]
+        self.state.count_deci = snapshot["count_deci"]
+        if snapshot["time_bits"] != self.state.time_bits:
+            self.state.time_bits = snapshot["time_bits"]
+            self.schedule = AmplitudeSchedule.compile(
+                self.state.time_bits, self.config.amplitude, self.config.low_factor
+            )
+        keys = ("output_underflow", "output_overflow", "priming_output", "other")
+        return ", ".join(f"{k}={snapshot[k]}" for k in keys if snapshot[k] > 0)
+
+    def _handle_message(self, msg: tuple[str, Any]) -> None:
+        kind, payload = msg
+        if kind == "policy":
+            print(f"\n[INFO] audio worker: {', '.join(payload)}", file=sys.stderr, flush=True)
+        elif kind == "startup":
+            print(f"\n[INFO] audio worker: {payload}", file=sys.stderr, flush=True)
+        elif kind == "error":
+            print(f"\n[ERROR] audio worker: {payload}", file=sys.stderr, flush=True)
+        elif kind == "status" and payload:
+            print(f"\n[WARN] PortAudio callback status summary: {payload}", file=sys.stderr, flush=True)
+
+    def _drain(self, conn: Connection) -> None:
+        try:
+            while conn.poll():
+                self._handle_message(conn.recv())
+        except (EOFError, OSError):
+            pass
+
+    def run(self, device_id: int | None = None) -> None:
+        ctx = mp.get_context("spawn")
+        shared = SharedStatus.create(ctx)
+        parent_conn, child_conn = ctx.Pipe()
+        proc = ctx.Process(
+            target=_worker_main,
+            args=(
+                self.config,
+                device_id,
+                self.rt_priority,
+                self.render_ahead_s,
+                self.trace_path,
+                self.trace_capacity,
+                self.watchdog,
+                shared.array,
+                child_conn,
+            ),
+            name="dcf77gen-audio",
+            daemon=True,
+        )
+
+        print_startup_banner(self.config, describe_output_device(device_id))
+        proc.start()
+        child_conn.close()
+        if sys.stdin.isatty():
+            threading.Thread(target=self._wait_for_enter, daemon=True).start()
+
+        last_summary = ""
+        try:
+            while not self.stop_event.is_set() and proc.is_alive():
+                self._drain(parent_conn)
+                snapshot = shared.snapshot()
+                summary = last_summary if snapshot is None else self._apply_snapshot(snapshot)
+                print_ui(self.state, self.config.utc, self.schedule)
+                if summary and summary != last_summary:
+                    print(f"\n[WARN] PortAudio callback status: {summary}", file=sys.stderr, flush=True)
+                    last_summary = summary
+                self.stop_event.wait(0.1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop_event.set()
+            try:
+                parent_conn.send("stop")
+            except (BrokenPipeError, OSError):
+                pass
+            proc.join(timeout=2.0)
+            if proc.is_alive():
+                proc.terminate()
+                proc.join(timeout=1.0)
+            self._drain(parent_conn)
+            parent_conn.close()
+            print("\r\033[K", end="", flush=True)
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
-from datetime import datetime, UTC
-
+from dcf77gen import __author__, __copyright__, __license__, __title__, __version__
+from dcf77gen.core.clock import Clock, now_dt
+from dcf77gen.core.config import GeneratorConfig
 from dcf77gen.core.state import GeneratorState
+from dcf77gen.dsp.schedule import AmplitudeSchedule
 
 
-def render_status_line(state: GeneratorState) -> str:
-    b = ("{:059b}".format(state.time_bits))[::-1]
+def render_status_line(state: GeneratorState, schedule: AmplitudeSchedule | None = None) -> str:
+    # Prefer the compiled schedule so the display matches the emitted telegram.
+    b = schedule.bit_string if schedule is not None else ("{:059b}".format(state.time_bits))[::-1]
     slices = [
         (0, 1), (1, 15), (15, 20), (20, 21), (21, 28), (28, 29),
         (29, 35), (35, 36), (36, 42), (42, 45), (45, 50), (50, 58), (58, 59),
@@ -31,7 +34,30 @@ def render_status_line(state: GeneratorState) -> str:
     return line
 
 
-def print_ui(state: GeneratorState, use_utc: bool) -> None:
-    now = datetime.now(UTC) if use_utc else datetime.now()
-    line = render_status_line(state)
-    print(f"\r{now.strftime('%Y-%m-%d %H:%M:%S')} -> {line}", end="", flush=True)
\ No newline at end of file
+def print_ui(
+    state: GeneratorState,
+    use_utc: bool,
+    schedule: AmplitudeSchedule | None = None,
+    clock: Clock | None = None,
+) -> None:
+    now = clock.now(use_utc) if clock is not None else now_dt(use_utc)
+    line = render_status_line(state, schedule)
+    print(f"\r{now.strftime('%Y-%m-%d %H:%M:%S')} -> {line}", end="", flush=True)
+
+
+def print_startup_banner(config: GeneratorConfig, device_description: str) -> None:
+    print("=" * 96)
+    print(f"  {__title__} v{__version__}")
+    print(f"  Author: {__author__}")
+    print(f"  License: {__license__}")
+    print(f"  {__copyright__}")
+    print()
+    print(f"  Output device: {device_description}")
+    print(f"  Samplerate: {config.samplerate} Hz")
+    print(f"  Carrier frequency: {config.frequency} Hz")
+    if config.image_mode:
+        print(f"  Image mode: synthesized tone {config.tone_frequency:g} Hz (image order {config.image_order})")
+    print(f"  Amplitude: {config.amplitude:.3f}")
+    print(f"  Low-pulse factor: {config.low_factor:.3f}")
+    print("  Press <Enter> to terminate")
+    print("=" * 96)
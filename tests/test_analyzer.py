@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from datetime import datetime
+import wave
+
+import numpy as np
+import pytest
+
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.dsp.analyzer import StreamingSignalAnalyzer, iter_wav_chunks
+from dcf77gen.dsp.render import OfflineRenderer
+from dcf77gen.protocol.encoder import BERLIN_TZ
+from dcf77gen.realtime.tap import AnalyzerTap
+
+
+def _tone(samplerate: int, seconds: float, freq: float) -> np.ndarray:
+    t = np.arange(int(samplerate * seconds)) / samplerate
+    # 2nd harmonic at -40 dBc.
+    return (0.5 * np.sin(2 * np.pi * freq * t) + 0.005 * np.sin(2 * np.pi * 2 * freq * t)).astype(np.float32)
+
+
+def test_analyzer_measures_frequency_error_and_harmonics_independent_of_chunking() -> None:
+    x = _tone(48000, 4.0, 1000.25)
+    whole = StreamingSignalAnalyzer(48000, 1000.0, nperseg=8192)
+    whole.feed(x)
+    chunked = StreamingSignalAnalyzer(48000, 1000.0, nperseg=8192)
+    for chunk in np.array_split(x, 37):
+        chunked.feed(chunk)
+
+    a, b = whole.report(), chunked.report()
+    assert a.frequency_error_hz == pytest.approx(0.25, abs=1e-3)
+    assert b.frequency_error_hz == pytest.approx(a.frequency_error_hz, abs=1e-9)
+    assert a.carrier_dbfs == pytest.approx(20 * np.log10(0.5), abs=0.2)
+    order, freq, aliased, level = a.harmonics[0]
+    assert (order, aliased) == (2, False)
+    assert freq == pytest.approx(2000.5, abs=0.1)
+    assert level == pytest.approx(-40.0, abs=0.5)
+    assert b.harmonics[0][3] == pytest.approx(level, abs=1e-6)
+
+
+def test_analyzer_recovers_low_factor_from_rendered_signal() -> None:
+    cfg = GeneratorConfig(frequency=2000.0, samplerate=16000, amplitude=0.8, low_factor=0.3)
+    renderer = OfflineRenderer(cfg, datetime(2026, 10, 18, 12, 0, 0, tzinfo=BERLIN_TZ))
+    analyzer = StreamingSignalAnalyzer(cfg.samplerate, cfg.tone_frequency, low_factor=cfg.low_factor, nperseg=4096)
+    for chunk in renderer.iter_chunks(12.0):
+        analyzer.feed(chunk)
+
+    report = analyzer.report()
+    assert report.pulses == 12
+    assert report.low_high_ratio == pytest.approx(0.3, abs=0.01)
+    assert abs(report.frequency_error_hz) < 1e-6
+
+
+def test_wav_reader_and_realtime_tap(tmp_path) -> None:
+    x = _tone(8000, 2.0, 1000.0)
+    path = tmp_path / "tone.wav"
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(8000)
+        stereo = np.repeat((x * 32767).astype("<i2")[:, None], 2, axis=1)
+        wav.writeframes(stereo.tobytes())
+
+    samplerate, chunks = iter_wav_chunks(path, chunk_s=0.3)
+    tap = AnalyzerTap(StreamingSignalAnalyzer(samplerate, 1000.0, nperseg=1024), capacity_s=1.0)
+    for chunk in chunks:
+        tap.push(chunk)
+        tap.drain()
+    # A full ring drops blocks instead of blocking the audio thread.
+    tap.push(np.zeros(8000, dtype=np.float32))
+    tap.push(np.zeros(10, dtype=np.float32))
+
+    assert tap.dropped_blocks == 1
+    report = tap.analyzer.report()
+    assert samplerate == 8000
+    assert report.seconds == pytest.approx(2.0)
+    assert report.carrier_dbfs == pytest.approx(20 * np.log10(0.5), abs=0.2)
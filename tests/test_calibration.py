@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.realtime.calibration import LatencyCalibrationStore, measure_latency
+
+
+def _loopback(delay_frames: int, gain: float, noise: float, output_lead_s: float, input_lag_s: float):
+    rng = np.random.default_rng(1)
+
+    def play_record(signal: np.ndarray, _samplerate: int):
+        recorded = np.zeros(len(signal), dtype=np.float32)
+        recorded[delay_frames:] = gain * signal[: len(signal) - delay_frames]
+        recorded += rng.normal(0.0, noise, len(signal)).astype(np.float32)
+        return recorded, output_lead_s, input_lag_s
+
+    return play_record
+
+
+def test_measure_latency_recovers_unreported_output_delay() -> None:
+    cfg = GeneratorConfig(frequency=1000.0, samplerate=48000, amplitude=0.5)
+    # 30 ms round trip, of which PortAudio reports 10 ms out + 5 ms in; inverting, noisy path.
+    result = measure_latency(cfg, _loopback(1440, -0.3, 0.05, 0.010, 0.005), seconds=1.0, tail_s=0.2)
+
+    assert abs(result.lag_s - 0.030) < 1e-4
+    assert abs(result.correction_s - 0.015) < 1e-4
+    assert result.peak_ratio > 2.0
+
+
+def test_measure_latency_rejects_recording_without_pattern() -> None:
+    cfg = GeneratorConfig(frequency=1000.0, samplerate=48000, amplitude=0.5)
+    with pytest.raises(ValueError, match="not found"):
+        measure_latency(cfg, _loopback(0, 0.0, 0.05, 0.0, 0.0), seconds=0.5, tail_s=0.2)
+
+
+def test_calibration_store_keys_by_device_and_samplerate(tmp_path) -> None:
+    cfg = GeneratorConfig(frequency=1000.0, samplerate=48000, amplitude=0.5)
+    result = measure_latency(cfg, _loopback(480, 1.0, 0.0, 0.004, 0.001), seconds=0.5, tail_s=0.1)
+    store = LatencyCalibrationStore(tmp_path / "latency.json")
+
+    store.save("ALSA::USB DAC", result)
+
+    assert store.correction_s("ALSA::USB DAC", 48000) == pytest.approx(0.005, abs=1e-4)
+    assert store.correction_s("ALSA::USB DAC", 96000) is None
+    assert store.correction_s("ALSA::HDMI") is None
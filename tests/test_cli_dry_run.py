@@ -35,3 +35,17 @@ def test_dry_run_derives_samplerate_from_frequency_when_needed(
     app.main()
     out = capsys.readouterr().out
     assert "samplerate: 400001" in out
+
+
+def test_dry_run_image_mode_reports_tone_and_spectrum(monkeypatch, capsys) -> None:
+    def _fail_query(*_args, **_kwargs):
+        raise AssertionError("sounddevice query should not happen during dry-run")
+
+    monkeypatch.setattr(app.sd, "query_devices", _fail_query)
+    monkeypatch.setattr(app.sd, "check_output_settings", _fail_query)
+    monkeypatch.setattr(sys, "argv", ["dcf77-sync", "--dry-run", "--image"])
+
+    app.main()
+    out = capsys.readouterr().out
+    assert "samplerate: 96000" in out
+    assert "tone: 18500 Hz -> target 77500 Hz (image order 1)" in out
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from dcf77gen.core.clock import FixedOffsetClock, VirtualClock
+from dcf77gen.core.state import GeneratorState
+from dcf77gen.protocol.encoder import BERLIN_TZ
+
+
+def test_virtual_clock_advances_in_elapsed_time_across_dst() -> None:
+    clock = VirtualClock(datetime(2026, 10, 25, 2, 59, 59, tzinfo=BERLIN_TZ))
+    assert clock.now(False).utcoffset() == timedelta(hours=2)
+
+    clock.advance(1.0)
+    # Fall-back: 02:59:59 CEST + 1 s is 02:00:00 CET, not 03:00.
+    after = clock.now(False)
+    assert (after.hour, after.minute, after.second) == (2, 0, 0)
+    assert after.utcoffset() == timedelta(hours=1)
+
+    clock.sleep(0.25)
+    assert clock.elapsed() == 1.25
+
+
+def test_state_seeds_from_injected_clock() -> None:
+    base = VirtualClock(datetime(2026, 12, 31, 23, 59, 0, 300000, tzinfo=BERLIN_TZ))
+    clock = FixedOffsetClock(offset=timedelta(seconds=58), base=base)
+    state = GeneratorState()
+
+    now = state.seed_from_clock(clock, use_utc=False, offset_s=0)
+
+    assert now == datetime(2026, 12, 31, 23, 59, 58, 300000, tzinfo=BERLIN_TZ)
+    assert (state.count_sec, state.count_deci) == (58, 3)
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import datetime, timedelta, UTC
+import socket
+import time
+
+import pytest
+
+from dcf77gen.core.clock import FixedOffsetClock
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.realtime.coordination import (
+    Beacon,
+    CoordinationFollower,
+    CoordinationLeader,
+    LeaderClock,
+    parse_group,
+    parse_interface,
+)
+from dcf77gen.realtime.discipline import slot_position
+from dcf77gen.realtime.streamer import RealtimeStreamer
+
+
+class _MonotonicClock:
+    def __init__(self, start: datetime) -> None:
+        self.start = start
+        self.origin = time.monotonic()
+
+    def now(self, _use_utc: bool) -> datetime:
+        return self.start + timedelta(seconds=time.monotonic() - self.origin)
+
+    def sleep(self, _seconds: float) -> None:
+        pass
+
+
+def _beacon(clock: _MonotonicClock, i: int, frames: int, ahead_s: float, delay_s: float, session: int = 1):
+    """
+    Beacon for slot boundary `i` (100 ms apart) that the leader emits
+    `ahead_s` before our clock reaches it, received `delay_s` late.
+    """
+    base_ds = round(clock.start.timestamp() * 10)
+    boundary_mono = clock.origin + i / 10 - ahead_s
+    sent = boundary_mono - 0.05
+    beacon = Beacon(session, i, 48000, 0, (base_ds + i) % 600, base_ds + i, frames, boundary_mono - sent)
+    return beacon, sent + delay_s
+
+
+def test_beacon_roundtrip_and_group_parsing() -> None:
+    beacon = Beacon(0xDEADBEEF, 7, 192000, 2, 452, 17608968452, 123456789, -0.0125)
+    assert Beacon.unpack(beacon.pack()) == beacon
+    assert beacon.boundary_utc == datetime.fromtimestamp(1760896845.2, UTC)
+    with pytest.raises(ValueError):
+        Beacon.unpack(b"X" * len(beacon.pack()))
+    for bad in (replace(beacon, samplerate=0), replace(beacon, slot=600), replace(beacon, emit_in_s=float("nan"))):
+        with pytest.raises(ValueError):
+            Beacon.unpack(bad.pack())
+
+    assert parse_group("239.1.2.3") == ("239.1.2.3", 7777)
+    assert parse_group("239.1.2.3:9000") == ("239.1.2.3", 9000)
+    with pytest.raises(ValueError):
+        parse_group("192.168.1.10:9000")
+    assert parse_interface(" 127.0.0.1") == "127.0.0.1"
+    with pytest.raises(ValueError):
+        parse_interface("eth0")
+
+
+def test_leader_clock_filters_network_delay_and_flushes_on_leader_step() -> None:
+    fallback = _MonotonicClock(datetime(2026, 10, 18, 12, 0, 0, tzinfo=UTC))
+    clock = LeaderClock(fallback, window=4)
+    # The leader's edges are 20 ms ahead of our clock; beacons arrive 0.1..3 ms late.
+    for i, delay in enumerate((0.003, 0.0001, 0.002)):
+        clock.on_beacon(*_beacon(fallback, i, 4800 * i, 0.020, delay))
+    assert clock.locked
+    assert clock.offset_s == pytest.approx(0.020 - 0.0001, abs=1e-5)
+    assert (clock.now(True) - fallback.now(True)).total_seconds() == pytest.approx(clock.offset_s, abs=1e-3)
+
+    # Leader moved its edge by 96 frames (2 ms): the old estimates no longer apply.
+    clock.on_beacon(*_beacon(fallback, 3, 4800 * 3 + 96, 0.018, 0.002))
+    assert clock.leader_steps == 1
+    assert clock.offset_s == pytest.approx(0.016, abs=1e-5)
+
+    # A different leader session also starts over.
+    clock.on_beacon(*_beacon(fallback, 4, 0, 0.030, 0.0, session=2))
+    assert clock.offset_s == pytest.approx(0.030, abs=1e-5)
+    assert clock.leader_steps == 1
+
+    # A leader sending a different --offset is sending a different frame.
+    strict = LeaderClock(fallback, offset=0)
+    beacon, received = _beacon(fallback, 5, 0, 0.010, 0.0)
+    assert not strict.on_beacon(replace(beacon, offset=2), received)
+    assert strict.offset_s is None and strict.foreign_offset == 2
+    assert strict.on_beacon(beacon, received) and strict.offset_s == pytest.approx(0.010, abs=1e-5)
+
+
+def test_follower_tracks_leader_edges_over_loopback_multicast() -> None:
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+    group = ("239.77.0.78", port)
+
+    cfg = GeneratorConfig(frequency=1000.0, samplerate=48000, amplitude=1.0, utc=True)
+    # The leader's clock runs 250 ms ahead of this host's.
+    leader_streamer = RealtimeStreamer(cfg, clock=FixedOffsetClock(timedelta(seconds=0.25)))
+    leader = CoordinationLeader(group, interface="127.0.0.1", interval_s=0.02)
+    clock = LeaderClock()
+    follower = CoordinationFollower(clock, group, interface="127.0.0.1")
+    try:
+        follower.start()
+        leader.start(leader_streamer)
+    except OSError as exc:
+        follower.stop()
+        pytest.skip(f"loopback multicast unavailable: {exc}")
+    try:
+        mono = time.monotonic()
+        system_ts = time.time()
+        leader_utc = leader_streamer.clock.now(True)
+        pos = slot_position(leader_utc, cfg.offset)
+        leader_streamer._edge_probe = (mono, 0.0, round(pos) % 600, 0, 48000)
+        assert follower.wait_for_lock(2.0)
+    finally:
+        leader.stop()
+        follower.stop()
+
+    nominal_ts = leader_utc.timestamp() - (pos - round(pos)) / 10
+    assert leader.sent == 1 and follower.received == 1
+    assert clock.offset_s == pytest.approx(nominal_ts - system_ts, abs=0.005)
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from dcf77gen.realtime.devices import DeviceCapabilityCache
+
+
+class _FakeHost:
+    def __init__(self) -> None:
+        self.devices = [
+            {"name": "Mic", "hostapi": 0, "max_output_channels": 0, "default_samplerate": 48000.0},
+            {
+                "name": "USB DAC",
+                "hostapi": 0,
+                "max_output_channels": 2,
+                "default_samplerate": 48000.0,
+                "default_low_output_latency": 0.005,
+                "default_high_output_latency": 0.02,
+            },
+            {"name": "HDMI", "hostapi": 1, "max_output_channels": 8, "default_samplerate": 44100.0},
+        ]
+        self.checks: list[tuple[int, int]] = []
+        self._lock = threading.Lock()
+
+    def query_devices(self, device=None, kind=None):
+        if device is None and kind == "output":
+            return {**self.devices[1], "index": 1}
+        return self.devices
+
+    def query_hostapis(self):
+        return [{"name": "ALSA"}, {"name": "JACK"}]
+
+    def check_output_settings(self, device, samplerate):
+        with self._lock:
+            self.checks.append((device, samplerate))
+        if device == 2 and samplerate > 48000:
+            raise RuntimeError("Invalid sample rate")
+
+    def cache(self, path) -> DeviceCapabilityCache:
+        return DeviceCapabilityCache(
+            path,
+            candidates=(48000, 96000, 192000),
+            query_devices=self.query_devices,
+            query_hostapis=self.query_hostapis,
+            check_output_settings=self.check_output_settings,
+        )
+
+
+def test_cache_probes_once_and_reuses_results_from_disk(tmp_path) -> None:
+    host = _FakeHost()
+    path = tmp_path / "devices.json"
+
+    first = host.cache(path)
+    first.load()
+    assert len(host.checks) == 3 + 4  # USB DAC: 3 candidates; HDMI: 3 + default 44100
+    caps = first.capabilities(None)
+    assert caps.key == "ALSA::USB DAC"
+    assert caps.samplerates == (48000, 96000, 192000)
+    assert first.capabilities(2).unsupported == (96000, 192000)
+
+    host.checks.clear()
+    second = host.cache(path)
+    second.load()
+    second.check_samplerate(1, 192000)
+    with pytest.raises(ValueError, match="--refresh-devices"):
+        second.check_samplerate(2, 96000)
+    assert host.checks == []
+    assert "USB DAC" in second.format_matrix()
+
+    # Unprobed rates are checked once and then remembered.
+    second.check_samplerate(1, 88200)
+    assert host.checks == [(1, 88200)]
+    third = host.cache(path)
+    third.load()
+    assert third.capabilities(1).supports(88200) is True
+
+
+def test_cache_is_invalidated_when_device_list_changes(tmp_path) -> None:
+    host = _FakeHost()
+    path = tmp_path / "devices.json"
+    host.cache(path).load()
+
+    host.devices.append({"name": "New DAC", "hostapi": 0, "max_output_channels": 2, "default_samplerate": 96000.0})
+    host.checks.clear()
+    cache = host.cache(path)
+    cache.load()
+
+    assert host.checks  # re-probed
+    assert cache.capabilities(3).samplerates == (48000, 96000, 192000)
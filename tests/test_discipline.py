@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from datetime import datetime, UTC
+import time
+
+import numpy as np
+
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.realtime.discipline import EdgeDiscipline, edge_correction, edge_error_slots
+from dcf77gen.realtime.streamer import RealtimeStreamer
+
+
+class _FixedClock:
+    def __init__(self, value: datetime) -> None:
+        self.value = value
+
+    def now(self, _use_utc: bool) -> datetime:
+        return self.value
+
+    def sleep(self, _seconds: float) -> None:
+        pass
+
+
+def test_edge_error_and_correction_math() -> None:
+    boundary = datetime(2026, 10, 18, 12, 0, 30, 2000, tzinfo=UTC)
+    assert abs(edge_error_slots(boundary, 300, 0) - 0.02) < 1e-9
+    # Wraps across the minute and honours the transmit offset.
+    assert abs(edge_error_slots(boundary, 599, 30) - 1.02) < 1e-9
+
+    # 96 frames late with the edge at block start: move into the previous block.
+    assert edge_correction(96, 0, 4800) == (1, 4704)
+    # 96 frames early: push the edge later within the block.
+    assert edge_correction(-96, 0, 4800) == (0, 96)
+    assert edge_correction(-96, 4750, 4800) == (-1, 46)
+
+
+def test_discipline_moves_edge_and_callback_splits_block() -> None:
+    cfg = GeneratorConfig(frequency=1000.0, samplerate=48000, amplitude=1.0, utc=True)
+    # The clock says the boundary of slot 450 was emitted 2 ms late.
+    streamer = RealtimeStreamer(cfg, clock=_FixedClock(datetime(2026, 10, 18, 12, 0, 45, 2000, tzinfo=UTC)))
+    streamer.prime()
+    streamer.state.count_sec, streamer.state.count_deci = 45, 0
+
+    discipline = EdgeDiscipline(streamer, window=1)
+    streamer._edge_probe = (time.monotonic(), 0.0, 450, 0, 0)
+    discipline.step()
+    slot_delta, offset = streamer._pending_correction
+    assert slot_delta == 1
+    assert abs(offset - 4704) <= 1
+
+    # Next block (slot 450 before correction) renders slot 451 with the
+    # 100 ms second-45 pulse (month bit 0) ending `offset` frames in.
+    streamer._prev_amp = float(streamer.schedule.amplitudes[450])
+    out = np.zeros((streamer.blocksize, 1), dtype=np.float32)
+    streamer._callback(out, streamer.blocksize, None, None)
+
+    assert streamer.state.slot == 452
+    assert streamer.edge_offset_frames == offset
+    low = cfg.amplitude * cfg.low_factor
+    assert np.abs(out[:offset, 0]).max() <= low + 1e-6
+    assert np.abs(out[offset:, 0]).max() > low + 0.5
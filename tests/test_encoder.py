@@ -43,3 +43,29 @@ def test_build_time_bits_utc_mode_clears_cet_cest_indicators() -> None:
     assert _field(bits, 16, 16) == 0  # A1
     assert _field(bits, 17, 17) == 0  # Z1
     assert _field(bits, 18, 18) == 0  # Z2
+
+
+def test_build_time_bits_uses_elapsed_time_across_dst_fall_back() -> None:
+    # 2026-10-25 00:59:30 UTC is 02:59:30 CEST; the next minute is 02:00 CET.
+    now = datetime(2026, 10, 25, 0, 59, 30, tzinfo=ZoneInfo("UTC")).astimezone(BERLIN_TZ)
+    result = build_time_bits(now, utc_mode=False)
+    bits = result.time_bits
+
+    assert result.target_time.utcoffset().total_seconds() == 3600
+    assert _field(bits, 29, 34) == to_bcd(2)
+    assert _field(bits, 21, 27) == to_bcd(0)
+    assert _field(bits, 17, 17) == 1  # Z1 (CET)
+    assert _field(bits, 18, 18) == 0  # Z2 (CEST)
+
+
+def test_build_time_bits_announces_spring_dst_switch_for_full_hour() -> None:
+    # 2026-03-29: CET -> CEST at 02:00 local; A1 covers 01:00..01:59 CET.
+    early = build_time_bits(datetime(2026, 3, 29, 0, 59, 30, tzinfo=BERLIN_TZ)).time_bits
+    late = build_time_bits(datetime(2026, 3, 29, 1, 58, 30, tzinfo=BERLIN_TZ)).time_bits
+    switched = build_time_bits(datetime(2026, 3, 29, 1, 59, 30, tzinfo=BERLIN_TZ))
+
+    assert _field(early, 16, 16) == 1
+    assert _field(late, 16, 16) == 1
+    assert switched.target_time == datetime(2026, 3, 29, 3, 0, 0, tzinfo=BERLIN_TZ)
+    assert _field(switched.time_bits, 16, 16) == 0
+    assert _field(switched.time_bits, 18, 18) == 1
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.dsp.analyzer import StreamingSignalAnalyzer
+from dcf77gen.dsp.impairment import ChannelImpairment, ImpairmentConfig
+from dcf77gen.dsp.render import OfflineRenderer
+from dcf77gen.protocol.encoder import BERLIN_TZ
+
+START = datetime(2026, 10, 18, 12, 0, 0, tzinfo=BERLIN_TZ)
+
+
+def _render(cfg: GeneratorConfig, seconds: float) -> np.ndarray:
+    return OfflineRenderer(cfg, START).render(seconds)
+
+
+def _impair(cfg: GeneratorConfig, impairments: ImpairmentConfig, x: np.ndarray, pieces: int) -> np.ndarray:
+    stage = ChannelImpairment.for_config(impairments, cfg)
+    return np.concatenate(list(stage.iter_chunks(np.array_split(x, pieces))))
+
+
+def test_impairments_are_seeded_and_independent_of_chunking() -> None:
+    cfg = GeneratorConfig(frequency=1000.0, samplerate=16000, amplitude=0.5, low_factor=0.2)
+    x = _render(cfg, 6.0)
+    everything = ImpairmentConfig(
+        snr_db=10.0,
+        fading_depth_db=6.0,
+        fading_period_s=2.0,
+        impulse_rate_hz=20.0,
+        carrier_offset_hz=3.0,
+        edge_jitter_s=0.002,
+        seed=5,
+    )
+    a = _impair(cfg, everything, x, 1)
+    b = _impair(cfg, everything, x, 41)
+    assert len(a) == len(b) == len(x)
+    assert np.max(np.abs(a - b)) < 1e-5
+    assert not np.allclose(a, _impair(cfg, replace(everything, seed=6), x, 1))
+
+    # Noise alone: residual power matches the SNR against the unmodulated carrier.
+    noisy = _impair(cfg, ImpairmentConfig(snr_db=20.0, seed=1), x, 7)
+    residual = (noisy - x).astype(np.float64)
+    assert 10 * np.log10((0.5**2 / 2) / np.mean(residual**2)) == pytest.approx(20.0, abs=0.1)
+
+
+def test_carrier_offset_keeps_modulation_and_follows_image_target() -> None:
+    cfg = GeneratorConfig(frequency=2000.0, samplerate=16000, amplitude=0.8, low_factor=0.3)
+    y = _impair(cfg, ImpairmentConfig(carrier_offset_hz=1.5), _render(cfg, 12.0), 12)
+    analyzer = StreamingSignalAnalyzer(cfg.samplerate, cfg.tone_frequency, low_factor=cfg.low_factor, nperseg=4096)
+    analyzer.feed(y)
+    report = analyzer.report()
+    assert report.frequency_error_hz == pytest.approx(1.5, abs=0.01)
+    assert report.low_high_ratio == pytest.approx(0.3, abs=0.01)
+
+    # 77.5 kHz as the image of an 18.5 kHz tone at 96 kHz moves opposite to the tone.
+    image = GeneratorConfig(frequency=77500.0, samplerate=96000, image_mode=True)
+    stage = ChannelImpairment.for_config(ImpairmentConfig(carrier_offset_hz=2.0), image)
+    assert (stage.carrier_hz, stage.config.carrier_offset_hz) == (18500.0, -2.0)
+
+
+def _falling_edges(y: np.ndarray, samplerate: int, seconds: int, window: int) -> np.ndarray:
+    # First sample of each second's pulse where the carrier is gone for a full period.
+    env = np.lib.stride_tricks.sliding_window_view(np.abs(y), window).max(axis=1)
+    edges = []
+    for sec in range(1, seconds):
+        lo = sec * samplerate - samplerate // 20
+        edges.append(lo + int(np.argmax(env[lo:] < 0.25)) - sec * samplerate)
+    return np.array(edges)
+
+
+def test_edge_jitter_moves_pulse_edges_without_touching_the_carrier() -> None:
+    cfg = GeneratorConfig(frequency=1000.0, samplerate=48000, amplitude=1.0, low_factor=0.0)
+    x = _render(cfg, 12.0)
+    window = cfg.samplerate // 1000
+    clean = _falling_edges(_impair(cfg, ImpairmentConfig(carrier_offset_hz=1e-9), x, 5), cfg.samplerate, 12, window)
+    jittered_y = _impair(cfg, ImpairmentConfig(edge_jitter_s=0.002, seed=3), x, 5)
+    jittered = _falling_edges(jittered_y, cfg.samplerate, 12, window)
+
+    assert np.ptp(clean) <= 2
+    shifts = (jittered - clean) / cfg.samplerate
+    assert 0.0005 < np.std(shifts) < 0.005
+    assert np.max(np.abs(shifts)) <= 0.025
+    # Mid-slot carrier is untouched.
+    mid = slice(5 * cfg.samplerate + cfg.samplerate // 2, 5 * cfg.samplerate + cfg.samplerate // 2 + 2400)
+    assert np.max(np.abs(jittered_y[mid] - x[mid])) < 1e-3
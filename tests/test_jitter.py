@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import pytest
+
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.realtime.jitter import STAGES, LoadConfig, format_jitter_report, run_jitter_benchmark
+
+
+def test_jitter_benchmark_reports_deadlines_and_stages_under_load() -> None:
+    cfg = GeneratorConfig(frequency=440.0, samplerate=8000, amplitude=0.5)
+    load = LoadConfig(gil_threads=1, gc_interval_s=0.05)
+
+    # A zero-width budget turns every block into a miss, so blame is always assigned.
+    report = run_jitter_benchmark(cfg, blocks=3, load=load, budget_s=1e-9)
+
+    assert report.blocks == 3
+    assert report.period_s == pytest.approx(0.1)
+    assert report.misses == 3
+    assert report.worst_lateness_s > 0.0
+    assert set(report.stage_max_s) == set(STAGES)
+    assert report.stage_max_s["render"] > 0.0
+    assert sum(report.miss_stages.values()) == 3
+    assert "deadline misses: 3" in format_jitter_report(report)
+
+
+def test_load_config_rejects_negative_values() -> None:
+    with pytest.raises(ValueError):
+        LoadConfig(gil_threads=-1)
+    with pytest.raises(ValueError):
+        LoadConfig(gc_interval_s=-0.1)
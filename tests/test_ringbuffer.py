@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from dcf77gen.core.clock import VirtualClock
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.dsp.render import OfflineRenderer
+from dcf77gen.protocol.encoder import BERLIN_TZ
+from dcf77gen.realtime.producer import RenderAheadProducer
+from dcf77gen.realtime.ringbuffer import SampleRingBuffer
+from dcf77gen.realtime.streamer import RealtimeStreamer
+
+
+def test_ring_wraps_counts_underruns_and_retracts() -> None:
+    ring = SampleRingBuffer(8)
+    ring.write(np.arange(6, dtype=np.float32))
+    out = np.empty(4, dtype=np.float32)
+    assert ring.read_into(out) == 4
+    np.testing.assert_array_equal(out, [0, 1, 2, 3])
+
+    # Wraps around the end of storage.
+    head, tail = ring.write_views(5)
+    assert (len(head), len(tail)) == (2, 3)
+    ring.write(np.arange(10, 15, dtype=np.float32))
+    out = np.empty(9, dtype=np.float32)
+    assert ring.read_into(out) == 7
+    np.testing.assert_array_equal(out, [4, 5, 10, 11, 12, 13, 14, 0, 0])
+    assert ring.stats()["underrun_events"] == 1
+    assert ring.stats()["underrun_frames"] == 2
+
+    ring.write(np.ones(4, dtype=np.float32))
+    ring.retract_write(ring.read_pos + 1)
+    assert ring.available_read() == 1
+    with pytest.raises(ValueError):
+        ring.retract_write(ring.read_pos - 1)
+    with pytest.raises(ValueError):
+        ring.write(np.zeros(8, dtype=np.float32))
+
+
+def test_ring_in_shared_memory_is_visible_to_attached_consumer() -> None:
+    ring = SampleRingBuffer(16, shared=True)
+    try:
+        peer = SampleRingBuffer.attach(ring.name, 16)
+        ring.write(np.full(5, 0.5, dtype=np.float32))
+        out = np.empty(5, dtype=np.float32)
+        assert peer.read_into(out) == 5
+        assert np.all(out == 0.5)
+        assert ring.read_pos == 5
+        peer.close()
+    finally:
+        ring.close()
+
+
+def test_render_ahead_matches_offline_render_across_flush() -> None:
+    cfg = GeneratorConfig(frequency=440.0, samplerate=8000, amplitude=0.5)
+    start = datetime(2026, 2, 18, 10, 0, 58, tzinfo=BERLIN_TZ)
+    streamer = RealtimeStreamer(cfg, clock=VirtualClock(start), render_ahead_s=0.5)
+    streamer.prime()
+    producer = RenderAheadProducer(streamer, lookahead_s=0.5)
+    streamer.producer = producer
+    offline = OfflineRenderer(cfg, start)
+
+    outdata = np.zeros((streamer.blocksize, 1), dtype=np.float32)
+    producer.fill()
+    for i in range(20):
+        if i == 7:
+            # Discard unplayed blocks and re-render them from the saved state.
+            producer.flush()
+            assert producer.ring.stats()["flushes"] == 1
+        streamer._ring_callback(outdata, streamer.blocksize, None, None)
+        np.testing.assert_array_equal(outdata[:, 0], offline.render_block())
+        producer.fill()
+    assert producer.ring.stats()["underrun_events"] == 0
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import numpy as np
+
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.dsp.modulation import is_low_pulse
+from dcf77gen.dsp.render import OfflineRenderer
+from dcf77gen.dsp.schedule import SLOTS_PER_MINUTE, AmplitudeSchedule
+from dcf77gen.protocol.encoder import BERLIN_TZ, build_time_bits
+
+
+def test_schedule_matches_is_low_pulse_for_every_slot() -> None:
+    time_bits = build_time_bits(datetime(2026, 2, 18, 10, 58, 45, tzinfo=BERLIN_TZ)).time_bits
+    schedule = AmplitudeSchedule.compile(time_bits, amplitude=0.8, low_factor=0.25)
+
+    assert schedule.amplitudes.shape == (SLOTS_PER_MINUTE,)
+    assert schedule.amplitudes.dtype == np.float32
+    for sec in range(60):
+        for deci in range(10):
+            expected_low = is_low_pulse(sec, deci, time_bits)
+            assert schedule.is_low(sec, deci) == expected_low
+            expected_amp = np.float32(0.8 * 0.25) if expected_low else np.float32(0.8)
+            assert schedule.amplitude_at(sec, deci) == expected_amp
+    assert schedule.bit_string == ("{:059b}".format(time_bits))[::-1]
+
+
+def test_offline_renderer_applies_schedule_per_block() -> None:
+    cfg = GeneratorConfig(frequency=440.0, samplerate=8000, amplitude=0.5, low_factor=0.0)
+    start = datetime(2026, 2, 18, 10, 0, 0, tzinfo=BERLIN_TZ)
+
+    chunked = OfflineRenderer(cfg, start).render(2.0)
+    blockwise = OfflineRenderer(cfg, start)
+    blocks = np.concatenate([blockwise.render_block() for _ in range(20)])
+
+    np.testing.assert_allclose(chunked, blocks, rtol=0, atol=1e-7)
+    # Second 0 always starts with a silent (low_factor=0) 100 ms pulse.
+    assert np.all(chunked[:800] == 0.0)
+    assert np.any(chunked[900:8000] != 0.0)
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import pytest
+
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.dsp.spectrum import image_spectrum_check
+
+
+@pytest.mark.parametrize("samplerate, order", [(96000, 1), (48000, 2)])
+def test_image_mode_tone_lands_on_target_carrier(samplerate: int, order: int) -> None:
+    cfg = GeneratorConfig(samplerate=samplerate, image_mode=True)
+    assert cfg.tone_frequency == 18500.0
+    assert cfg.image_order == order
+
+    report = image_spectrum_check(cfg)
+    assert report.measured_target_hz == pytest.approx(77500.0, abs=50.0)
+    assert report.measured_target_db == pytest.approx(report.predicted_target_db, abs=1.0)
+
+
+def test_image_mode_validation() -> None:
+    with pytest.raises(ValueError, match="above Nyquist"):
+        GeneratorConfig(frequency=440.0, samplerate=48000, image_mode=True)
+    with pytest.raises(ValueError, match="DC or Nyquist"):
+        GeneratorConfig(frequency=96000.0, samplerate=48000, image_mode=True)
+    with pytest.raises(ValueError, match="below Nyquist"):
+        GeneratorConfig(samplerate=96000)
@@ -2,22 +2,45 @@ from __future__ import annotations
 
 from datetime import datetime, timedelta
 
+import numpy as np
+
+from dcf77gen.core.clock import VirtualClock
 from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.dsp.render import OfflineRenderer
+from dcf77gen.protocol.encoder import BERLIN_TZ, to_bcd
 from dcf77gen.realtime import streamer
+from dcf77gen.realtime.sinks import NullSink
+
+
+def _field(bits: int, start: int, end: int) -> int:
+    width = end - start + 1
+    return (bits >> start) & ((1 << width) - 1)
+
+
+class _ScriptedClock:
+    def __init__(self, *values: datetime) -> None:
+        self._values = iter(values)
+        self.sleeps: list[float] = []
+
+    def now(self, _use_utc: bool) -> datetime:
+        return next(self._values)
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
 
 
 def test_run_reseeds_timing_after_alignment_sleep(monkeypatch) -> None:
     cfg = GeneratorConfig(frequency=440.0, samplerate=48000, amplitude=0.5)
-    realtime = streamer.RealtimeStreamer(cfg)
 
     refresh_before = datetime(2026, 2, 18, 10, 0, 0, 1000)
     seed_before_sleep = datetime(2026, 2, 18, 10, 0, 0, 24000)
+    # Alignment is measured after warm-up, not from the seeding sample.
+    align_after_warmup = datetime(2026, 2, 18, 10, 0, 0, 61000)
     seed_after_sleep = datetime(2026, 2, 18, 10, 0, 0, 100000)
     refresh_after = datetime(2026, 2, 18, 10, 0, 0, 101000)
-    now_values = iter([refresh_before, seed_before_sleep, seed_after_sleep, refresh_after])
+    clock = _ScriptedClock(refresh_before, seed_before_sleep, align_after_warmup, seed_after_sleep, refresh_after)
+    realtime = streamer.RealtimeStreamer(cfg, clock=clock)
 
-    monkeypatch.setattr(streamer, "now_dt", lambda _use_utc: next(now_values))
-    monkeypatch.setattr(streamer.time, "sleep", lambda _s: None)
     monkeypatch.setattr(streamer, "print_ui", lambda *_args, **_kwargs: None)
     monkeypatch.setattr(streamer.sys.stdin, "isatty", lambda: False)
 
@@ -49,6 +72,7 @@ def test_run_reseeds_timing_after_alignment_sleep(monkeypatch) -> None:
     assert seed_calls[0][0] == seed_before_sleep
     assert seed_calls[1][0] == seed_after_sleep
     assert seed_calls[1][0] != seed_calls[0][0]
+    assert clock.sleeps == [0.1 - 0.061]
 
 
 def test_wait_for_enter_handles_eof_and_sets_stop_event(monkeypatch) -> None:
@@ -65,11 +89,9 @@ def test_wait_for_enter_handles_eof_and_sets_stop_event(monkeypatch) -> None:
 
 def test_refresh_time_bits_advances_reference_during_second_59(monkeypatch) -> None:
     cfg = GeneratorConfig(frequency=440.0, samplerate=48000, amplitude=0.5)
-    realtime = streamer.RealtimeStreamer(cfg)
-    realtime.state.count_sec = 59
-
     sampled_now = datetime(2026, 2, 18, 10, 58, 59, 150000)
-    monkeypatch.setattr(streamer, "now_dt", lambda _use_utc: sampled_now)
+    realtime = streamer.RealtimeStreamer(cfg, clock=_ScriptedClock(sampled_now))
+    realtime.state.count_sec = 59
 
     captured_now: list[datetime] = []
 
@@ -82,3 +104,75 @@ def test_refresh_time_bits_advances_reference_during_second_59(monkeypatch) -> N
     realtime._refresh_time_bits()
 
     assert captured_now == [sampled_now + timedelta(minutes=1)]
+
+
+def test_callback_output_matches_offline_renderer() -> None:
+    cfg = GeneratorConfig(frequency=440.0, samplerate=8000, amplitude=0.5)
+    start = datetime(2026, 2, 18, 10, 0, 58, 0, tzinfo=BERLIN_TZ)
+
+    clock = VirtualClock(start)
+    realtime = streamer.RealtimeStreamer(cfg, clock=clock)
+    realtime.prime()
+    sink = NullSink(cfg.samplerate, realtime.blocksize, clock=clock)
+    offline = OfflineRenderer(cfg, start)
+
+    for _ in range(15):
+        assert sink.pull(realtime._callback)
+        np.testing.assert_array_equal(sink.outdata[:, 0], offline.render_block())
+        assert realtime.schedule.time_bits == offline.schedule.time_bits
+
+
+def test_stop_requested_before_prime_is_kept() -> None:
+    cfg = GeneratorConfig(frequency=440.0, samplerate=8000, amplitude=0.5)
+    realtime = streamer.RealtimeStreamer(cfg, clock=VirtualClock(datetime(2026, 2, 18, 10, 0, 58, tzinfo=BERLIN_TZ)))
+    # The isolated worker's control thread may deliver "stop" during start-up.
+    realtime.stop_event.set()
+    realtime.prime()
+    assert realtime.stop_event.is_set()
+
+
+def test_virtual_clock_replays_dst_switch_night() -> None:
+    cfg = GeneratorConfig(frequency=440.0, samplerate=8000, amplitude=0.5)
+    # 2026-03-29: CET -> CEST at 02:00 local (01:00 UTC).
+    clock = VirtualClock(datetime(2026, 3, 29, 1, 57, 30, tzinfo=BERLIN_TZ))
+    realtime = streamer.RealtimeStreamer(cfg, clock=clock)
+    realtime.prime()
+    sink = NullSink(cfg.samplerate, realtime.blocksize, clock=clock)
+
+    telegrams: list[int] = []
+
+    def _on_block(_outdata) -> None:
+        if realtime.state.is_minute_refresh_point():
+            telegrams.append(realtime.state.time_bits)
+
+    sink.on_block = _on_block
+    assert sink.run(realtime._callback, blocks=3 * 600) == 3 * 600
+
+    # Frames sent during 01:58, 01:59 CET and 03:00 CEST (refreshed at second 59
+    # of the preceding minute) describe the minute that follows them.
+    assert [(_field(b, 29, 34), _field(b, 21, 27)) for b in telegrams] == [
+        (to_bcd(1), to_bcd(59)),
+        (to_bcd(3), to_bcd(0)),
+        (to_bcd(3), to_bcd(1)),
+    ]
+    assert [_field(b, 16, 16) for b in telegrams] == [1, 0, 0]  # A1
+    assert [_field(b, 18, 18) for b in telegrams] == [0, 1, 1]  # Z2 (CEST)
+
+
+def test_warm_up_leaves_generator_untouched_and_first_callback_is_timed() -> None:
+    cfg = GeneratorConfig(frequency=440.0, samplerate=48000, amplitude=0.5)
+    # An exhausted scripted clock fails on any read: warm-up must not consume clock samples.
+    realtime = streamer.RealtimeStreamer(cfg, clock=_ScriptedClock())
+    realtime.state.count_sec, realtime.state.count_deci = 12, 3
+    realtime.osc._sample_index = 1234
+    before = (realtime.state.slot, realtime.state.time_bits, realtime.schedule, realtime.osc._sample_index)
+
+    assert realtime.warm_up() > 0.0
+    assert (realtime.state.slot, realtime.state.time_bits, realtime.schedule, realtime.osc._sample_index) == before
+
+    out = np.zeros((realtime.blocksize, 1), dtype=np.float32)
+    realtime._callback(out, realtime.blocksize, None, None)
+    realtime._callback(out, realtime.blocksize, None, None)
+    timings = realtime.startup_timings
+    assert timings is not None and timings.first_callback_s > 0.0
+    assert "first callback" in timings.format()
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.dsp.impairment import ImpairmentConfig
+from dcf77gen.dsp.receiver import ReceiverModel
+from dcf77gen.dsp.sweep import config_grid, evaluate_config, parse_grid, run_sweep
+from dcf77gen.protocol.encoder import BERLIN_TZ
+
+START = datetime(2026, 10, 18, 12, 0, 0, tzinfo=BERLIN_TZ)
+BASE = GeneratorConfig(frequency=1000.0, samplerate=16000)
+RECEIVER = ReceiverModel(tuned_hz=1000.0)
+
+
+def test_clean_signal_decodes_with_expected_margin() -> None:
+    result = evaluate_config(BASE, RECEIVER, ImpairmentConfig(), 12.0, START)
+    report = result.report
+    assert result.error is None and report is not None
+    assert report.decoded and report.bit_errors == 0 and report.seconds >= 9
+    # A 0.15 low pulse sits 0.35 under the 0.5 threshold, less the filter's edge spread.
+    assert report.margin == pytest.approx(0.28, abs=0.02)
+
+    # Detuned far outside the crystal filter, nothing decodes.
+    detuned = evaluate_config(BASE, ReceiverModel(tuned_hz=1300.0), ImpairmentConfig(snr_db=20.0, seed=0), 12.0, START)
+    assert detuned.report is not None and not detuned.report.decoded
+
+
+def test_sweep_ranks_by_margin_over_a_process_pool() -> None:
+    configs, skipped = config_grid(
+        frequencies=[1000.0], samplerates=[16000], amplitudes=[1.0], low_factors=[0.8, 0.1, 0.6, 1.5]
+    )
+    assert len(configs) == 3 and len(skipped) == 1 and "low_factor" in skipped[0]
+
+    results = run_sweep(
+        configs, RECEIVER, ImpairmentConfig(snr_db=10.0, seed=0), seconds=8.0, start=START, jobs=2
+    )
+    assert [r.config.low_factor for r in results] == [0.1, 0.6, 0.8]
+    assert results[0].report.decoded
+    assert results[-1].report.bit_errors == results[-1].report.seconds
+
+
+def test_parse_grid() -> None:
+    assert parse_grid("0.05:0.2:0.05,0.5") == [0.05, 0.1, 0.15, 0.2, 0.5]
+    assert parse_grid("48000, 96000", int) == [48000, 96000]
+    with pytest.raises(ValueError):
+        parse_grid("1:2")
+    with pytest.raises(ValueError):
+        parse_grid("1:2:0")
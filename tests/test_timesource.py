@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, UTC
+import os
+import time
+
+from dcf77gen.core.timesource import DisciplinedClock, TimeEvent, TimeSourceReader, parse_nmea_time
+
+
+def _nmea(body: str) -> str:
+    checksum = 0
+    for ch in body:
+        checksum ^= ord(ch)
+    return f"${body}*{checksum:02X}"
+
+
+def test_parse_nmea_time_accepts_rmc_and_zda_only_with_valid_checksum() -> None:
+    rmc = _nmea("GPRMC,235959.50,A,5230.0000,N,01323.0000,E,0.0,0.0,311226,,,A")
+    zda = _nmea("GNZDA,001500.00,25,10,2026,00,00")
+
+    assert parse_nmea_time(rmc) == datetime(2026, 12, 31, 23, 59, 59, 500000, tzinfo=UTC)
+    assert parse_nmea_time(zda) == datetime(2026, 10, 25, 0, 15, 0, tzinfo=UTC)
+    assert parse_nmea_time(rmc[:-2] + "00") is None
+    assert parse_nmea_time(_nmea("GPRMC,235959.50,V,,,,,,,311226,,,N")) is None
+    assert parse_nmea_time(_nmea("GPGGA,235959.50,5230.0000,N,01323.0000,E,1,08,0.9,40.0,M,,M,,")) is None
+
+
+def test_disciplined_clock_anchors_nmea_time_to_preceding_pps_edge() -> None:
+    clock = DisciplinedClock(holdover_s=5.0)
+    assert not clock.locked
+
+    now_mono = time.monotonic()
+    # GPS time is two seconds behind the system clock.
+    pps_utc = (datetime.now(UTC) - timedelta(seconds=2.3)).replace(microsecond=0)
+    pps_mono = now_mono - 0.3 - (datetime.now(UTC) - timedelta(seconds=2.3)).microsecond / 1e6
+    clock.on_event(TimeEvent("pps", pps_mono))
+    clock.on_event(TimeEvent("nmea", pps_mono + 0.12, pps_utc))
+
+    assert clock.source == "pps"
+    expected = pps_utc + timedelta(seconds=time.monotonic() - pps_mono)
+    assert abs((clock.now(True) - expected).total_seconds()) < 0.005
+    assert abs(clock.offset_s - 2.0) < 0.05
+
+
+def test_replay_source_locks_clock(tmp_path) -> None:
+    capture = tmp_path / "gps.txt"
+    capture.write_text(
+        "100.000 PPS\n"
+        f"100.150 {_nmea('GPZDA,120000.00,18,10,2026,00,00')}\n"
+        "101.000 PPS\n"
+        f"101.150 {_nmea('GPZDA,120001.00,18,10,2026,00,00')}\n",
+        encoding="ascii",
+    )
+    clock = DisciplinedClock()
+    reader = TimeSourceReader(f"replay:{capture}@20", clock)
+    reader.start()
+    try:
+        assert reader.wait_for_lock(2.0)
+    finally:
+        reader.stop()
+
+    assert clock.source == "pps"
+    assert clock.now(True).replace(microsecond=0) >= datetime(2026, 10, 18, 12, 0, 0, tzinfo=UTC)
+
+
+class _RecordingClock:
+    def __init__(self) -> None:
+        self.events: list[TimeEvent] = []
+
+    def on_event(self, event: TimeEvent) -> None:
+        self.events.append(event)
+
+
+def _wait_until(predicate, timeout_s: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_fifo_source_starts_without_writer_and_survives_writer_restart(tmp_path) -> None:
+    fifo = tmp_path / "gps.fifo"
+    os.mkfifo(fifo)
+    clock = _RecordingClock()
+    reader = TimeSourceReader(f"fifo:{fifo}", clock)
+    started = time.monotonic()
+    reader.start()
+    try:
+        assert time.monotonic() - started < 0.5
+        for writer in range(2):
+            fd = os.open(fifo, os.O_WRONLY)
+            os.write(fd, b"PPS 12.5\n")
+            assert _wait_until(lambda: len(clock.events) == writer + 1)
+            assert reader.error is None
+            os.close(fd)
+            assert _wait_until(lambda: reader.error is not None and "writer closed" in reader.error)
+    finally:
+        reader.stop()
+    assert [e.monotonic for e in clock.events] == [12.5, 12.5]
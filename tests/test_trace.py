@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from dcf77gen.core.clock import VirtualClock
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.protocol.encoder import BERLIN_TZ
+from dcf77gen.realtime.producer import RenderAheadProducer
+from dcf77gen.realtime.streamer import RealtimeStreamer
+from dcf77gen.realtime.trace import (
+    FLAG_OUTPUT_UNDERFLOW,
+    FLAG_RENDER_AHEAD,
+    TraceRecorder,
+    analyze_trace,
+    read_trace,
+)
+
+
+def test_trace_ring_records_callbacks_and_reader_finds_skips(tmp_path) -> None:
+    cfg = GeneratorConfig(frequency=440.0, samplerate=8000, amplitude=0.5)
+    path = tmp_path / "run.trace"
+    trace = TraceRecorder(path, cfg.samplerate, cfg.samplerate // 10, capacity=32)
+    realtime = RealtimeStreamer(
+        cfg,
+        clock=VirtualClock(datetime(2026, 2, 18, 10, 0, 57, tzinfo=BERLIN_TZ)),
+        trace=trace,
+    )
+    realtime.prime()
+
+    outdata = np.zeros((realtime.blocksize, 1), dtype=np.float32)
+    for k in range(40):
+        time_info = SimpleNamespace(outputBufferDacTime=100.0 + 0.1 * k)
+        status = SimpleNamespace(output_underflow=(k == 5))
+        if k == 30:
+            realtime.state.advance_block()  # simulate a lost block
+        realtime._callback(outdata, realtime.blocksize, time_info, status if k == 5 else None)
+    trace.close()
+
+    info, records = read_trace(path)
+    assert info["write_count"] == 40
+    assert len(records) == 32
+    # Oldest surviving record is callback 8 (ring of 32 after 40 writes).
+    assert records["dac_time"][0] == pytest.approx(100.8)
+    assert not np.any(records["flags"] & FLAG_OUTPUT_UNDERFLOW)
+
+    analysis = analyze_trace(info, records)
+    assert analysis.skipped_blocks == 1
+    assert analysis.dac_drift_ppm == pytest.approx(0.0, abs=1.0)
+    # Pulses at :58 and :01 only: :59 has none and the :00 pulse was the lost
+    # block, so the spacing is 2.9 s instead of the minute-marker 2.0 s.
+    assert analysis.pulse_count == 2
+    assert analysis.pulse_max_error_ms == pytest.approx(900.0, abs=1e-6)
+    assert "skipped/repeated blocks: 1" in analysis.format()
+
+
+def test_render_ahead_trace_records_the_played_block(tmp_path) -> None:
+    cfg = GeneratorConfig(frequency=440.0, samplerate=8000, amplitude=0.5)
+    start = datetime(2026, 2, 18, 10, 0, 58, tzinfo=BERLIN_TZ)
+    records = {}
+    for mode in ("direct", "ahead"):
+        path = tmp_path / f"{mode}.trace"
+        trace = TraceRecorder(path, cfg.samplerate, cfg.samplerate // 10, capacity=64)
+        realtime = RealtimeStreamer(cfg, clock=VirtualClock(start), trace=trace)
+        realtime.prime()
+        callback = realtime._callback
+        if mode == "ahead":
+            realtime.producer = RenderAheadProducer(realtime, lookahead_s=0.5)
+            realtime.producer.fill()
+            callback = realtime._ring_callback
+        outdata = np.zeros((realtime.blocksize, 1), dtype=np.float32)
+        for _ in range(30):
+            callback(outdata, realtime.blocksize, None, None)
+            if mode == "ahead":
+                realtime.producer.fill()
+        trace.close()
+        records[mode] = read_trace(path)[1]
+
+    # The producer runs five blocks ahead, but each record describes the block being played.
+    for field in ("count_sec", "count_deci", "amplitude", "time_bits"):
+        np.testing.assert_array_equal(records["ahead"][field], records["direct"][field])
+    assert np.all(records["ahead"]["flags"] & FLAG_RENDER_AHEAD)
+
+
+def test_read_trace_rejects_foreign_files(tmp_path) -> None:
+    path = tmp_path / "bogus.trace"
+    path.write_bytes(b"\0" * 128)
+    with pytest.raises(ValueError):
+        read_trace(path)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from dcf77gen.core.clock import VirtualClock
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.protocol.encoder import BERLIN_TZ
+from dcf77gen.realtime import streamer
+from dcf77gen.realtime.watchdog import StreamWatchdog
+
+
+def test_watchdog_detects_stop_stall_and_underflow_storm() -> None:
+    dog = StreamWatchdog(storm_underflows=3, storm_window_s=1.0, stall_s=0.5)
+    dog.reset(0.0)
+    assert dog.check(0.1, True, 1, 0) is None
+    assert dog.check(0.5, True, 5, 2) is None
+    # Three underflows within the window.
+    assert dog.check(0.9, True, 9, 5).startswith("underflow storm")
+
+    dog.reset(10.0)
+    assert dog.check(10.1, True, 20, 5) is None
+    assert dog.check(10.5, True, 20, 5) is None
+    assert dog.check(10.7, True, 20, 5).startswith("no callback")
+    assert dog.check(11.0, False, 21, 5) == "stream stopped"
+
+
+def test_watchdog_walks_fallbacks_then_backs_off() -> None:
+    dog = StreamWatchdog(fallback_devices=(3, 4), backoff_s=0.1, max_backoff_s=0.3)
+    picks = [dog.next_device(None) for _ in range(7)]
+    assert [device for device, _ in picks] == [None, 3, 4, None, 3, 4, None]
+    assert [delay for _, delay in picks] == [0.0, 0.0, 0.0, 0.1, 0.1, 0.1, 0.2]
+    assert dog.recovered() == 7
+    assert dog.next_device(None) == (None, 0.0)
+
+
+def test_stream_death_reopens_fallback_and_keeps_telegram(monkeypatch) -> None:
+    cfg = GeneratorConfig(frequency=440.0, samplerate=48000, amplitude=0.5)
+    clock = VirtualClock(datetime(2026, 10, 18, 12, 0, 10, 50000, tzinfo=BERLIN_TZ))
+    realtime = streamer.RealtimeStreamer(cfg, clock=clock, watchdog=StreamWatchdog(fallback_devices=(7,)))
+    opened: list[int | None] = []
+    kept: dict[str, object] = {}
+
+    class _FakeOutputStream:
+        def __init__(self, *_args, device=None, **_kwargs) -> None:
+            opened.append(device)
+            if len(opened) == 2:
+                raise streamer.sd.PortAudioError("device unavailable")
+            # The first stream dies right away; the replacement runs until stopped.
+            self.active = len(opened) != 1
+
+        def __enter__(self):
+            if len(opened) == 1:
+                kept["schedule"] = realtime.schedule
+                kept["table"] = realtime.osc._table
+                # Edge discipline had moved the edges on the old stream.
+                realtime.edge_offset_frames = 1234
+                realtime._prev_amp = 0.123
+                clock.advance(3.0)
+            else:
+                realtime.stop_event.set()
+            return self
+
+        def __exit__(self, _exc_type, _exc, _tb) -> bool:
+            return False
+
+    monkeypatch.setattr(streamer.sd, "OutputStream", _FakeOutputStream)
+
+    realtime.run(device_id=None, interactive=False)
+
+    assert opened == [None, None, 7]
+    assert len(realtime.reconnects) == 1
+    event = realtime.reconnects[0]
+    assert (event.reason, event.device, event.attempts) == ("stream stopped", 7, 2)
+    assert event.latency_s > 0.0
+    # Counters follow the clock again; the telegram and oscillator table were kept.
+    assert realtime.state.count_sec == 13
+    assert realtime.schedule is kept["schedule"]
+    assert realtime.osc._table is kept["table"]
+    # The replacement stream starts unsplit, on the seeded slot's amplitude.
+    assert realtime.edge_offset_frames == 0
+    assert realtime._prev_amp == realtime.schedule.amplitudes[realtime.state.slot]
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import threading
+
+from dcf77gen.core.config import GeneratorConfig
+from dcf77gen.realtime.worker import IsolatedStreamer, SharedStatus, _control_loop
+
+
+def test_shared_status_round_trip_and_parent_snapshot() -> None:
+    shared = SharedStatus.create()
+    shared.publish({"count_sec": 42, "count_deci": 7, "time_bits": (1 << 58) | 5, "output_underflow": 2})
+
+    snapshot = shared.snapshot()
+    assert snapshot["count_sec"] == 42
+    assert snapshot["count_deci"] == 7
+    assert snapshot["time_bits"] == (1 << 58) | 5
+
+    parent = IsolatedStreamer(GeneratorConfig(frequency=440.0, samplerate=48000))
+    summary = parent._apply_snapshot(snapshot)
+    assert (parent.state.count_sec, parent.state.count_deci) == (42, 7)
+    assert parent.schedule.time_bits == (1 << 58) | 5
+    assert summary == "output_underflow=2"
+
+    # A worker killed inside publish() leaves the sequence odd: give up instead of spinning.
+    shared.array[0] += 1
+    assert shared.snapshot(max_tries=10) is None
+
+
+def test_control_loop_stops_on_message_and_on_parent_exit() -> None:
+    parent_conn, child_conn = mp.Pipe()
+    stop_event = threading.Event()
+    worker = threading.Thread(target=_control_loop, args=(child_conn, stop_event))
+    worker.start()
+    parent_conn.send("stop")
+    worker.join(timeout=2.0)
+    assert stop_event.is_set()
+
+    parent_conn, child_conn = mp.Pipe()
+    stop_event = threading.Event()
+    worker = threading.Thread(target=_control_loop, args=(child_conn, stop_event))
+    worker.start()
+    parent_conn.close()
+    worker.join(timeout=2.0)
+    assert stop_event.is_set()